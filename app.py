@@ -9,31 +9,59 @@ Routes :
   GET  /plante/<id>/modifier      → formulaire modification
   POST /plante/sauvegarder        → enregistre ajout/modif
   POST /plante/<id>/supprimer     → supprime une plante
-  GET  /journal                   → journal global
+  GET  /journal                   → journal global (filtres de dates, paginé)
   GET  /journal/<plante_id>       → journal d'une plante
   POST /journal/ajouter           → ajoute une entrée
   POST /journal/<id>/supprimer    → supprime une entrée
-  POST /importer                  → import des fiches .docx du dossier fiches/
-  GET  /api/plantes               → API JSON (recherche)
-
-Lancement :
-  python app.py
+  POST /importer                  → lance l'import des fiches .docx (tâche de fond)
+  GET  /importer/<tache>          → progression de l'import (JSON)
+  GET  /importer/<tache>/flux     → progression de l'import (Server-Sent Events)
+  GET  /importer/<tache>/rapport  → bilan de l'import (messages flash)
+  GET  /api/plantes               → API JSON (recherche, paginée)
+  GET  /api/suggest?q=            → suggestions de la barre de recherche (autocomplétion)
+  GET  /export                    → export complet CSV / JSONL / SQLite (gzip possible)
+  GET  /api/stats                 → compteurs internes (cache)
+  GET  /metrics                   → métriques Prometheus (latences, SQL, rendu)
+
+Lancement (serveur Waitress multi-threadé, voir serve.py) :
+  python app.py            (ou python serve.py --threads 16 ...)
   → http://localhost:5000
 """
 
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash
-from datetime import date
+from flask import Flask, Response, abort, render_template, request, redirect, url_for, jsonify, flash, session
+from markupsafe import Markup, escape
+from contextlib import closing
+from datetime import date, datetime, timezone
+from functools import wraps
+import hashlib
+import json
 import os
+import time
 
 from database import (
-    init_db, lister_plantes, get_plante, sauvegarder_plante, supprimer_plante,
-    get_journal, get_journal_global, ajouter_entree_journal, supprimer_entree_journal
+    init_app, init_db, lister_plantes_page, iterer_plantes, compter_plantes, get_plante,
+    sauvegarder_plante, supprimer_plante,
+    get_journal, get_journal_global_page, ajouter_entree_journal, supprimer_entree_journal,
+    stats_cache, get_revision,
+    SNIPPET_DEBUT, SNIPPET_FIN, CHAMPS_COMMUNS, CHAMPS_SPECIFIQUES, COLONNES_LISTE,
+    EXPRESSIONS_RESUME
 )
-from extract_fiches import importer_dossier
+from taches import lancer_import, get_tache
+from export import flux_export, nom_fichier, type_mime
+from metriques import init_metriques
+from suggestions import init_suggestions, suggerer, stats_suggestions, LIMITE_DEFAUT
 from models import creer_plante, TYPE_LABELS, TYPE_COULEURS, EntreeJournal
 
 app = Flask(__name__)
 app.secret_key = "herbier-secret-key-change-en-prod"
+app.config.setdefault("HERBIER_POOL_SIZE", int(os.environ.get("HERBIER_POOL_SIZE", 5)))
+if os.environ.get("HERBIER_DB_PATH"):
+    app.config.setdefault("HERBIER_DB_PATH", os.environ["HERBIER_DB_PATH"])
+# Processus d'extraction des fiches .docx en parallèle (vide = nombre de cœurs)
+app.config.setdefault("HERBIER_IMPORT_WORKERS", int(os.environ.get("HERBIER_IMPORT_WORKERS", 0)) or None)
+init_app(app)   # pool de connexions SQLite lié à l'application
+init_metriques(app)   # chronométrage par requête (SQL, rendu) + /metrics
+init_suggestions()    # index de l'autocomplétion tenu à jour à chaque écriture
 
 DOSSIER_FICHES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fiches")
 
@@ -54,20 +82,95 @@ def inject_globals():
     }
 
 
+@app.template_filter("surligner")
+def surligner(extrait: str) -> Markup:
+    """Échappe un extrait de recherche FTS et transforme ses marqueurs en <mark>."""
+    html = str(escape(extrait or ""))
+    return Markup(html.replace(SNIPPET_DEBUT, "<mark>").replace(SNIPPET_FIN, "</mark>"))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# GET CONDITIONNELS (ETag / Last-Modified)
+# ══════════════════════════════════════════════════════════════════════════════
+# L'ETag est dérivé du compteur de révision de la base : une requête
+# If-None-Match / If-Modified-Since qui correspond reçoit un 304 avant toute
+# requête de données ou tout rendu de template.
+
+DEMARRAGE = time.time()   # un redémarrage (code ou templates modifiés) change les ETag
+
+
+def _validateurs() -> tuple[str, datetime]:
+    """Calcule (ETag, Last-Modified) de la requête courante."""
+    numero, modifie_le = get_revision()
+    jour = date.today()
+    cle = f"{numero}|{DEMARRAGE}|{jour}|{request.endpoint}|{request.full_path}|{request.accept_mimetypes}"
+    etag = hashlib.sha1(cle.encode()).hexdigest()[:20]
+    # "today" est injecté dans les templates : minuit compte comme une modification
+    minuit = time.mktime(jour.timetuple())
+    derniere = max(modifie_le, DEMARRAGE, minuit)
+    return etag, datetime.fromtimestamp(int(derniere), timezone.utc)
+
+
+def conditionnel(vue):
+    """Décorateur : répond 304 si le client possède déjà la version courante."""
+    @wraps(vue)
+    def wrapper(*args, **kwargs):
+        # Des messages flash en attente rendraient la page différente
+        if session.get("_flashes"):
+            return vue(*args, **kwargs)
+        etag, derniere = _validateurs()
+        if request.if_none_match:
+            inchange = request.if_none_match.contains_weak(etag)
+        else:
+            inchange = request.if_modified_since is not None and request.if_modified_since >= derniere
+        if inchange:
+            reponse = Response(status=304)
+        else:
+            reponse = app.make_response(vue(*args, **kwargs))
+            if reponse.status_code != 200:
+                return reponse
+        reponse.set_etag(etag)
+        reponse.last_modified = derniere
+        reponse.headers["Cache-Control"] = "no-cache"   # revalidation à chaque affichage
+        return reponse
+    return wrapper
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # LISTE PRINCIPALE
 # ══════════════════════════════════════════════════════════════════════════════
 
+TAILLE_PAGE     = 60    # cartes par page sur la liste principale
+TAILLE_PAGE_API = 100   # éléments par page sur /api/plantes
+
+
+def _pagination(taille_defaut: int) -> dict:
+    """Lit les paramètres ?limit=, ?cursor= et ?page= de la requête."""
+    return {
+        "limite":  request.args.get("limit", type=int) or taille_defaut,
+        "curseur": request.args.get("cursor") or None,
+        "page":    request.args.get("page", type=int),
+    }
+
+
 @app.route("/")
+@conditionnel
 def index():
     type_filtre = request.args.get("type", "")
     recherche   = request.args.get("q", "")
-    plantes = lister_plantes(
+    plantes, precedent, suivant = lister_plantes_page(
         type_filtre=type_filtre or None,
-        recherche=recherche or None
+        recherche=recherche or None,
+        colonnes=COLONNES_LISTE,           # seulement ce qu'affichent les cartes
+        **_pagination(TAILLE_PAGE)
     )
+    total = compter_plantes(type_filtre=type_filtre or None,
+                            recherche=recherche or None)
     return render_template("index.html",
                            plantes=plantes,
+                           total=total,
+                           curseur_precedent=precedent,
+                           curseur_suivant=suivant,
                            type_filtre=type_filtre,
                            recherche=recherche)
 
@@ -77,6 +180,7 @@ def index():
 # ══════════════════════════════════════════════════════════════════════════════
 
 @app.route("/plante/<int:plante_id>")
+@conditionnel
 def detail(plante_id):
     plante = get_plante(plante_id)
     if not plante:
@@ -175,13 +279,47 @@ def supprimer(plante_id):
 # JOURNAL
 # ══════════════════════════════════════════════════════════════════════════════
 
+TAILLE_PAGE_JOURNAL = 100   # entrées par page sur le journal global
+
+
+def _date_iso(valeur: str | None) -> str:
+    """Retourne la date AAAA-MM-JJ si elle est valide, sinon une chaîne vide."""
+    try:
+        return date.fromisoformat(valeur).isoformat() if valeur else ""
+    except ValueError:
+        return ""
+
+
 @app.route("/journal")
+@conditionnel
 def journal_global():
-    entrees = get_journal_global()
-    return render_template("journal.html", entrees=entrees, plante=None)
+    """
+    Journal global paginé (plus récent d'abord).
+    Filtres : ?from= / ?to= (AAAA-MM-JJ, inclus), ?action=, ?type= ; pages : ?cursor=
+    """
+    filtres = {
+        "from":   _date_iso(request.args.get("from")),
+        "to":     _date_iso(request.args.get("to")),
+        "action": request.args.get("action", "").strip(),
+        "type":   request.args.get("type", ""),
+    }
+    entrees, precedent, suivant = get_journal_global_page(
+        date_debut=filtres["from"] or None,
+        date_fin=filtres["to"] or None,
+        action=filtres["action"] or None,
+        type_filtre=filtres["type"] or None,
+        limite=request.args.get("limit", type=int) or TAILLE_PAGE_JOURNAL,
+        curseur=request.args.get("cursor") or None,
+    )
+    return render_template("journal.html", entrees=entrees, plante=None,
+                           filtres=filtres,
+                           args_journal={k: v for k, v in filtres.items() if v},
+                           curseur_precedent=precedent,
+                           curseur_suivant=suivant)
 
 
 @app.route("/journal/<int:plante_id>")
+@conditionnel
 def journal_plante(plante_id):
     plante = get_plante(plante_id)
     entrees = get_journal(plante_id)
@@ -217,30 +355,74 @@ def journal_supprimer(entree_id):
 @app.route("/importer", methods=["POST"])
 def importer():
     """
-    Scanne fiches/A_traiter/ et importe toutes les fiches .docx.
-    Les fiches importées avec succès sont déplacées dans fiches/.
-    Les fiches en erreur restent dans A_traiter/ pour correction.
+    Lance en arrière-plan l'import des fiches .docx nouvelles ou modifiées de
+    fiches/A_traiter/ (voir taches.py) et répond immédiatement.
+    Un seul import à la fois : un second clic rejoint l'import en cours.
+    Réponse JSON (202) si demandée, sinon redirection vers la liste.
     """
-    import shutil
-    plantes_extraites, erreurs = importer_dossier(DOSSIER_FICHES)
-    nb_ok = 0
-    for plante, chemin_source in plantes_extraites:
-        try:
-            sauvegarder_plante(plante)
-            # Déplacement vers fiches/ après succès
-            dest = os.path.join(DOSSIER_FICHES, os.path.basename(chemin_source))
-            shutil.move(chemin_source, dest)
-            nb_ok += 1
-        except Exception as e:
-            erreurs.append(f"{plante.nom} ({e})")
-
-    if nb_ok:
-        flash(f"✅ {nb_ok} fiche(s) importée(s) avec succès.", "success")
-    if erreurs:
-        flash(f"⚠️ {len(erreurs)} erreur(s) : {', '.join(erreurs)}", "warning")
-    if not nb_ok and not erreurs:
-        flash("ℹ️ Aucune fiche .docx trouvée dans fiches/A_traiter/.", "info")
+    tache = lancer_import(DOSSIER_FICHES, nb_workers=app.config["HERBIER_IMPORT_WORKERS"])
+    if request.accept_mimetypes.best == "application/json":
+        reponse = jsonify({**tache.etat(),
+                           "suivi":   url_for("importer_etat", tache_id=tache.id),
+                           "flux":    url_for("importer_flux", tache_id=tache.id),
+                           "rapport": url_for("importer_rapport", tache_id=tache.id)})
+        reponse.status_code = 202
+        reponse.headers["Location"] = url_for("importer_etat", tache_id=tache.id)
+        return reponse
+    flash("📂 Import lancé en arrière-plan — recharge la page pour voir les nouvelles fiches.", "info")
+    return redirect(url_for("index"))
+
 
+def _tache_ou_404(tache_id: str):
+    tache = get_tache(tache_id)
+    if tache is None:
+        abort(404)
+    return tache
+
+
+@app.route("/importer/<tache_id>")
+def importer_etat(tache_id):
+    """Progression d'un import (JSON, pour un suivi par interrogation)."""
+    return jsonify(_tache_ou_404(tache_id).etat())
+
+
+@app.route("/importer/<tache_id>/flux")
+def importer_flux(tache_id):
+    """Progression d'un import en Server-Sent Events (un événement par changement)."""
+    tache = _tache_ou_404(tache_id)
+
+    def evenements():
+        version = -1
+        while True:
+            etat = tache.attendre_changement(version, delai=15)
+            if etat["version"] == version:
+                yield ": keep-alive\n\n"      # garde la connexion ouverte
+                continue
+            version = etat["version"]
+            yield f"data: {json.dumps(etat, ensure_ascii=False)}\n\n"
+            if etat["statut"] in ("terminee", "echouee"):
+                return
+
+    return Response(evenements(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route("/importer/<tache_id>/rapport")
+def importer_rapport(tache_id):
+    """Affiche le bilan d'un import terminé (messages flash) puis la liste."""
+    etat = _tache_ou_404(tache_id).etat()
+    if etat["statut"] == "echouee":
+        flash(f"❌ {etat['message']}", "error")
+    elif etat["statut"] != "terminee":
+        flash("⏳ Import toujours en cours…", "info")
+    if etat["enregistrees"]:
+        flash(f"✅ {etat['enregistrees']} fiche(s) importée(s) avec succès.", "success")
+    if etat["inchangees"]:
+        flash(f"ℹ️ {etat['inchangees']} fiche(s) déjà importée(s) et inchangée(s), ignorée(s).", "info")
+    if etat["erreurs"]:
+        flash(f"⚠️ {len(etat['erreurs'])} erreur(s) : {', '.join(etat['erreurs'])}", "warning")
+    if etat["statut"] == "terminee" and not (etat["enregistrees"] or etat["erreurs"] or etat["inchangees"]):
+        flash("ℹ️ Aucune fiche .docx trouvée dans fiches/A_traiter/.", "info")
     return redirect(url_for("index"))
 
 
@@ -248,32 +430,174 @@ def importer():
 # API JSON
 # ══════════════════════════════════════════════════════════════════════════════
 
+TAILLE_PAQUET = 64 * 1024   # octets accumulés avant chaque envoi en mode flux
+
+
+# Champs acceptés par ?fields= ("extrait" : seulement lors d'une recherche)
+CHAMPS_API = {"id", "TYPE", "extrait", *CHAMPS_COMMUNS,
+              *(ch for champs in CHAMPS_SPECIFIQUES.values() for ch in champs)}
+
+
+def _champs_api() -> tuple[list[str] | None, list[str] | None]:
+    """
+    Lit ?fields=nom,latin,type : retourne (champs du JSON, projection SQL).
+    La projection vaut None si un champ n'est pas une colonne de `plantes`
+    (champ spécifique) : les plantes sont alors chargées complètes.
+    ValueError si un champ est inconnu.
+    """
+    valeur = request.args.get("fields", "")
+    champs = []
+    for ch in valeur.split(","):
+        ch = ch.strip()
+        ch = "TYPE" if ch.lower() == "type" else ch
+        if not ch or ch in champs:
+            continue
+        if ch not in CHAMPS_API:
+            raise ValueError(f"Champ inconnu : {ch!r}")
+        champs.append(ch)
+    if not champs:
+        return None, None
+    hors_projection = [ch for ch in champs
+                       if ch not in EXPRESSIONS_RESUME and ch not in ("id", "TYPE", "extrait")]
+    if hors_projection:
+        return champs, None
+    return champs, [ch for ch in champs if ch in EXPRESSIONS_RESUME]
+
+
+def _plante_api(p, champs: list[str] | None = None) -> dict:
+    """
+    Dictionnaire JSON d'une plante (limité à `champs` si ?fields=), avec
+    l'extrait surligné si recherche. Un champ spécifique d'un autre type vaut null.
+    """
+    if champs:
+        d = {ch: getattr(p, ch, None) for ch in champs if ch != "extrait"}
+    else:
+        d = p.to_dict()
+    if getattr(p, "_extrait", None) and (not champs or "extrait" in champs):
+        d["extrait"] = str(surligner(p._extrait))   # HTML, mots trouvés en <mark>
+    return d
+
+
+def _format_flux() -> str | None:
+    """
+    Mode flux demandé par le client : "ndjson", "json" ou None.
+      ?stream=1 / ?stream=ndjson / Accept: application/x-ndjson → NDJSON
+      ?stream=json                                            → tableau JSON
+    """
+    flux = request.args.get("stream", "")
+    if flux == "json":
+        return "json"
+    if flux in ("1", "ndjson"):
+        return "ndjson"
+    meilleur = request.accept_mimetypes.best_match(["application/json", "application/x-ndjson"])
+    return "ndjson" if meilleur == "application/x-ndjson" else None
+
+
+def _flux_plantes(plantes, format_: str, champs: list[str] | None = None):
+    """
+    Générateur : sérialise les plantes une à une (NDJSON ou tableau JSON).
+    La première plante part immédiatement, les suivantes par paquets de
+    TAILLE_PAQUET octets.
+    """
+    with closing(plantes):
+        if format_ == "json":
+            yield "["
+        tampon, taille = [], 0
+        for i, p in enumerate(plantes):
+            ligne = json.dumps(_plante_api(p, champs), ensure_ascii=False)
+            if format_ == "json":
+                ligne = ("," if i else "") + ligne
+            else:
+                ligne += "\n"
+            tampon.append(ligne)
+            taille += len(ligne)
+            if i == 0 or taille >= TAILLE_PAQUET:
+                yield "".join(tampon)
+                tampon, taille = [], 0
+        if tampon:
+            yield "".join(tampon)
+        if format_ == "json":
+            yield "]"
+
+
 @app.route("/api/plantes")
+@conditionnel
 def api_plantes():
-    """Retourne la liste des plantes au format JSON (pour usage futur)."""
+    """
+    Retourne une page de plantes au format JSON.
+    Paramètres : ?type=, ?q=, ?limit= (défaut 100), ?cursor=, ?page=
+    Les pages voisines sont indiquées dans l'en-tête Link (rel="next" / "prev").
+    ?fields=nom,latin,type : seulement ces champs ; s'ils sont tous des
+    colonnes de `plantes`, seules ces colonnes sont lues en base.
+
+    Mode flux (export complet, sans pagination, mémoire constante) :
+    ?stream=1 ou Accept: application/x-ndjson → une plante JSON par ligne ;
+    ?stream=json → tableau JSON envoyé par morceaux.
+    """
     type_filtre = request.args.get("type")
     recherche   = request.args.get("q")
-    plantes = lister_plantes(type_filtre=type_filtre, recherche=recherche)
-    return jsonify([p.to_dict() for p in plantes])
-
+    try:
+        champs, colonnes = _champs_api()
+    except ValueError as e:
+        return jsonify({"erreur": str(e), "champs": sorted(CHAMPS_API)}), 400
+
+    format_ = _format_flux()
+    if format_:
+        mimetype = "application/x-ndjson" if format_ == "ndjson" else "application/json"
+        plantes = iterer_plantes(type_filtre, recherche, colonnes=colonnes)
+        return Response(_flux_plantes(plantes, format_, champs), mimetype=mimetype)
+
+    plantes, precedent, suivant = lister_plantes_page(
+        type_filtre=type_filtre, recherche=recherche, colonnes=colonnes,
+        **_pagination(TAILLE_PAGE_API)
+    )
+    reponse = jsonify([_plante_api(p, champs) for p in plantes])
+    liens = []
+    for rel, curseur in (("prev", precedent), ("next", suivant)):
+        if curseur:
+            args = {k: v for k, v in request.args.items() if k not in ("cursor", "page")}
+            url = url_for("api_plantes", cursor=curseur, **args)
+            liens.append(f'<{url}>; rel="{rel}"')
+    if liens:
+        reponse.headers["Link"] = ", ".join(liens)
+    return reponse
+
+
+@app.route("/api/suggest")
+def api_suggest():
+    """
+    Suggestions pour le début de saisie ?q= (nom, nom latin, famille ; sans
+    casse ni accents), depuis l'index en mémoire de suggestions.py.
+    ?limit= (défaut 8, au plus 20).
+    """
+    limite = request.args.get("limit", type=int) or LIMITE_DEFAUT
+    return jsonify(suggerer(request.args.get("q", ""), limite))
 
-# ══════════════════════════════════════════════════════════════════════════════
-# LANCEMENT
-# ══════════════════════════════════════════════════════════════════════════════
 
-if __name__ == "__main__":
-    init_db()
-    print("🌿 Mon Herbier — http://localhost:5000")
-    print("   Ctrl+C pour quitter")
-    import threading, webbrowser
-    threading.Timer(1.2, lambda: webbrowser.open("http://localhost:5000")).start()
-    # host="0.0.0.0" → accessible depuis le réseau local WiFi
-    # Depuis ton téléphone : http://<IP_DE_TON_PC>:5000
-    # Pour trouver ton IP : ipconfig (Windows) → "Adresse IPv4"
+@app.route("/export")
+def exporter_herbier():
+    """
+    Export complet en téléchargement, envoyé au fil de la lecture (voir export.py).
+    Paramètres : ?format=csv|jsonl|sqlite (défaut csv), ?contenu=plantes|journal,
+    ?gzip=1 pour compresser à la volée.
+    """
+    format_ = request.args.get("format", "csv")
+    contenu = request.args.get("contenu", "plantes")
+    compresser = request.args.get("gzip", "") in ("1", "oui", "true")
     try:
-        app.run(debug=True, use_reloader=False, host="0.0.0.0", port=5000)
-    except KeyboardInterrupt:
-        print("\n🌿 Au revoir !")
+        blocs = flux_export(format_, contenu, compresser)
+    except ValueError as e:
+        return jsonify({"erreur": str(e)}), 400
+    nom = nom_fichier(format_, contenu, compresser)
+    return Response(blocs, content_type=type_mime(format_, compresser),
+                    headers={"Content-Disposition": f'attachment; filename="{nom}"'})
+
+
+@app.route("/api/stats")
+def api_stats():
+    """Compteurs internes (cache d'objets, index des suggestions)."""
+    return jsonify({"cache": stats_cache(), "suggestions": stats_suggestions()})
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # QUITTER
@@ -281,12 +605,13 @@ if __name__ == "__main__":
 
 @app.route("/quitter", methods=["POST"])
 def quitter():
-    """Arrête Flask proprement et redirige vers la page d'au revoir (GET)."""
-    import threading, os, signal, time
-    def _arreter():
-        time.sleep(1.5)
-        os.kill(os.getpid(), signal.SIGINT)
-    threading.Thread(target=_arreter, daemon=True).start()
+    """Arrête le serveur proprement et redirige vers la page d'au revoir (GET)."""
+    import threading, signal
+    # Arrêt fourni par serve.py ; à défaut (serveur de développement Flask,
+    # sans API d'arrêt) : équivalent d'un Ctrl+C
+    arreter = app.config.get("HERBIER_ARRET") or (lambda: signal.raise_signal(signal.SIGINT))
+    # Délai : laisse le temps de servir la redirection et la page d'au revoir
+    threading.Timer(1.5, arreter).start()
     return redirect(url_for("au_revoir"))
 
 
@@ -315,3 +640,10 @@ def au_revoir():
   <script>setTimeout(() => window.close(), 1500);</script>
 </body>
 </html>"""
+
+
+if __name__ == "__main__":
+    # Même lancement que `python serve.py` (options : python serve.py --help),
+    # avec cette application : serve.py n'importe pas app.py une seconde fois
+    import serve
+    serve.main(app=app)
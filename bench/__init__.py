@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+bench — Mesures de performance de Mon Herbier
+==============================================
+  python -m bench                          → herbier 1k, tous les scénarios
+  python -m bench --taille 10k --sortie avant.json
+  python -m bench --scenarios lister,get_plante
+  python -m bench comparer avant.json apres.json
+
+Modules :
+  generateur.py → herbiers synthétiques (1k / 10k / 100k plantes, journal
+                  de plusieurs millions de lignes), fiches .docx au format
+                  MODELE_FICHE.txt, ancien herbier_data.json
+  scenarios.py  → scénarios chronométrés (liste, fiche, sauvegarde, journal,
+                  extraction, import, migration) et comparaison de résultats
+  hydratation.py → micro-mesure lignes SQLite → objets Plante
+                   (python -m bench.hydratation)
+
+Les bases générées sont gardées dans bench/_donnees/ (réutilisées d'une
+exécution à l'autre) ; chaque exécution travaille sur une copie.
+"""
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Point d'entrée : python -m bench [--taille 1k|10k|100k] [--sortie fichier.json]
+                 python -m bench comparer avant.json apres.json [--seuil 10]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# ── S'assure qu'on peut importer les modules du projet ────────────────────────
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+import sqlite3
+
+import database
+from bench import generateur, scenarios
+
+DOSSIER_DONNEES = os.path.join(RACINE, "bench", "_donnees")     # bases générées (réutilisées)
+DOSSIER_RESULTATS = os.path.join(RACINE, "bench", "resultats")  # JSON des mesures
+NB_FICHES = 40            # fiches .docx pour les scénarios d'extraction / import
+NB_JSON_ANCIEN = 500      # entrées de l'ancien herbier_data.json (migrate.migrer)
+
+
+def _commit() -> str:
+    """Commit git courant (suffixé de +modifs si l'arbre n'est pas propre)."""
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RACINE,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        sale = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                              cwd=RACINE, capture_output=True, text=True).stdout.strip()
+        return sha + ("+modifs" if sale else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "inconnu"
+
+
+def _base_synthetique(taille: str, graine: int) -> str:
+    """Retourne le chemin de la base synthétique (générée au premier appel)."""
+    nb_plantes, nb_journal = generateur.TAILLES[taille]
+    version = database.MIGRATIONS[-1][0]
+    chemin = os.path.join(DOSSIER_DONNEES, f"herbier_{taille}_g{graine}_v{version}.db")
+    if not os.path.exists(chemin):
+        os.makedirs(DOSSIER_DONNEES, exist_ok=True)
+        print(f"🧪 Génération de l'herbier {taille} ({nb_plantes} plantes, "
+              f"{nb_journal} entrées de journal)…")
+        t0 = time.perf_counter()
+        provisoire = chemin + ".tmp"
+        generateur.generer_herbier(provisoire, nb_plantes, nb_journal, graine)
+        os.replace(provisoire, chemin)
+        print(f"   terminé en {time.perf_counter() - t0:.1f} s")
+    return chemin
+
+
+def mesurer(options) -> dict:
+    source = _base_synthetique(options.taille, options.graine)
+    with tempfile.TemporaryDirectory(prefix="herbier_bench_") as dossier:
+        base = os.path.join(dossier, "herbier.db")
+        scenarios.copier_base(source, base)
+        fiches = generateur.generer_fiches(os.path.join(dossier, "fiches", "A_traiter"),
+                                           NB_FICHES, options.graine)
+        json_ancien = os.path.join(dossier, "herbier_data.json")
+        generateur.generer_json_ancien(json_ancien, NB_JSON_ANCIEN, options.graine)
+
+        ancien_chemin = database.DB_PATH
+        database.DB_PATH = base
+        try:
+            database.init_db()
+            ctx = scenarios.Contexte(dossier, base, fiches, json_ancien, options.graine)
+            print(f"⏱  Scénarios (herbier {options.taille}) :")
+            resultats = scenarios.executer(ctx, options.scenarios)
+        finally:
+            database.fermer_pool()
+            database.invalider_cache()
+            database.DB_PATH = ancien_chemin
+
+    return {
+        "meta": {
+            "commit":     _commit(),
+            "date":       datetime.now().isoformat(timespec="seconds"),
+            "taille":     options.taille,
+            "graine":     options.graine,
+            "plantes":    generateur.TAILLES[options.taille][0],
+            "journal":    generateur.TAILLES[options.taille][1],
+            "python":     platform.python_version(),
+            "sqlite":     sqlite3.sqlite_version,
+            "plateforme": platform.platform(),
+            "cpu":        os.cpu_count(),
+        },
+        "scenarios": resultats,
+    }
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["comparer"]:
+        parser = argparse.ArgumentParser(prog="python -m bench comparer")
+        parser.add_argument("avant")
+        parser.add_argument("apres")
+        parser.add_argument("--seuil", type=float, default=10.0,
+                            help="écart de médiane (%%) signalé comme régression")
+        options = parser.parse_args(argv[1:])
+        with open(options.avant, encoding="utf-8") as f:
+            avant = json.load(f)
+        with open(options.apres, encoding="utf-8") as f:
+            apres = json.load(f)
+        print(f"avant : {avant['meta']['commit']} ({avant['meta']['taille']})   "
+              f"après : {apres['meta']['commit']} ({apres['meta']['taille']})")
+        lignes, regressions = scenarios.comparer(avant, apres, options.seuil)
+        print("\n".join(lignes))
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} scénario(s) plus lent(s) de plus de {options.seuil:g} %")
+            sys.exit(1)
+        return
+
+    parser = argparse.ArgumentParser(prog="python -m bench")
+    parser.add_argument("--taille", choices=list(generateur.TAILLES), default="1k")
+    parser.add_argument("--graine", type=int, default=42)
+    parser.add_argument("--scenarios", type=lambda s: [n for n in s.split(",") if n],
+                        help="sous-ensemble de scénarios (noms ou fragments, séparés par des virgules)")
+    parser.add_argument("--sortie", help="fichier JSON des résultats "
+                                         "(défaut : bench/resultats/<taille>-<commit>.json)")
+    options = parser.parse_args(argv)
+
+    resultats = mesurer(options)
+    sortie = options.sortie or os.path.join(
+        DOSSIER_RESULTATS, f"{options.taille}-{resultats['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, "w", encoding="utf-8") as f:
+        json.dump(resultats, f, ensure_ascii=False, indent=2)
+    print(f"💾 Résultats : {sortie}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+generateur.py — Données synthétiques pour les mesures de performance
+=====================================================================
+Tout est déterministe pour une graine donnée : deux exécutions (ou deux
+commits) mesurent exactement les mêmes données.
+"""
+
+import json
+import os
+import random
+import sqlite3
+from datetime import date, timedelta
+
+from docx import Document
+
+import database
+from models import CLASSES_MAP, creer_plante, Plante
+
+# Nombre de plantes et de lignes de journal par taille d'herbier
+TAILLES = {
+    "1k":   (1_000,     20_000),
+    "10k":  (10_000,   200_000),
+    "100k": (100_000, 2_000_000),
+}
+
+# ── Vocabulaire ───────────────────────────────────────────────────────────────
+
+NOMS = ["Ortie", "Thym", "Romarin", "Camomille", "Mélisse", "Sauge", "Lavande",
+        "Menthe", "Verveine", "Tilleul", "Aubépine", "Valériane", "Passiflore",
+        "Reine-des-prés", "Prêle", "Pissenlit", "Artichaut", "Desmodium",
+        "Ravintsara", "Eucalyptus", "Tea tree", "Hélichryse", "Gaulthérie",
+        "Curcuma", "Gingembre", "Ginkgo", "Rhodiola", "Ashwagandha", "Spiruline",
+        "Shilajit", "Échinacée", "Millepertuis", "Calendula", "Bardane"]
+QUALIFICATIFS = ["vraie", "officinale", "sauvage", "de montagne", "citronnée",
+                 "poivrée", "commune", "des bois", "romaine", "à feuilles étroites"]
+GENRES = ["Urtica", "Thymus", "Salvia", "Lavandula", "Mentha", "Melissa",
+          "Tilia", "Crataegus", "Valeriana", "Passiflora", "Filipendula",
+          "Equisetum", "Taraxacum", "Cinnamomum", "Eucalyptus", "Curcuma"]
+EPITHETES = ["officinalis", "vulgaris", "dioica", "angustifolia", "piperita",
+             "cordata", "monogyna", "camphora", "globulus", "longa", "ulmaria"]
+FAMILLES = ["Lamiacées", "Astéracées", "Urticacées", "Rosacées", "Lauracées",
+            "Myrtacées", "Zingibéracées", "Apiacées", "Malvacées"]
+PROPRIETES = ["digestive", "calmante", "anti-inflammatoire", "diurétique",
+              "antiseptique", "expectorante", "reminéralisante", "adaptogène",
+              "antivirale", "cicatrisante", "hépatoprotectrice", "antispasmodique",
+              "immunostimulante", "draineur hépatique", "favorise le sommeil",
+              "soutient la circulation veineuse", "tonique général"]
+MOLECULES = ["1,8-cinéole", "linalol", "acétate de linalyle", "α-pinène",
+             "camphre", "thymol", "carvacrol", "menthol", "limonène", "géraniol"]
+ACTIONS = ["Début de cure", "Fin de cure", "Observation", "Achat", "Prise",
+           "Effet ressenti", "Pause", "Renouvellement du stock"]
+TYPES_FICHE = {"brute": "plante brute", "complement": "complément",
+               "he": "huile essentielle", "jardin": "plante jardin"}
+
+
+def _texte_long(rng: random.Random, mots: list[str], nb_phrases: int) -> str:
+    """Paragraphe de plusieurs phrases (proprietes, composition...)."""
+    phrases = []
+    for _ in range(nb_phrases):
+        choisis = rng.sample(mots, k=min(len(mots), rng.randint(3, 6)))
+        phrases.append(", ".join(choisis).capitalize() + ".")
+    return " ".join(phrases)
+
+
+def generer_plante(rng: random.Random, numero: int, type_: str) -> Plante:
+    """Une plante réaliste (tous les champs communs et spécifiques remplis)."""
+    p = creer_plante(type_)
+    p.nom = f"{rng.choice(NOMS)} {rng.choice(QUALIFICATIFS)} {numero}"
+    p.latin = f"{rng.choice(GENRES)} {rng.choice(EPITHETES)}"
+    p.famille = rng.choice(FAMILLES)
+    p.bio = rng.random() < .6
+    p.proprietes = _texte_long(rng, PROPRIETES, rng.randint(4, 12))
+    p.contre = _texte_long(rng, ["grossesse", "allaitement", "enfants de moins de 6 ans",
+                                 "épilepsie", "insuffisance rénale", "asthme"], 2)
+    p.interactions = _texte_long(rng, ["anticoagulants", "antidépresseurs",
+                                       "contraceptifs oraux", "anti-hypertenseurs"], 1)
+    p.precautions = "Consulter un professionnel de santé en cas de traitement en cours."
+    p.distributeur = rng.choice(["Sana Gaïa", "Onatera", "Herboristerie du Palais Royal"])
+    p.prix = f"{rng.randint(3, 40)},{rng.randint(0, 99):02d} €"
+    p.quantite = f"{rng.randint(10, 500)} g"
+    p.stockage = rng.choice(["Étagère cuisine", "Placard salle de bain", "Cave"])
+    p.liens = "Doctissimo: https://www.doctissimo.fr/"
+    p.notes = _texte_long(rng, PROPRIETES, 2)
+    for champ in database.CHAMPS_SPECIFIQUES[type_]:
+        if champ == "vivace":
+            p.vivace = rng.random() < .5
+        elif champ == "composition":
+            p.composition = _texte_long(rng, [f"{m} {rng.randint(1, 70)}%" for m in MOLECULES], 6)
+        else:
+            setattr(p, champ, f"{champ.replace('_', ' ')} {rng.randint(1, 50)}")
+    return p
+
+
+def generer_plantes(nb: int, graine: int = 42):
+    """Itère sur `nb` plantes réparties sur les quatre types de CLASSES_MAP."""
+    rng = random.Random(graine)
+    types = list(CLASSES_MAP)
+    for i in range(nb):
+        yield generer_plante(rng, i + 1, types[i % len(types)])
+
+
+def generer_herbier(chemin: str, nb_plantes: int, nb_journal: int, graine: int = 42):
+    """
+    Crée une base complète à `chemin` : nb_plantes plantes (via
+    sauvegarder_plantes) et nb_journal entrées de journal réparties sur
+    cinq ans (insérées directement, par lots, pour aller vite).
+    """
+    ancien_chemin = database.DB_PATH
+    database.DB_PATH = chemin
+    try:
+        database.init_db()
+        ids, erreurs = database.sauvegarder_plantes(generer_plantes(nb_plantes, graine))
+        if erreurs:
+            raise RuntimeError(f"{len(erreurs)} plante(s) non enregistrée(s) : {erreurs[:3]}")
+    finally:
+        database.fermer_pool()
+        database.invalider_cache()
+        database.DB_PATH = ancien_chemin
+
+    rng = random.Random(graine + 1)
+    debut = date(2021, 1, 1)
+    conn = sqlite3.connect(chemin)
+    with conn:
+        lot = []
+        for _ in range(nb_journal):
+            lot.append((rng.choice(ids),
+                        (debut + timedelta(days=rng.randrange(5 * 365))).isoformat(),
+                        rng.choice(ACTIONS),
+                        rng.choice(["", "Bonne tolérance.", "Sommeil amélioré.", "RAS"])))
+            if len(lot) >= 50_000:
+                conn.executemany("INSERT INTO journal (plante_id, date, action, notes) "
+                                 "VALUES (?,?,?,?)", lot)
+                lot.clear()
+        conn.executemany("INSERT INTO journal (plante_id, date, action, notes) "
+                         "VALUES (?,?,?,?)", lot)
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def _labels_canoniques() -> dict[str, dict[str, str]]:
+    """
+    {type: {champ: libellé}} tel qu'écrit dans MODELE_FICHE.txt (premier label
+    de chaque champ, par type : « Partie utilisée » n'existe pas au jardin).
+    """
+    from extract_fiches import TYPE_MAP_LABELS
+    libelles = {}
+    for type_, table in TYPE_MAP_LABELS.items():
+        libelles[type_] = {}
+        for label, champ in table.items():
+            libelles[type_].setdefault(champ, label[0].upper() + label[1:])
+    return libelles
+
+
+def texte_fiche(p: Plante, libelles: dict[str, dict[str, str]]) -> list[str]:
+    """Lignes d'une fiche au format MODELE_FICHE.txt (« Label: Valeur »)."""
+    libelles = libelles[p.TYPE]
+    lignes = [f"{libelles['nom']}: {p.nom}",
+              f"{libelles['latin']}: {p.latin}",
+              f"Type: {TYPES_FICHE[p.TYPE]}"]
+    champs = [c for c in database.CHAMPS_COMMUNS if c not in ("nom", "latin")]
+    for champ in champs + database.CHAMPS_SPECIFIQUES[p.TYPE]:
+        valeur = getattr(p, champ)
+        if isinstance(valeur, bool):
+            valeur = "oui" if valeur else "non"
+        lignes.append(f"{libelles[champ]}: {valeur}")
+    return lignes
+
+
+def generer_fiches(dossier: str, nb: int, graine: int = 42) -> list[str]:
+    """Écrit `nb` fiches .docx dans `dossier` ; retourne leurs chemins."""
+    os.makedirs(dossier, exist_ok=True)
+    libelles = _labels_canoniques()
+    chemins = []
+    for i, p in enumerate(generer_plantes(nb, graine)):
+        doc = Document()
+        for ligne in texte_fiche(p, libelles):
+            doc.add_paragraph(ligne)
+        chemin = os.path.join(dossier, f"fiche_{i:05d}.docx")
+        doc.save(chemin)
+        chemins.append(chemin)
+    return chemins
+
+
+def generer_json_ancien(chemin: str, nb: int, graine: int = 42):
+    """Écrit un herbier_data.json au format de l'ancienne version Tkinter."""
+    rng = random.Random(graine)
+    entrees = []
+    for i in range(nb):
+        p = generer_plante(rng, i + 1, "brute")
+        entrees.append({
+            "id": f"{i}_{p.nom[:8]}", "nom": p.nom, "latin": p.latin,
+            "partie": rng.choice(["Feuille", "Racine", "Huile essentielle", "Gélules"]),
+            "maladies": p.proprietes, "contre": p.contre, "precautions": p.precautions,
+            "quantite": p.quantite, "stockage": p.stockage,
+            "distributeur": p.distributeur, "prix": p.prix,
+            "lien": f"C:/Fiches/{p.nom}.docx", "notes": p.notes,
+        })
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump(entrees, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+hydratation.py — Micro-mesure : lignes SQLite → objets Plante
+==============================================================
+  python -m bench.hydratation [--lignes 100000] [--graine 42]
+
+Compare, sur les mêmes lignes déjà lues (seule l'hydratation est
+chronométrée) :
+  avant → l'ancienne méthode : sqlite3.Row, creer_plante() puis un setattr
+          par champ, recherche des colonnes par nom
+  après → les hydrateurs compilés de database.py (tuple, un seul appel
+          au constructeur)
+et vérifie que les deux produisent des objets identiques.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+import database
+from bench import generateur
+from models import creer_plante
+
+REPETITIONS = 5
+
+
+# ── Référence : hydratation d'origine (avant les hydrateurs compilés) ─────────
+
+def _ancien_row_to_plante(row_base, row_spec, type_: str):
+    obj = creer_plante(type_)
+    obj.id = row_base["id"]
+    for champ in database.CHAMPS_COMMUNS:
+        setattr(obj, champ, row_base[champ])
+    obj.bio = bool(row_base["bio"])
+    if row_spec:
+        for champ in database.CHAMPS_SPECIFIQUES.get(type_, []):
+            val = row_spec[champ]
+            if champ == "vivace":
+                val = bool(val)
+            setattr(obj, champ, val)
+    return obj
+
+
+def _ancien_row_joint_to_plante(row):
+    t = row["type"]
+    row_spec = None
+    if t in database.TABLE_SPECIFIQUE and row[f"{t}__plante_id"] is not None:
+        row_spec = {ch: row[f"{t}__{ch}"] for ch in database.CHAMPS_SPECIFIQUES[t]}
+    return _ancien_row_to_plante(row, row_spec, t)
+
+
+# ── Données ───────────────────────────────────────────────────────────────────
+
+def _lignes(nb: int, graine: int) -> sqlite3.Connection:
+    """
+    Base en mémoire d'une seule table dont les colonnes sont celles de
+    SQL_SELECT_COMPLET (mêmes noms, même ordre) : `SELECT *` y produit des
+    lignes identiques à celles de la vraie requête jointe.
+    """
+    conn = sqlite3.connect(":memory:")
+    noms = database.NOMS_COMPLETS
+    conn.execute(f"CREATE TABLE lignes ({', '.join(noms)})")
+
+    def ligne(i, p):
+        valeurs = {"id": i, "type": p.TYPE, **p.to_dict(), f"{p.TYPE}__plante_id": i}
+        valeurs.update({f"{p.TYPE}__{ch}": getattr(p, ch)
+                        for ch in database.CHAMPS_SPECIFIQUES[p.TYPE]})
+        return [valeurs.get(nom) for nom in noms]
+
+    with conn:
+        conn.executemany(f"INSERT INTO lignes VALUES ({', '.join('?' * len(noms))})",
+                         (ligne(i + 1, p) for i, p in
+                          enumerate(generateur.generer_plantes(nb, graine))))
+    return conn
+
+
+def _mesurer(hydrater, lignes) -> float:
+    """Meilleur temps (secondes) sur REPETITIONS passes."""
+    meilleur = float("inf")
+    for _ in range(REPETITIONS):
+        t0 = time.perf_counter()
+        for row in lignes:
+            hydrater(row)
+        meilleur = min(meilleur, time.perf_counter() - t0)
+    return meilleur
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.hydratation")
+    parser.add_argument("--lignes", type=int, default=100_000)
+    parser.add_argument("--graine", type=int, default=42)
+    options = parser.parse_args(argv)
+
+    print(f"🧪 {options.lignes} lignes synthétiques…")
+    conn = _lignes(options.lignes, options.graine)
+    conn.row_factory = sqlite3.Row
+    lignes_row = conn.execute("SELECT * FROM lignes").fetchall()
+    conn.row_factory = None
+    lignes_tuple = conn.execute("SELECT * FROM lignes").fetchall()
+    conn.close()
+
+    differentes = sum(_ancien_row_joint_to_plante(a) != database._row_joint_to_plante(b)
+                      for a, b in zip(lignes_row, lignes_tuple))
+    if differentes:
+        sys.exit(f"❌ {differentes} objet(s) différent(s) entre les deux méthodes")
+
+    avant = _mesurer(_ancien_row_joint_to_plante, lignes_row)
+    apres = _mesurer(database._row_joint_to_plante, lignes_tuple)
+    for nom, duree in (("avant (setattr)", avant), ("après (compilé)", apres)):
+        print(f"  {nom:<18} {duree * 1000:>9.1f} ms   {options.lignes / duree:>12,.0f} lignes/s")
+    print(f"  → × {avant / apres:.1f}")
+
+
+if __name__ == "__main__":
+    main()
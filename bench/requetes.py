@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+requetes.py — Micro-mesure : requêtes SQL d'un sauvegarder_plante
+==================================================================
+  python -m bench.requetes [--plantes 1000] [--graine 42]
+
+Compte (connexions chronométrées de database.py, voir MESURE_SQL) et
+chronomètre les requêtes exécutées pour enregistrer une plante, en insertion
+puis en mise à jour :
+  avant → l'ancienne méthode : INSERT ou UPDATE construit à chaque appel,
+          puis SELECT sur la table spécifique pour choisir entre UPDATE et
+          INSERT
+  après → database.sauvegarder_plante : deux UPSERT précompilés
+(seuls les execute() comptent : ni le commit, ni les requêtes internes des
+triggers FTS ; les deux méthodes incrémentent le compteur de révision de la
+même façon) et vérifie que les deux produisent des plantes identiques.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+import database
+from bench import generateur
+
+PHASES = {"insertion": "insertion", "mise_a_jour": "mise à jour"}
+
+
+# ── Référence : sauvegarde d'origine (avant les UPSERT) ───────────────────────
+
+def _ancien_sauvegarder_plante(obj) -> int:
+    with database.connexion() as conn:
+        c = conn.cursor()
+        communs = {ch: getattr(obj, ch) for ch in database.CHAMPS_COMMUNS}
+        communs["bio"] = int(obj.bio)
+
+        if obj.id is None:
+            cols = ", ".join(["type"] + list(communs.keys()))
+            placeholders = ", ".join(["?"] * (1 + len(communs)))
+            c.execute(f"INSERT INTO plantes ({cols}) VALUES ({placeholders})",
+                      [obj.TYPE] + list(communs.values()))
+            plante_id = c.lastrowid
+        else:
+            plante_id = obj.id
+            set_clause = ", ".join(f"{k}=?" for k in communs)
+            c.execute(f"UPDATE plantes SET {set_clause} WHERE id=?",
+                      list(communs.values()) + [plante_id])
+
+        table = database.TABLE_SPECIFIQUE.get(obj.TYPE)
+        if table:
+            spec = {ch: int(getattr(obj, ch, False)) if ch == "vivace" else getattr(obj, ch, "")
+                    for ch in database.CHAMPS_SPECIFIQUES[obj.TYPE]}
+            existing = c.execute(f"SELECT plante_id FROM {table} WHERE plante_id=?",
+                                 (plante_id,)).fetchone()
+            if existing:
+                set_clause = ", ".join(f"{k}=?" for k in spec)
+                c.execute(f"UPDATE {table} SET {set_clause} WHERE plante_id=?",
+                          list(spec.values()) + [plante_id])
+            else:
+                cols = "plante_id, " + ", ".join(spec.keys())
+                placeholders = ", ".join(["?"] * (1 + len(spec)))
+                c.execute(f"INSERT INTO {table} ({cols}) VALUES ({placeholders})",
+                          [plante_id] + list(spec.values()))
+        database._marquer_modification(conn)
+    database.invalider_cache()
+    return plante_id
+
+
+# ── Mesure ────────────────────────────────────────────────────────────────────
+
+def _mesurer(sauvegarder, plantes: list) -> dict:
+    """
+    Insère puis met à jour chaque plante ; retourne, pour chaque phase, le
+    nombre de requêtes par plante et le temps total, ainsi que les ids.
+    """
+    compte = [0]
+
+    def compter(duree: float, nouvelle: bool):
+        compte[0] += nouvelle
+
+    database.MESURE_SQL = compter
+    database.fermer_pool()   # seules les nouvelles connexions sont chronométrées
+    resultats = {}
+    try:
+        for phase in PHASES:
+            compte[0] = 0
+            t0 = time.perf_counter()
+            for p in plantes:
+                p.id = sauvegarder(p)
+            resultats[phase] = (compte[0] / len(plantes), time.perf_counter() - t0)
+    finally:
+        database.MESURE_SQL = None
+        database.fermer_pool()
+    resultats["ids"] = [p.id for p in plantes]
+    return resultats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.requetes")
+    parser.add_argument("--plantes", type=int, default=1000)
+    parser.add_argument("--graine", type=int, default=42)
+    options = parser.parse_args(argv)
+
+    ancien_chemin = database.DB_PATH
+    mesures, plantes = {}, {}
+    with tempfile.TemporaryDirectory(prefix="herbier_requetes_") as dossier:
+        try:
+            for nom, sauvegarder in (("avant", _ancien_sauvegarder_plante),
+                                     ("après", database.sauvegarder_plante)):
+                database.DB_PATH = os.path.join(dossier, f"{nom}.db")
+                database.invalider_cache()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    database.init_db()
+                lot = list(generateur.generer_plantes(options.plantes, options.graine))
+                mesures[nom] = _mesurer(sauvegarder, lot)
+                plantes[nom] = [database.get_plante(id_) for id_ in mesures[nom]["ids"]]
+                database.fermer_pool()
+        finally:
+            database.DB_PATH = ancien_chemin
+            database.invalider_cache()
+
+    if plantes["avant"] != plantes["après"]:
+        sys.exit("❌ Plantes différentes entre les deux méthodes")
+
+    print(f"🧪 sauvegarder_plante, {options.plantes} plantes (requêtes par plante, temps total) :")
+    for phase, libelle in PHASES.items():
+        for nom in ("avant", "après"):
+            nb, duree = mesures[nom][phase]
+            print(f"  {libelle:<12} {nom:<6} {nb:>4.1f} requêtes   {duree * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
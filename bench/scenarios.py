@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+scenarios.py — Scénarios chronométrés et comparaison de résultats
+==================================================================
+Chaque scénario est une fonction appelée en boucle (au moins REPETITIONS_MIN
+fois, et au moins DUREE_MIN secondes) ; on garde la durée de chaque appel.
+Les scénarios « froids » vident le cache d'objets avant chaque appel pour
+mesurer la base elle-même.
+"""
+
+import contextlib
+import io
+import os
+import random
+import shutil
+import statistics
+import time
+
+import database
+import extract_fiches
+import migrate
+
+REPETITIONS_MIN = 3
+REPETITIONS_MAX = 2_000
+DUREE_MIN = 0.5          # secondes de mesure par scénario (hors préparation)
+
+
+class Contexte:
+    """Données partagées par les scénarios d'une exécution."""
+
+    def __init__(self, dossier: str, base: str, fiches: list[str], json_ancien: str,
+                 graine: int = 42):
+        self.dossier = dossier          # dossier de travail (temporaire)
+        self.base = base                # copie de la base synthétique
+        self.fiches = fiches            # fiches .docx générées (dans fiches/A_traiter/)
+        self.json_ancien = json_ancien  # herbier_data.json synthétique
+        self.rng = random.Random(graine)
+        with database.connexion() as conn:
+            self.ids = [r[0] for r in conn.execute("SELECT id FROM plantes")]
+
+
+def _silencieux(fonction, *args, **kwargs):
+    """Appelle fonction en masquant ses print (extraction, migration)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fonction(*args, **kwargs)
+
+
+# ── Scénarios ─────────────────────────────────────────────────────────────────
+# Chaque fabrique reçoit le Contexte et retourne la fonction à chronométrer.
+
+def _lister(froid: bool, **filtres):
+    def fabrique(ctx):
+        def appel():
+            if froid:
+                database.invalider_cache()
+            database.lister_plantes(**filtres)
+        return appel
+    return fabrique
+
+
+def _get_plante(ctx):
+    def appel():
+        database.invalider_cache()
+        database.get_plante(ctx.rng.choice(ctx.ids))
+    return appel
+
+
+def _sauvegarder_plante(ctx):
+    def appel():
+        p = database.get_plante(ctx.rng.choice(ctx.ids))
+        p.notes += " (modifiée)"
+        database.sauvegarder_plante(p)
+    return appel
+
+
+def _journal_global(**filtres):
+    def fabrique(ctx):
+        return lambda: database.get_journal_global(**filtres)
+    return fabrique
+
+
+def _extraire_fiche(ctx):
+    return lambda: _silencieux(extract_fiches.extraire_fiche, ctx.rng.choice(ctx.fiches))
+
+
+def _importer_dossier(nb_workers):
+    def fabrique(ctx):
+        dossier_fiches = os.path.dirname(os.path.dirname(ctx.fiches[0]))
+        return lambda: _silencieux(extract_fiches.importer_dossier, dossier_fiches, nb_workers)
+    return fabrique
+
+
+def _migrer(ctx):
+    def appel():
+        # Base neuve à chaque appel : la migration est un import initial
+        base_migration = os.path.join(ctx.dossier, "migration.db")
+        for suffixe in ("", "-wal", "-shm"):
+            if os.path.exists(base_migration + suffixe):
+                os.remove(base_migration + suffixe)
+        ancien = database.DB_PATH, migrate.JSON_PATH
+        database.DB_PATH, migrate.JSON_PATH = base_migration, ctx.json_ancien
+        try:
+            _silencieux(migrate.migrer)
+        finally:
+            database.fermer_pool()
+            database.invalider_cache()
+            database.DB_PATH, migrate.JSON_PATH = ancien
+    return appel
+
+
+# nom → fabrique ; l'ordre est celui de l'exécution
+SCENARIOS = {
+    "lister_plantes_page":        _lister(True, limite=50),
+    "lister_plantes_page_chaud":  _lister(False, limite=50),
+    "lister_plantes_type":        _lister(True, type_filtre="he", limite=50),
+    "lister_plantes_recherche":   _lister(True, recherche="calmante", limite=50),
+    "lister_plantes_tout":        _lister(True),
+    "lister_resumes_page":        _lister(True, limite=50, colonnes=database.COLONNES_LISTE),
+    "lister_resumes_tout":        _lister(True, colonnes=database.COLONNES_LISTE),
+    "get_plante":                 _get_plante,
+    "sauvegarder_plante":         _sauvegarder_plante,
+    "get_journal_global_page":    _journal_global(limite=100),
+    "get_journal_global_filtre":  _journal_global(date_debut="2023-01-01", date_fin="2023-03-31",
+                                                  type_filtre="he", limite=100),
+    "get_journal_global_tout":    _journal_global(),
+    "extraire_fiche":             _extraire_fiche,
+    "importer_dossier":           _importer_dossier(1),
+    "importer_dossier_parallele": _importer_dossier(None),
+    "migrate_migrer":             _migrer,
+}
+
+
+def chronometrer(appel) -> dict:
+    """Appelle `appel` en boucle et retourne les statistiques (secondes)."""
+    durees = []
+    debut = time.perf_counter()
+    while len(durees) < REPETITIONS_MIN or (
+            time.perf_counter() - debut < DUREE_MIN and len(durees) < REPETITIONS_MAX):
+        t0 = time.perf_counter()
+        appel()
+        durees.append(time.perf_counter() - t0)
+    durees.sort()
+    return {
+        "repetitions": len(durees),
+        "min":         durees[0],
+        "mediane":     statistics.median(durees),
+        "p95":         durees[min(len(durees) - 1, int(len(durees) * .95))],
+        "moyenne":     statistics.fmean(durees),
+        "par_seconde": len(durees) / sum(durees) if sum(durees) else None,
+    }
+
+
+def executer(ctx: Contexte, noms: list[str] | None = None, afficher=print) -> dict:
+    """Exécute les scénarios demandés (tous par défaut) ; retourne {nom: stats}."""
+    resultats = {}
+    for nom, fabrique in SCENARIOS.items():
+        if noms and not any(n in nom for n in noms):
+            continue
+        database.invalider_cache()
+        stats = chronometrer(fabrique(ctx))
+        resultats[nom] = stats
+        afficher(f"  {nom:<28} médiane {stats['mediane'] * 1000:>10.3f} ms   "
+                 f"p95 {stats['p95'] * 1000:>10.3f} ms   ({stats['repetitions']} appels)")
+    return resultats
+
+
+def comparer(avant: dict, apres: dict, seuil: float = 10.0) -> tuple[list[str], list[str]]:
+    """
+    Compare deux fichiers de résultats (médianes).
+    Retourne (lignes du rapport, noms des scénarios plus lents de plus de `seuil` %).
+    """
+    lignes = [f"{'scénario':<28} {'avant (ms)':>12} {'après (ms)':>12} {'écart':>9}"]
+    regressions = []
+    for nom in sorted(set(avant["scenarios"]) | set(apres["scenarios"])):
+        a, b = avant["scenarios"].get(nom), apres["scenarios"].get(nom)
+        if not a or not b:
+            cols = ["—" if not r else f"{r['mediane'] * 1000:.3f}" for r in (a, b)]
+            lignes.append(f"{nom:<28} {cols[0]:>12} {cols[1]:>12}")
+            continue
+        ecart = (b["mediane"] - a["mediane"]) / a["mediane"] * 100
+        marque = "  ⚠" if ecart > seuil else ("  ✓" if ecart < -seuil else "")
+        if ecart > seuil:
+            regressions.append(nom)
+        lignes.append(f"{nom:<28} {a['mediane'] * 1000:>12.3f} {b['mediane'] * 1000:>12.3f} "
+                      f"{ecart:>+8.1f}%{marque}")
+    return lignes, regressions
+
+
+def copier_base(source: str, destination: str):
+    """Copie une base SQLite (fichier principal seulement : la source est fermée)."""
+    shutil.copyfile(source, destination)
@@ -7,14 +7,28 @@ Responsabilités :
   - CRUD complet pour Plante et EntreeJournal
   - Requêtes de recherche et de filtrage
 
-Une seule connexion par appel (sqlite3 thread-safe en mode WAL).
+Les connexions SQLite sont ouvertes une seule fois puis recyclées par un
+pool (PRAGMA appliqués à l'ouverture). Toutes les fonctions passent par le
+context manager connexion().
 """
 
+import atexit
+import base64
+import copy
+import functools
+import json
+import queue
 import sqlite3
 import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterable, Iterator
 from models import (
     Plante, PlanteBrute, Complement, HuileEssentielle, PlanteJardin,
-    EntreeJournal, creer_plante
+    EntreeJournal, CLASSES_MAP
 )
 
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "herbier.db")
@@ -24,25 +38,266 @@ DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "herbier.db")
 # CONNEXION
 # ══════════════════════════════════════════════════════════════════════════════
 
-def get_conn():
-    """Retourne une connexion SQLite avec Row factory (accès par nom de colonne)."""
-    conn = sqlite3.connect(DB_PATH)
+# PRAGMA appliqués une seule fois, à l'ouverture de chaque connexion du pool
+PRAGMAS = {
+    "journal_mode": "WAL",       # meilleure concurrence lecteurs / écrivain
+    "foreign_keys": "ON",        # intégrité référentielle (CASCADE)
+    "busy_timeout": 5000,        # ms d'attente si la base est verrouillée
+    "synchronous":  "NORMAL",    # suffisant en WAL, beaucoup moins de fsync
+    "cache_size":   -20000,      # ~20 Mo de cache de pages par connexion
+    "mmap_size":    268435456,   # 256 Mo lus via mmap
+}
+
+POOL_TAILLE = 5          # nombre max de connexions ouvertes simultanément
+POOL_ATTENTE = 30        # secondes d'attente max pour obtenir une connexion
+TRACE_SQL = None         # fonction(sql) appelée pour chaque requête (outils de diagnostic)
+MESURE_SQL = None        # fonction(duree, nouvelle_requete) : chronométrage (voir metriques.py)
+SUIVI_PLANTES = None     # fonction(revision, ids_ecrits, ids_supprimes) : après chaque écriture
+                         # (index des suggestions, voir suggestions.py)
+
+
+class _CurseurMesure(sqlite3.Cursor):
+    """
+    Curseur chronométré : l'exécution d'une requête et chaque appel fetch*
+    sont mesurés et transmis à MESURE_SQL (nouvelle_requete=True pour
+    l'exécution, False pour la lecture des résultats).
+    L'itération ligne à ligne n'est pas chronométrée (un appel de
+    perf_counter par ligne coûtait 10 à 25 % d'une longue liste) : les
+    lectures de ce module passent par fetchall / fetchmany.
+    """
+
+    def _mesurer(self, methode, nouvelle: bool, *args):
+        debut = time.perf_counter()
+        try:
+            return methode(self, *args)
+        finally:
+            if MESURE_SQL is not None:
+                MESURE_SQL(time.perf_counter() - debut, nouvelle)
+
+    def execute(self, *args):
+        return self._mesurer(sqlite3.Cursor.execute, True, *args)
+
+    def executemany(self, *args):
+        return self._mesurer(sqlite3.Cursor.executemany, True, *args)
+
+    def fetchone(self):
+        return self._mesurer(sqlite3.Cursor.fetchone, False)
+
+    def fetchmany(self, *args):
+        return self._mesurer(sqlite3.Cursor.fetchmany, False, *args)
+
+    def fetchall(self):
+        return self._mesurer(sqlite3.Cursor.fetchall, False)
+
+
+class _ConnexionMesuree(sqlite3.Connection):
+    """Connexion dont toutes les requêtes passent par un _CurseurMesure."""
+
+    def cursor(self, factory=_CurseurMesure):
+        return super().cursor(factory)
+
+    # Les raccourcis de sqlite3.Connection n'appellent pas cursor() : on les redirige
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+
+def _ouvrir_connexion(chemin: str) -> sqlite3.Connection:
+    """Nouvelle connexion configurée (PRAGMAS, chronométrage, trace)."""
+    # Connexions chronométrées seulement si un collecteur est branché
+    classe = _ConnexionMesuree if MESURE_SQL is not None else sqlite3.Connection
+    conn = sqlite3.connect(chemin, check_same_thread=False, factory=classe)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")   # meilleure concurrence
-    conn.execute("PRAGMA foreign_keys=ON")    # intégrité référentielle
+    for nom, valeur in PRAGMAS.items():
+        conn.execute(f"PRAGMA {nom}={valeur}")
+    if TRACE_SQL is not None:
+        conn.set_trace_callback(TRACE_SQL)
     return conn
 
 
+class PoolConnexions:
+    """
+    Pool de connexions SQLite réutilisables.
+    Les connexions sont créées à la demande (jusqu'à `taille`), puis
+    rendues au pool après usage au lieu d'être fermées.
+    """
+
+    def __init__(self, chemin: str, taille: int = POOL_TAILLE):
+        self.chemin = chemin
+        self.taille = taille
+        self._libres: queue.LifoQueue = queue.LifoQueue()
+        self._nb_ouvertes = 0
+        self._verrou = threading.Lock()
+
+    def _ouvrir(self) -> sqlite3.Connection:
+        return _ouvrir_connexion(self.chemin)
+
+    def acquerir(self) -> sqlite3.Connection:
+        """Retourne une connexion libre, en ouvre une nouvelle ou attend."""
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            pass
+        with self._verrou:
+            if self._nb_ouvertes < self.taille:
+                self._nb_ouvertes += 1
+                ouvrir = True
+            else:
+                ouvrir = False
+        if ouvrir:
+            try:
+                return self._ouvrir()
+            except Exception:
+                with self._verrou:
+                    self._nb_ouvertes -= 1
+                raise
+        try:
+            return self._libres.get(timeout=POOL_ATTENTE)
+        except queue.Empty:
+            raise RuntimeError(f"Aucune connexion SQLite libre après {POOL_ATTENTE}s") from None
+
+    def liberer(self, conn: sqlite3.Connection):
+        """Rend une connexion au pool (annule toute transaction restée ouverte)."""
+        if conn.in_transaction:
+            conn.rollback()
+        self._libres.put(conn)
+
+    def fermer(self):
+        """Ferme toutes les connexions libres du pool."""
+        while True:
+            try:
+                conn = self._libres.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._verrou:
+                self._nb_ouvertes -= 1
+
+
+_pool: PoolConnexions | None = None
+_pool_verrou = threading.Lock()
+_local = threading.local()   # connexion en cours d'usage par le thread
+
+
+def get_pool() -> PoolConnexions:
+    """Retourne le pool courant (recréé si DB_PATH a changé)."""
+    global _pool
+    with _pool_verrou:
+        if _pool is None or _pool.chemin != DB_PATH:
+            if _pool is not None:
+                _pool.fermer()
+            _pool = PoolConnexions(DB_PATH, POOL_TAILLE)
+        return _pool
+
+
+def fermer_pool():
+    """Ferme toutes les connexions du pool (arrêt de l'application)."""
+    global _pool
+    with _pool_verrou:
+        if _pool is not None:
+            _pool.fermer()
+            _pool = None
+
+atexit.register(fermer_pool)
+
+
+@contextmanager
+def connexion():
+    """
+    Fournit une connexion du pool :
+      with connexion() as conn:
+          conn.execute(...)
+    Commit à la sortie si tout s'est bien passé, rollback sinon.
+    Réentrant : un appel imbriqué dans le même thread réutilise la même
+    connexion (et la même transaction).
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        yield conn
+        return
+
+    pool = get_pool()
+    conn = pool.acquerir()
+    _local.conn = conn
+    _local.signaux = []
+    try:
+        yield conn
+        if conn.in_transaction:
+            conn.commit()
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    else:
+        signaux = _local.signaux
+    finally:
+        _local.conn = None
+        _local.signaux = None
+        pool.liberer(conn)
+    # Écritures validées : signalées seulement maintenant (voir _signaler)
+    for signal in signaux:
+        _signaler(*signal)
+
+
+@contextmanager
+def _connexion_flux():
+    """
+    Connexion de lecture dédiée à un flux (iterer_plantes, export), ouverte
+    hors du pool et fermée à la fin du flux : un client lent qui télécharge
+    une longue réponse n'immobilise pas une connexion dont les autres
+    requêtes ont besoin.
+    """
+    conn = _ouvrir_connexion(DB_PATH)
+    try:
+        conn.execute("PRAGMA query_only=ON")
+        yield conn
+    finally:
+        conn.close()
+
+
+def init_app(app):
+    """
+    Lie le pool au cycle de vie de l'application Flask.
+    Configuration lue dans app.config :
+      HERBIER_DB_PATH    → chemin de la base (défaut : herbier.db)
+      HERBIER_POOL_SIZE  → taille du pool (défaut : POOL_TAILLE)
+    """
+    global DB_PATH, POOL_TAILLE
+    DB_PATH = app.config.get("HERBIER_DB_PATH", DB_PATH)
+    POOL_TAILLE = int(app.config.get("HERBIER_POOL_SIZE", POOL_TAILLE))
+    fermer_pool()
+
+    @app.teardown_appcontext
+    def _liberer_connexion(exc):
+        # Filet de sécurité : une connexion ne survit jamais à la requête
+        conn = getattr(_local, "conn", None)
+        if conn is not None:
+            _local.conn = None
+            get_pool().liberer(conn)
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # INITIALISATION DES TABLES
 # ══════════════════════════════════════════════════════════════════════════════
 
 def init_db():
     """
-    Crée toutes les tables si elles n'existent pas encore.
+    Met le schéma à jour (migrations versionnées, voir MIGRATIONS) puis
+    (re)crée l'index plein texte et ses triggers.
     Appelée au démarrage de l'application Flask.
     """
-    conn = get_conn()
+    with connexion() as conn:
+        appliquer_migrations(conn)
+        # Index plein texte (FTS5) + triggers de synchronisation
+        if FTS_DISPONIBLE:
+            _creer_index_recherche(conn)
+    print("✅ Base de données initialisée.")
+
+
+def _creer_tables(conn: sqlite3.Connection):
+    """Exécute les CREATE TABLE IF NOT EXISTS."""
     c = conn.cursor()
 
     # Table principale — champs communs à tous les types
@@ -133,9 +388,113 @@ def init_db():
         notes      TEXT    DEFAULT ''
     )""")
 
-    conn.commit()
-    conn.close()
-    print("✅ Base de données initialisée.")
+    # Compteur global de modifications (ETag / Last-Modified côté Flask)
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS revision (
+        id          INTEGER PRIMARY KEY CHECK (id = 1),   -- une seule ligne
+        numero      INTEGER NOT NULL DEFAULT 0,
+        modifie_le  REAL    NOT NULL DEFAULT 0            -- timestamp Unix
+    )""")
+    c.execute("INSERT OR IGNORE INTO revision (id, numero, modifie_le) "
+              "VALUES (1, 0, (julianday('now') - 2440587.5) * 86400.0)")
+
+    # Manifeste des fiches .docx importées (import incrémental)
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS fiches_importees (
+        nom_fichier  TEXT    PRIMARY KEY,   -- nom du .docx (unique dans fiches/)
+        chemin       TEXT    NOT NULL,      -- emplacement actuel du fichier
+        taille       INTEGER NOT NULL,
+        mtime        REAL    NOT NULL,
+        empreinte    TEXT    NOT NULL,      -- SHA-256 du contenu
+        plante_id    INTEGER REFERENCES plantes(id) ON DELETE SET NULL,
+        date_import  TEXT    NOT NULL
+    )""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_fiches_importees_empreinte "
+              "ON fiches_importees(empreinte)")
+
+
+def _indexer_journal(conn: sqlite3.Connection):
+    """Journal d'une plante trié par date, et journal global trié par date."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_journal_plante_date ON journal(plante_id, date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_journal_date ON journal(date)")
+
+
+def _indexer_plantes(conn: sqlite3.Connection):
+    """Liste triée par nom, avec ou sans filtre de type (le rowid complète la clé)."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_plantes_type_nom "
+                 "ON plantes(type, nom COLLATE NOCASE)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_plantes_nom ON plantes(nom COLLATE NOCASE)")
+
+
+def _creer_indexation_differee(conn: sqlite3.Connection):
+    """Drapeau (0 ou 1 ligne) qui suspend les triggers FTS, voir indexation_differee()."""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS indexation_differee (
+        actif INTEGER PRIMARY KEY CHECK (actif = 1)
+    )""")
+
+
+def _creer_reprises_migration(conn: sqlite3.Connection):
+    """Point de reprise de migrate.py, par fichier JSON migré."""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS reprises_migration (
+        source      TEXT    PRIMARY KEY,         -- nom du fichier JSON
+        entrees     INTEGER NOT NULL,            -- entrées traitées (depuis le début du tableau)
+        dernier_id  TEXT,                        -- "id" ancien de la dernière entrée traitée
+        plantes     INTEGER NOT NULL DEFAULT 0,  -- plantes créées
+        erreurs     INTEGER NOT NULL DEFAULT 0,  -- entrées rejetées
+        mis_a_jour  TEXT    NOT NULL
+    )""")
+
+# ── Migrations ────────────────────────────────────────────────────────────────
+# Le numéro de version du schéma est stocké dans PRAGMA user_version.
+# Chaque migration est appliquée une seule fois, dans l'ordre, chacune dans sa
+# propre transaction. Pour faire évoluer le schéma : AJOUTER une entrée en fin
+# de liste (ne jamais modifier ni réordonner une migration déjà publiée).
+# La migration 1 reprend le schéma d'avant le versionnage : ses
+# CREATE TABLE IF NOT EXISTS sont sans effet sur une base existante.
+
+MIGRATIONS = [
+    (1, "schéma initial",                         _creer_tables),
+    (2, "index journal (plante_id, date) et (date)", _indexer_journal),
+    (3, "index plantes (type, nom) et (nom)",     _indexer_plantes),
+    (4, "table indexation_differee (FTS en lot)", _creer_indexation_differee),
+    (5, "table reprises_migration (migrate.py)",  _creer_reprises_migration),
+]
+
+
+def version_schema(conn: sqlite3.Connection) -> int:
+    """Retourne la version du schéma de la base (PRAGMA user_version)."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def appliquer_migrations(conn: sqlite3.Connection) -> list[int]:
+    """
+    Applique les migrations dont le numéro dépasse la version de la base.
+    Retourne la liste des numéros appliqués.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    version = version_schema(conn)
+    derniere = MIGRATIONS[-1][0]
+    if version > derniere:
+        raise RuntimeError(f"Base en version {version}, plus récente que le code "
+                           f"(version {derniere}) : mettre l'application à jour.")
+    appliquees = []
+    for numero, description, migrer in MIGRATIONS:
+        if numero <= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            migrer(conn)
+            conn.execute(f"PRAGMA user_version = {int(numero)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"  ↳ migration {numero} : {description}")
+        appliquees.append(numero)
+    return appliquees
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -164,147 +523,934 @@ CHAMPS_COMMUNS = ["nom", "latin", "famille", "bio", "proprietes", "contre",
                   "interactions", "precautions", "distributeur", "prix",
                   "quantite", "stockage", "liens", "notes"]
 
-def _row_to_plante(row_base, row_spec, type_: str) -> Plante:
-    """Reconstruit un objet Plante à partir de deux lignes SQLite."""
-    obj = creer_plante(type_)
-    obj.id = row_base["id"]
-    for champ in CHAMPS_COMMUNS:
-        setattr(obj, champ, row_base[champ])
-    obj.bio = bool(row_base["bio"])
-    if row_spec:
-        for champ in CHAMPS_SPECIFIQUES.get(type_, []):
-            val = row_spec[champ]
-            if champ == "vivace":
-                val = bool(val)
-            setattr(obj, champ, val)
-    return obj
+# Requête de chargement complet : plantes + LEFT JOIN sur les 4 tables
+# spécifiques. Les colonnes spécifiques sont préfixées par le type
+# ("he__chemotype", "brute__partie"...) car plusieurs tables partagent
+# des noms de colonnes (partie, origine, posologie...).
+# Les colonnes sont listées explicitement (pas de p.*) : leur position est
+# connue d'avance, ce qui permet aux hydrateurs de lire de simples tuples.
+def _construire_select_complet() -> tuple[list[str], str, str]:
+    noms = ["id", "type"] + CHAMPS_COMMUNS
+    colonnes = [f"p.{nom}" for nom in noms]
+    jointures = []
+    for type_, table in TABLE_SPECIFIQUE.items():
+        alias = f"s_{type_}"
+        for ch in ["plante_id"] + CHAMPS_SPECIFIQUES[type_]:
+            noms.append(f"{type_}__{ch}")
+            colonnes.append(f"{alias}.{ch} AS {type_}__{ch}")
+        jointures.append(f"LEFT JOIN {table} {alias} ON {alias}.plante_id = p.id")
+    return noms, ", ".join(colonnes), " ".join(jointures)
+
+NOMS_COMPLETS, COLONNES_COMPLETES, JOINTURES_SPECIFIQUES = _construire_select_complet()
+SQL_SELECT_COMPLET = f"SELECT {COLONNES_COMPLETES} FROM plantes p {JOINTURES_SPECIFIQUES}"
+POSITION = {nom: i for i, nom in enumerate(NOMS_COMPLETS)}   # colonne → indice dans la ligne
+
+CHAMPS_BOOLEENS = {"bio", "vivace"}   # stockés en INTEGER 0/1
+
+
+# ── Hydrateurs ────────────────────────────────────────────────────────────────
+# Une fonction par type, générée une seule fois à l'import du module à partir
+# de CHAMPS_COMMUNS / CHAMPS_SPECIFIQUES (comme les requêtes d'écriture) :
+#   def hydrater(r):
+#       if r[<he__plante_id>] is None:           # ligne spécifique absente
+#           return HuileEssentielle(id=r[0], nom=r[2], ..., bio=bool(r[5]), ...)
+#       return HuileEssentielle(id=r[0], nom=r[2], ..., chemotype=r[..], ...)
+# Chaque plante est construite en un seul appel au constructeur, à partir
+# d'une ligne de SQL_SELECT_COMPLET lue comme tuple ou sqlite3.Row (accès par
+# position, sans recherche de colonne par nom).
+
+def _compiler_hydrateur(type_: str):
+    def valeur(colonne: str, champ: str) -> str:
+        lecture = f"r[{POSITION[colonne]}]"
+        return f"bool({lecture})" if champ in CHAMPS_BOOLEENS else lecture
+
+    communs = [f"id={valeur('id', 'id')}"] + [f"{ch}={valeur(ch, ch)}" for ch in CHAMPS_COMMUNS]
+    specifiques = [f"{ch}={valeur(f'{type_}__{ch}', ch)}" for ch in CHAMPS_SPECIFIQUES[type_]]
+    source = (f"def hydrater_{type_}(r):\n"
+              f"    if r[{POSITION[f'{type_}__plante_id']}] is None:\n"
+              f"        return cls({', '.join(communs)})\n"
+              f"    return cls({', '.join(communs + specifiques)})\n")
+    espace = {"cls": CLASSES_MAP[type_]}
+    exec(compile(source, f"<hydrateur {type_}>", "exec"), espace)
+    return espace[f"hydrater_{type_}"]
+
+HYDRATEURS = {type_: _compiler_hydrateur(type_) for type_ in TABLE_SPECIFIQUE}
+
+
+def _row_joint_to_plante(row) -> Plante:
+    """Reconstruit un objet Plante à partir d'une ligne de SQL_SELECT_COMPLET."""
+    hydrater = HYDRATEURS.get(row[1])
+    if hydrater is None:
+        raise ValueError(f"Type inconnu : {row[1]!r}. Valeurs valides : {list(HYDRATEURS)}")
+    return hydrater(row)
+
+
+def _curseur_tuples(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    """Curseur produisant des tuples (sans sqlite3.Row), pour les hydrateurs."""
+    curseur = conn.cursor()
+    curseur.row_factory = None
+    return curseur
 
 
 # ══════════════════════════════════════════════════════════════════════════════
-# CRUD PLANTES
+# RECHERCHE PLEIN TEXTE (FTS5)
 # ══════════════════════════════════════════════════════════════════════════════
+# Table virtuelle plantes_fts (rowid = plantes.id) indexant tous les champs
+# texte communs + une colonne "specifique" qui concatène les champs texte de
+# la table spécifique. Tokenizer unicode61 avec suppression des accents :
+# "cineole" trouve "cinéole". Synchronisée par triggers sur les 5 tables,
+# sauf pendant les écritures en lot (indexation_differee) : réindexation
+# groupée des plantes touchées, en fin de lot.
+
+def _fts5_disponible() -> bool:
+    """Vérifie que le SQLite embarqué par Python est compilé avec FTS5."""
+    try:
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        conn.close()
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+FTS_DISPONIBLE = _fts5_disponible()
+
+COLONNES_FTS = [ch for ch in CHAMPS_COMMUNS if ch != "bio"] + ["specifique"]
+
+# Poids bm25 par colonne (même ordre que COLONNES_FTS) : le nom compte le plus
+POIDS_FTS = {"nom": 10.0, "latin": 5.0, "famille": 2.0}
+
+# Marqueurs de surlignage renvoyés par snippet() (char(2) / char(3) en SQL)
+# — convertis en <mark> après échappement HTML côté Flask.
+SNIPPET_DEBUT = "\x02"
+SNIPPET_FIN   = "\x03"
+
+
+def _sql_texte_specifique() -> str:
+    """Expression SQL concaténant les champs texte de toutes les tables spécifiques."""
+    morceaux = []
+    for type_ in TABLE_SPECIFIQUE:
+        for ch in CHAMPS_SPECIFIQUES[type_]:
+            if ch != "vivace":
+                morceaux.append(f"coalesce(nullif(s_{type_}.{ch}, '') || ' ', '')")
+    return f"rtrim({' || '.join(morceaux)})"
+
+
+def _creer_index_recherche(conn: sqlite3.Connection):
+    """Crée la table FTS5, la vue source et les triggers ; remplit l'index si neuf."""
+    existe = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='plantes_fts'"
+    ).fetchone()
+
+    cols = ", ".join(COLONNES_FTS)
+    conn.execute(f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS plantes_fts USING fts5(
+        {cols},
+        tokenize = 'unicode61 remove_diacritics 2'
+    )""")
+
+    # Vue source : une ligne par plante, texte prêt à indexer
+    communs = ", ".join(f"p.{ch}" for ch in COLONNES_FTS if ch != "specifique")
+    conn.execute("DROP VIEW IF EXISTS v_plantes_fts")
+    conn.execute(f"""
+    CREATE VIEW v_plantes_fts AS
+    SELECT p.id, {communs}, {_sql_texte_specifique()} AS specifique
+    FROM plantes p {JOINTURES_SPECIFIQUES}""")
+
+    def reindexer(expr_id: str) -> str:
+        return (f"WHEN NOT EXISTS (SELECT 1 FROM indexation_differee) BEGIN "
+                f"DELETE FROM plantes_fts WHERE rowid = {expr_id}; "
+                f"INSERT INTO plantes_fts(rowid, {cols}) "
+                f"SELECT id, {cols} FROM v_plantes_fts WHERE id = {expr_id}; END")
 
-def lister_plantes(type_filtre: str = None, recherche: str = None) -> list[Plante]:
+    # La suppression d'une plante retire toujours sa ligne, même en indexation différée
+    triggers = {
+        "plantes_fts_ai": f"AFTER INSERT ON plantes {reindexer('new.id')}",
+        "plantes_fts_au": f"AFTER UPDATE ON plantes {reindexer('new.id')}",
+        "plantes_fts_ad": "AFTER DELETE ON plantes BEGIN "
+                          "DELETE FROM plantes_fts WHERE rowid = old.id; END",
+    }
+    for type_, table in TABLE_SPECIFIQUE.items():
+        triggers[f"{table}_fts_ai"] = f"AFTER INSERT ON {table} {reindexer('new.plante_id')}"
+        triggers[f"{table}_fts_au"] = f"AFTER UPDATE ON {table} {reindexer('new.plante_id')}"
+        triggers[f"{table}_fts_ad"] = f"AFTER DELETE ON {table} {reindexer('old.plante_id')}"
+    for nom, corps in triggers.items():
+        conn.execute(f"DROP TRIGGER IF EXISTS {nom}")
+        conn.execute(f"CREATE TRIGGER {nom} {corps}")
+
+    if not existe:
+        reconstruire_index_recherche()
+
+
+def reconstruire_index_recherche():
+    """Vide et reconstruit entièrement l'index plein texte."""
+    cols = ", ".join(COLONNES_FTS)
+    with connexion() as conn:
+        conn.execute("DELETE FROM plantes_fts")
+        conn.execute(f"INSERT INTO plantes_fts(rowid, {cols}) "
+                     f"SELECT id, {cols} FROM v_plantes_fts")
+    invalider_cache()
+
+
+@contextmanager
+def indexation_differee(conn: sqlite3.Connection):
     """
-    Retourne toutes les plantes, avec filtres optionnels.
-    type_filtre : "brute" | "complement" | "he" | "jardin" | None
-    recherche   : texte libre cherché dans nom, latin, proprietes
+    Suspend la mise à jour de l'index plein texte par les triggers, le temps
+    d'une écriture en lot. Le bloc ajoute à la liste reçue les ids des
+    plantes écrites ; elles sont réindexées en une fois à la sortie.
+
+        with connexion() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            with indexation_differee(conn) as ids:
+                ...
+                ids.extend(nouveaux_ids)
+
+    À utiliser DANS une transaction : le drapeau est posé puis retiré par
+    cette même transaction, les autres connexions ne le voient jamais (et un
+    arrêt brutal l'annule avec le reste). Sans FTS5 : sans effet.
     """
-    conn = get_conn()
-    c = conn.cursor()
+    ids: list[int] = []
+    if not FTS_DISPONIBLE:
+        yield ids
+        return
+    conn.execute("INSERT OR IGNORE INTO indexation_differee (actif) VALUES (1)")
+    try:
+        yield ids
+    finally:
+        conn.execute("DELETE FROM indexation_differee")
+    _reindexer_plantes(conn, ids)
+
+
+def _reindexer_plantes(conn: sqlite3.Connection, ids: list[int]):
+    """Remplace les lignes FTS des plantes données (500 ids par requête)."""
+    cols = ", ".join(COLONNES_FTS)
+    ids = sorted(set(ids))
+    for debut in range(0, len(ids), 500):
+        morceau = ids[debut:debut + 500]
+        marques = ", ".join(["?"] * len(morceau))
+        conn.execute(f"DELETE FROM plantes_fts WHERE rowid IN ({marques})", morceau)
+        conn.execute(f"INSERT INTO plantes_fts(rowid, {cols}) "
+                     f"SELECT id, {cols} FROM v_plantes_fts WHERE id IN ({marques})", morceau)
+
+
+def requete_fts(recherche: str) -> str:
+    """
+    Convertit un texte libre en requête FTS5 : chaque mot devient un
+    préfixe entre guillemets ("lav"* "vraie"*), tous les mots sont requis.
+    Retourne "" si le texte ne contient aucun mot.
+    """
+    mots = re.findall(r"\w+", recherche)
+    return " ".join(f'"{mot}"*' for mot in mots)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# RÉVISION DE LA BASE
+# ══════════════════════════════════════════════════════════════════════════════
+# Compteur incrémenté, dans la même transaction, par chaque écriture sur les
+# plantes ou le journal. Sert à produire des ETag sans relire les données.
+
+def _marquer_modification(conn: sqlite3.Connection) -> int:
+    """
+    Incrémente le compteur de révision (à appeler dans la transaction
+    d'écriture). Retourne le nouveau numéro, à transmettre à _signaler().
+    """
+    row = conn.execute("UPDATE revision SET numero = numero + 1, "
+                       "modifie_le = (julianday('now') - 2440587.5) * 86400.0 "
+                       "WHERE id = 1 RETURNING numero").fetchone()
+    return row[0] if row else 0
+
+
+def _signaler(revision: int, ids_ecrits: Iterable[int] = (), ids_supprimes: Iterable[int] = ()):
+    """
+    Transmet une écriture validée à SUIVI_PLANTES (s'il est défini) : les
+    écritures sans effet sur les plantes (journal) sont signalées aussi,
+    pour que le suiveur sache qu'il n'a manqué aucune révision.
+    Appelée dans un connexion() englobant (transaction pas encore validée),
+    elle est différée jusqu'au commit de celui-ci, et oubliée en cas de
+    rollback : le suiveur ne voit jamais une écriture annulée.
+    """
+    if SUIVI_PLANTES is None:
+        return
+    if getattr(_local, "conn", None) is not None:
+        _local.signaux.append((revision, list(ids_ecrits), list(ids_supprimes)))
+        return
+    SUIVI_PLANTES(revision, list(ids_ecrits), list(ids_supprimes))
+
+
+def get_revision() -> tuple[int, float]:
+    """Retourne (numéro de révision, timestamp de la dernière modification)."""
+    with connexion() as conn:
+        row = conn.execute("SELECT numero, modifie_le FROM revision WHERE id = 1").fetchone()
+    return (row[0], row[1]) if row else (0, 0.0)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CACHE D'OBJETS (get_plante / lister_plantes)
+# ══════════════════════════════════════════════════════════════════════════════
+# Cache LRU en mémoire des plantes hydratées et des résultats de liste.
+# Invalidation :
+#   - explicite, par toutes les fonctions d'écriture de ce module ;
+#   - par PRAGMA data_version, lu sur une connexion témoin propre à chaque
+#     thread : il change dès qu'une autre connexion (autre processus, ex.
+#     migrate.py) a validé une écriture dans la base.
+# Les objets sont copiés à l'entrée et à la sortie du cache : l'appelant peut
+# les modifier sans polluer le cache.
+
+CACHE_TAILLE_PLANTES = 2000   # plantes mémorisées au maximum
+CACHE_TAILLE_LISTES  = 64     # résultats de liste mémorisés au maximum
+CACHE_LISTE_MAX      = 1000   # au-delà, une liste n'est pas mise en cache
+
+_ABSENT = object()
+
+
+class CacheLRU:
+    """Dictionnaire borné : l'entrée la moins récemment utilisée est évincée."""
+
+    def __init__(self, taille: int):
+        self.taille = taille
+        self._donnees: OrderedDict = OrderedDict()
+        self.succes = 0
+        self.echecs = 0
+
+    def lire(self, cle):
+        valeur = self._donnees.get(cle, _ABSENT)
+        if valeur is _ABSENT:
+            self.echecs += 1
+        else:
+            self.succes += 1
+            self._donnees.move_to_end(cle)
+        return valeur
+
+    def ecrire(self, cle, valeur):
+        self._donnees[cle] = valeur
+        self._donnees.move_to_end(cle)
+        while len(self._donnees) > self.taille:
+            self._donnees.popitem(last=False)
+
+    def vider(self):
+        self._donnees.clear()
+
+    def stats(self) -> dict:
+        return {"taille": len(self._donnees), "taille_max": self.taille,
+                "succes": self.succes, "echecs": self.echecs}
+
+
+_cache_plantes = CacheLRU(CACHE_TAILLE_PLANTES)
+_cache_listes = CacheLRU(CACHE_TAILLE_LISTES)
+_cache_verrou = threading.Lock()
+_cache_etat = {"generation": 0, "invalidations": 0}
+_temoins = threading.local()   # connexion témoin du thread (conn, chemin, version vue)
+
+
+def invalider_cache():
+    """Vide les caches (appelée après chaque écriture)."""
+    with _cache_verrou:
+        _cache_plantes.vider()
+        _cache_listes.vider()
+        _cache_etat["generation"] += 1
+        _cache_etat["invalidations"] += 1
+
+
+def _generation_cache() -> int:
+    """
+    Vérifie PRAGMA data_version sur la connexion témoin du thread et vide
+    les caches si la base a changé depuis la dernière vérification de ce
+    thread. Retourne la génération courante du cache.
+    Un témoin par thread : les lectures concurrentes ne se disputent ni une
+    connexion ni le verrou du cache (pris seulement pour invalider). La
+    première vérification d'un thread invalide par prudence.
+    """
+    temoin = getattr(_temoins, "conn", None)
+    if temoin is None or _temoins.chemin != DB_PATH:
+        if temoin is not None:
+            temoin.close()
+        temoin = _temoins.conn = sqlite3.connect(DB_PATH)
+        _temoins.chemin, _temoins.version = DB_PATH, None
+    version = temoin.execute("PRAGMA data_version").fetchone()[0]
+    if version != _temoins.version:
+        _temoins.version = version
+        invalider_cache()
+    return _cache_etat["generation"]
+
+
+def _cache_lire(cache: CacheLRU, cle):
+    with _cache_verrou:
+        return cache.lire(cle)
+
+
+def _cache_ecrire(cache: CacheLRU, cle, valeur, generation: int):
+    """Mémorise valeur, sauf si la base a changé depuis `generation` ou si le
+    thread est au milieu d'une transaction (données pas encore validées)."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and conn.in_transaction:
+        return
+    with _cache_verrou:
+        if _cache_etat["generation"] == generation:
+            cache.ecrire(cle, valeur)
+
+
+def stats_cache() -> dict:
+    """Compteurs du cache (succès / échecs / taille / invalidations)."""
+    with _cache_verrou:
+        return {"plantes": _cache_plantes.stats(), "listes": _cache_listes.stats(),
+                "invalidations": _cache_etat["invalidations"]}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# LISTES ALLÉGÉES (projection de colonnes)
+# ══════════════════════════════════════════════════════════════════════════════
+# Pour les listes (cartes de l'accueil, API avec ?fields=), on ne lit que
+# quelques colonnes de `plantes`, sans les jointures sur les tables
+# spécifiques ni les longs textes (contre, interactions, notes...).
+# Chaque ligne donne un PlanteResume ; un champ hors projection déclenche
+# le chargement de la plante complète (get_plante) au premier accès.
+
+LONGUEUR_APERCU = 200   # caractères de `proprietes` gardés pour l'aperçu des cartes
+
+# Colonnes projetables : nom → expression SQL
+EXPRESSIONS_RESUME = {ch: f"p.{ch}" for ch in CHAMPS_COMMUNS}
+EXPRESSIONS_RESUME["apercu"] = f"substr(p.proprietes, 1, {LONGUEUR_APERCU})"
+
+# Projection utilisée par la liste principale (index.html)
+COLONNES_LISTE = ("nom", "latin", "bio", "apercu", "quantite", "distributeur")
 
-    sql = "SELECT * FROM plantes WHERE 1=1"
+
+class PlanteResume:
+    """
+    Plante partielle issue d'une liste projetée : id, TYPE et les colonnes
+    demandées. Tout autre attribut est lu sur la plante complète, chargée
+    une seule fois au premier besoin (voir complete()).
+    """
+    __slots__ = ("id", "TYPE", "_extrait", "_complete", "_colonnes", *EXPRESSIONS_RESUME)
+
+    def __init__(self, id_: int, type_: str, colonnes: tuple[str, ...]):
+        self.id = id_
+        self.TYPE = type_
+        self._colonnes = colonnes
+        self._extrait = None
+        self._complete = None
+
+    def __getattr__(self, nom: str):
+        # Appelé seulement pour un attribut non renseigné : champ hors projection
+        if nom.startswith("_"):
+            raise AttributeError(nom)
+        if nom == "apercu":
+            return self.proprietes[:LONGUEUR_APERCU]
+        return getattr(self.complete(), nom)
+
+    def __copy__(self):
+        # copy.copy lirait tous les slots, donc chargerait la plante via __getattr__
+        copie = PlanteResume(self.id, self.TYPE, self._colonnes)
+        for ch in self._colonnes:
+            setattr(copie, ch, getattr(self, ch))
+        copie._extrait = self._extrait
+        return copie
+
+    def __repr__(self) -> str:
+        valeurs = ", ".join(f"{ch}={getattr(self, ch)!r}" for ch in self._colonnes)
+        return f"PlanteResume(id={self.id!r}, TYPE={self.TYPE!r}, {valeurs})"
+
+    def complete(self) -> Plante:
+        """Plante complète (requête à la base au premier appel seulement)."""
+        if self._complete is None:
+            self._complete = get_plante(self.id)
+            if self._complete is None:
+                raise AttributeError(f"plante {self.id} introuvable (supprimée ?)")
+        return self._complete
+
+    def to_dict(self) -> dict:
+        """Champs projetés seulement (pour l'API JSON)."""
+        d = {"TYPE": self.TYPE, "id": self.id}
+        for ch in self._colonnes:
+            d[ch] = getattr(self, ch)
+        return d
+
+
+def _normaliser_colonnes(colonnes: Iterable[str]) -> tuple[str, ...]:
+    """
+    Projection effective : nom toujours en premier (clé de tri, même position
+    que dans SQL_SELECT_COMPLET), sans doublons. ValueError si une colonne
+    n'est pas projetable.
+    """
+    colonnes = tuple(dict.fromkeys(["nom", *colonnes]))
+    inconnues = [c for c in colonnes if c not in EXPRESSIONS_RESUME]
+    if inconnues:
+        raise ValueError(f"Colonne(s) non projetable(s) : {inconnues}. "
+                         f"Valeurs valides : {list(EXPRESSIONS_RESUME)}")
+    return colonnes
+
+
+@functools.lru_cache(maxsize=64)
+def _hydrateur_resume(colonnes: tuple[str, ...]):
+    """
+    Hydrateur d'une projection (généré au premier usage, comme HYDRATEURS) :
+    ligne (id, type, colonnes...) → PlanteResume.
+    """
+    lignes = [f"def hydrater_resume(r):",
+              f"    o = cls(r[0], r[1], colonnes)"]
+    for i, ch in enumerate(colonnes, 2):
+        lecture = f"bool(r[{i}])" if ch in CHAMPS_BOOLEENS else f"r[{i}]"
+        lignes.append(f"    o.{ch} = {lecture}")
+    lignes.append("    return o")
+    espace = {"cls": PlanteResume, "colonnes": colonnes}
+    exec(compile("\n".join(lignes) + "\n", f"<hydrateur resume {colonnes}>", "exec"), espace)
+    return espace["hydrater_resume"]
+
+
+def _selection(colonnes: tuple[str, ...] | None) -> tuple[str, str, object, int]:
+    """
+    (colonnes SQL, jointures, hydrateur, nombre de colonnes) pour une liste
+    complète (colonnes=None) ou projetée.
+    """
+    if colonnes is None:
+        return COLONNES_COMPLETES, JOINTURES_SPECIFIQUES, _row_joint_to_plante, len(NOMS_COMPLETS)
+    select = ", ".join(["p.id", "p.type"] +
+                       [f"{EXPRESSIONS_RESUME[ch]} AS {ch}" for ch in colonnes])
+    return select, "", _hydrateur_resume(colonnes), len(colonnes) + 2
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CRUD PLANTES
+# ══════════════════════════════════════════════════════════════════════════════
+
+LIMITE_PAGE_MAX = 500   # taille de page maximale acceptée
+TAILLE_PAQUET_LECTURE = 1000   # lignes lues par fetchmany dans les lectures en flux
+
+
+def encoder_curseur(cle: tuple) -> str:
+    """Encode une clé de tri (nom, id) ou (score, id) en curseur opaque pour l'URL."""
+    return base64.urlsafe_b64encode(json.dumps(list(cle)).encode()).decode()
+
+
+def decoder_curseur(curseur: str | None) -> tuple | None:
+    """Décode un curseur produit par encoder_curseur (None si absent ou invalide)."""
+    if not curseur:
+        return None
+    try:
+        cle = json.loads(base64.urlsafe_b64decode(curseur.encode()))
+    except ValueError:
+        return None
+    if not isinstance(cle, list) or len(cle) != 2:
+        return None
+    # Seules des valeurs de clé de tri (texte, nombre) : jamais de liste, d'objet, de booléen
+    if any(isinstance(v, bool) or not isinstance(v, (str, int, float)) for v in cle):
+        return None
+    return tuple(cle)
+
+
+def _requete_liste(type_filtre: str = None, recherche: str = None, limite: int = None,
+                   apres: tuple = None, avant: tuple = None, decalage: int = 0,
+                   colonnes: tuple[str, ...] = None) -> tuple[str, list, bool] | None:
+    """
+    Construit la requête de liste : retourne (sql, params, fts), ou None si
+    la recherche ne contient aucun mot (aucun résultat possible).
+    colonnes : projection normalisée (voir _selection), None = plantes complètes.
+    Pagination par clé (keyset) : `apres` / `avant` sont la clé de tri de la
+    dernière / première ligne déjà affichée. Le tri est (nom COLLATE NOCASE, id),
+    ou (score bm25, id) lors d'une recherche plein texte.
+    """
     params = []
+    fts = bool(recherche and FTS_DISPONIBLE)
+    select, jointures, _, _ = _selection(colonnes)
+
+    if fts:
+        requete = requete_fts(recherche)
+        if not requete:
+            return None
+        poids = ", ".join(str(POIDS_FTS.get(ch, 1.0)) for ch in COLONNES_FTS)
+        cle_sql = (f"bm25(plantes_fts, {poids})", "p.id")
+        sql = (f"SELECT {select}, "
+               f"snippet(plantes_fts, -1, char(2), char(3), '…', 12) AS extrait, "
+               f"{cle_sql[0]} AS score "
+               f"FROM plantes_fts JOIN plantes p ON p.id = plantes_fts.rowid "
+               f"{jointures} WHERE plantes_fts MATCH ?")
+        params.append(requete)
+    else:
+        cle_sql = ("p.nom COLLATE NOCASE", "p.id")
+        sql = f"SELECT {select} FROM plantes p {jointures} WHERE 1=1"
+        if recherche:
+            # Repli sans FTS5 : recherche simple par LIKE
+            sql += " AND (p.nom LIKE ? OR p.latin LIKE ? OR p.proprietes LIKE ?)"
+            terme = f"%{recherche}%"
+            params.extend([terme, terme, terme])
 
     if type_filtre:
-        sql += " AND type = ?"
+        sql += " AND p.type = ?"
         params.append(type_filtre)
 
-    if recherche:
-        sql += " AND (nom LIKE ? OR latin LIKE ? OR proprietes LIKE ?)"
-        terme = f"%{recherche}%"
-        params.extend([terme, terme, terme])
+    borne = apres or avant
+    if borne:
+        sql += f" AND ({cle_sql[0]}, {cle_sql[1]}) {'<' if avant else '>'} (?, ?)"
+        params.extend(borne)
+
+    sens = "DESC" if avant else "ASC"
+    sql += f" ORDER BY {cle_sql[0]} {sens}, {cle_sql[1]} {sens}"
+    if limite:
+        sql += " LIMIT ? OFFSET ?"
+        params.extend([limite, decalage])
+    return sql, params, fts
 
-    sql += " ORDER BY nom COLLATE NOCASE"
-    rows = c.execute(sql, params).fetchall()
 
-    plantes = []
-    for row in rows:
-        t = row["type"]
-        table = TABLE_SPECIFIQUE.get(t)
-        row_spec = None
-        if table:
-            row_spec = c.execute(
-                f"SELECT * FROM {table} WHERE plante_id = ?", (row["id"],)
-            ).fetchone()
-        plantes.append(_row_to_plante(row, row_spec, t))
+def _row_liste_to_plante(row, fts: bool, hydrater, nb_colonnes: int) -> tuple[tuple, Plante]:
+    """
+    Hydrate une ligne de _requete_liste : retourne (clé de tri, Plante).
+    La requête plein texte ajoute extrait et score après les nb_colonnes
+    colonnes sélectionnées ; nom est toujours la 3e colonne.
+    """
+    obj = hydrater(row)
+    if fts:
+        obj._extrait = row[nb_colonnes]
+        return (row[nb_colonnes + 1], row[0]), obj
+    return (row[2], row[0]), obj
+
+
+def _lister(type_filtre: str = None, recherche: str = None, limite: int = None,
+            apres: tuple = None, avant: tuple = None, decalage: int = 0,
+            colonnes: Iterable[str] = None) -> list[tuple]:
+    """
+    Cœur de lister_plantes : retourne une liste de (clé de tri, Plante
+    ou PlanteResume si `colonnes`). Résultat lu dans le cache de listes si possible.
+    """
+    if colonnes is not None:
+        colonnes = _normaliser_colonnes(colonnes)
+    cle_cache = (type_filtre, recherche, limite, apres, avant, decalage, colonnes)
+    generation = _generation_cache()
+    en_cache = _cache_lire(_cache_listes, cle_cache)
+    if en_cache is not _ABSENT:
+        return [(cle, copy.copy(obj)) for cle, obj in en_cache]
+
+    requete = _requete_liste(type_filtre, recherche, limite, apres, avant, decalage, colonnes)
+    if requete is None:
+        return []
+    sql, params, fts = requete
+    _, _, hydrater, nb_colonnes = _selection(colonnes)
+    with connexion() as conn:
+        lignes = _curseur_tuples(conn).execute(sql, params).fetchall()
+    resultats = [_row_liste_to_plante(row, fts, hydrater, nb_colonnes) for row in lignes]
+    if avant:
+        resultats.reverse()
+
+    if len(resultats) <= CACHE_LISTE_MAX:
+        _cache_ecrire(_cache_listes, cle_cache,
+                      [(cle, copy.copy(obj)) for cle, obj in resultats], generation)
+    return resultats
+
+
+def lister_plantes(type_filtre: str = None, recherche: str = None,
+                   limite: int = None, apres: tuple = None,
+                   colonnes: Iterable[str] = None) -> list[Plante]:
+    """
+    Retourne les plantes, avec filtres optionnels.
+    type_filtre : "brute" | "complement" | "he" | "jardin" | None
+    recherche   : texte libre cherché dans tous les champs texte (index FTS5,
+                  insensible aux accents) — résultats classés par pertinence
+                  (bm25), avec un extrait surligné dans obj._extrait
+    limite      : nombre max de plantes (None = toutes)
+    apres       : clé de tri (voir lister_plantes_page) à partir de laquelle lire
+    colonnes    : projection (ex. COLONNES_LISTE) → des PlanteResume ne lisant
+                  que ces colonnes de `plantes` ; None = plantes complètes
+
+    Une seule requête (LEFT JOIN sur les tables spécifiques), quel que soit
+    le nombre de plantes.
+    """
+    return [obj for _, obj in _lister(type_filtre, recherche, limite, apres, colonnes=colonnes)]
+
+
+def lister_plantes_page(type_filtre: str = None, recherche: str = None,
+                        limite: int = 50, curseur: str = None, page: int = None,
+                        colonnes: Iterable[str] = None) -> tuple[list[Plante], str | None, str | None]:
+    """
+    Retourne une page de plantes par pagination à clé (keyset) :
+      (plantes, curseur_precedent, curseur_suivant)
+    curseur : "a:<clé>" (page après la clé) ou "b:<clé>" (page avant la clé),
+              tel que renvoyé par un appel précédent
+    page    : numéro de page (1 = première), utilisé seulement sans curseur ;
+              lecture par OFFSET, donc plus lente sur les pages lointaines
+    colonnes: projection, comme pour lister_plantes
+    Le coût ne dépend que de `limite`, pas de la taille de l'herbier.
+    """
+    limite = max(1, min(int(limite), LIMITE_PAGE_MAX))
+    sens, _, cle = (curseur or "").partition(":")
+    cle = decoder_curseur(cle)
+    apres = cle if cle and sens == "a" else None
+    avant = cle if cle and sens == "b" else None
+    decalage = (page - 1) * limite if page and page > 1 and not cle else 0
+
+    lignes = _lister(type_filtre, recherche, limite + 1, apres, avant, decalage, colonnes)
+    plus = len(lignes) > limite
+    if avant:
+        lignes = lignes[-limite:]       # la ligne en trop est la plus ancienne
+    else:
+        lignes = lignes[:limite]
+    if not lignes:
+        return [], None, None
+
+    # En reculant, il reste forcément une page après ; en avançant, une avant
+    a_precedent = plus if avant else bool(apres or decalage)
+    a_suivant = True if avant else plus
+    precedent = "b:" + encoder_curseur(lignes[0][0]) if a_precedent else None
+    suivant = "a:" + encoder_curseur(lignes[-1][0]) if a_suivant else None
+    return [obj for _, obj in lignes], precedent, suivant
 
-    conn.close()
-    return plantes
+
+def iterer_plantes(type_filtre: str = None, recherche: str = None,
+                   colonnes: Iterable[str] = None) -> Iterator[Plante]:
+    """
+    Générateur : produit les plantes une par une, lues au fil du curseur
+    SQLite (mémoire constante, quel que soit le nombre de plantes).
+    Mêmes filtres, même projection et même ordre que lister_plantes.
+
+    Le générateur ouvre sa propre connexion, hors du pool, gardée jusqu'à
+    épuisement ou fermeture (close()) : il peut donc être consommé après la
+    fin de la requête Flask, par exemple dans une réponse streamée, au
+    rythme du client.
+    """
+    if colonnes is not None:
+        colonnes = _normaliser_colonnes(colonnes)
+    requete = _requete_liste(type_filtre, recherche, colonnes=colonnes)
+    if requete is None:
+        return
+    sql, params, fts = requete
+    _, _, hydrater, nb_colonnes = _selection(colonnes)
+    with _connexion_flux() as conn:
+        curseur = _curseur_tuples(conn).execute(sql, params)
+        while paquet := curseur.fetchmany(TAILLE_PAQUET_LECTURE):
+            for row in paquet:
+                yield _row_liste_to_plante(row, fts, hydrater, nb_colonnes)[1]
+
+
+def compter_plantes(type_filtre: str = None, recherche: str = None) -> int:
+    """Nombre total de plantes correspondant aux filtres (pour l'affichage)."""
+    params = []
+    if recherche and FTS_DISPONIBLE:
+        requete = requete_fts(recherche)
+        if not requete:
+            return 0
+        sql = ("SELECT count(*) FROM plantes_fts JOIN plantes p ON p.id = plantes_fts.rowid "
+               "WHERE plantes_fts MATCH ?")
+        params.append(requete)
+    else:
+        sql = "SELECT count(*) FROM plantes p WHERE 1=1"
+        if recherche:
+            sql += " AND (p.nom LIKE ? OR p.latin LIKE ? OR p.proprietes LIKE ?)"
+            terme = f"%{recherche}%"
+            params.extend([terme, terme, terme])
+    if type_filtre:
+        sql += " AND p.type = ?"
+        params.append(type_filtre)
+    with connexion() as conn:
+        return conn.execute(sql, params).fetchone()[0]
 
 
 def get_plante(plante_id: int) -> Plante | None:
-    """Retourne une plante par son id, ou None si introuvable."""
-    conn = get_conn()
-    c = conn.cursor()
-    row = c.execute("SELECT * FROM plantes WHERE id = ?", (plante_id,)).fetchone()
+    """Retourne une plante par son id, ou None si introuvable (lecture via le cache)."""
+    generation = _generation_cache()
+    en_cache = _cache_lire(_cache_plantes, plante_id)
+    if en_cache is not _ABSENT:
+        return copy.copy(en_cache)
+
+    with connexion() as conn:
+        row = _curseur_tuples(conn).execute(SQL_SELECT_COMPLET + " WHERE p.id = ?",
+                                            (plante_id,)).fetchone()
     if not row:
-        conn.close()
         return None
-    t = row["type"]
-    table = TABLE_SPECIFIQUE.get(t)
-    row_spec = c.execute(
-        f"SELECT * FROM {table} WHERE plante_id = ?", (plante_id,)
-    ).fetchone() if table else None
-    obj = _row_to_plante(row, row_spec, t)
-    conn.close()
+    obj = _row_joint_to_plante(row)
+    _cache_ecrire(_cache_plantes, plante_id, copy.copy(obj), generation)
     return obj
 
 
+# Requêtes d'écriture générées une seule fois à l'import du module à partir de
+# CHAMPS_COMMUNS / CHAMPS_SPECIFIQUES. Le texte SQL étant toujours identique,
+# sqlite3 réutilise la requête compilée de son cache (une par connexion du pool).
+
+def _construire_upsert(table: str, cle: str, colonnes: list[str],
+                       immuables: tuple[str, ...] = ()) -> str:
+    """INSERT ... ON CONFLICT(cle) DO UPDATE sur les colonnes hors clé et immuables."""
+    maj = [col for col in colonnes if col != cle and col not in immuables]
+    return (f"INSERT INTO {table} ({', '.join(colonnes)}) "
+            f"VALUES ({', '.join(['?'] * len(colonnes))}) "
+            f"ON CONFLICT({cle}) DO UPDATE SET "
+            + ", ".join(f"{col}=excluded.{col}" for col in maj))
+
+# Base : id=NULL → nouvel id AUTOINCREMENT ; id existant → mise à jour
+# (le type d'une plante existante n'est jamais modifié)
+SQL_UPSERT_PLANTE = _construire_upsert("plantes", "id", ["id", "type"] + CHAMPS_COMMUNS,
+                                       immuables=("type",))
+
+SQL_UPSERT_SPECIFIQUE = {
+    type_: _construire_upsert(table, "plante_id", ["plante_id"] + CHAMPS_SPECIFIQUES[type_])
+    for type_, table in TABLE_SPECIFIQUE.items()
+}
+
+
+def _valeurs_communes(obj: Plante) -> list:
+    """Valeurs des CHAMPS_COMMUNS d'un objet, prêtes pour SQLite."""
+    return [int(obj.bio) if ch == "bio" else getattr(obj, ch) for ch in CHAMPS_COMMUNS]
+
+
+def _valeurs_specifiques(obj: Plante) -> list:
+    """Valeurs des CHAMPS_SPECIFIQUES d'un objet, prêtes pour SQLite."""
+    return [int(getattr(obj, ch, False)) if ch == "vivace" else getattr(obj, ch, "")
+            for ch in CHAMPS_SPECIFIQUES[obj.TYPE]]
+
+
 def sauvegarder_plante(obj: Plante) -> int:
     """
-    Insère ou met à jour une plante (INSERT si id=None, UPDATE sinon).
+    Insère ou met à jour une plante (INSERT si id=None, UPDATE sinon ;
+    un id qui n'existe plus en base est réinséré tel quel).
     Retourne l'id de la plante.
+    Deux requêtes UPSERT précompilées (cf. SQL_UPSERT_PLANTE et
+    SQL_UPSERT_SPECIFIQUE) : aucune lecture préalable, aucun SQL construit.
     """
-    conn = get_conn()
-    c = conn.cursor()
-    communs = {ch: getattr(obj, ch) for ch in CHAMPS_COMMUNS}
-    communs["bio"] = int(obj.bio)
-
-    if obj.id is None:
-        # INSERT
-        cols = ", ".join(["type"] + list(communs.keys()))
-        placeholders = ", ".join(["?"] * (1 + len(communs)))
-        vals = [obj.TYPE] + list(communs.values())
-        c.execute(f"INSERT INTO plantes ({cols}) VALUES ({placeholders})", vals)
-        plante_id = c.lastrowid
-    else:
-        # UPDATE
-        plante_id = obj.id
-        set_clause = ", ".join(f"{k}=?" for k in communs)
-        vals = list(communs.values()) + [plante_id]
-        c.execute(f"UPDATE plantes SET {set_clause} WHERE id=?", vals)
-
-    # Champs spécifiques
-    table = TABLE_SPECIFIQUE.get(obj.TYPE)
-    if table:
-        champs = CHAMPS_SPECIFIQUES[obj.TYPE]
-        spec = {}
-        for ch in champs:
-            val = getattr(obj, ch, "")
-            if ch == "vivace":
-                val = int(val)
-            spec[ch] = val
-
-        existing = c.execute(
-            f"SELECT plante_id FROM {table} WHERE plante_id=?", (plante_id,)
-        ).fetchone()
-
-        if existing:
-            set_clause = ", ".join(f"{k}=?" for k in spec)
-            c.execute(
-                f"UPDATE {table} SET {set_clause} WHERE plante_id=?",
-                list(spec.values()) + [plante_id]
-            )
-        else:
-            cols = "plante_id, " + ", ".join(spec.keys())
-            placeholders = ", ".join(["?"] * (1 + len(spec)))
-            c.execute(
-                f"INSERT INTO {table} ({cols}) VALUES ({placeholders})",
-                [plante_id] + list(spec.values())
-            )
-
-    conn.commit()
-    conn.close()
+    with connexion() as conn:
+        c = conn.execute(SQL_UPSERT_PLANTE, [obj.id, obj.TYPE] + _valeurs_communes(obj))
+        plante_id = obj.id if obj.id is not None else c.lastrowid
+
+        # Champs spécifiques
+        sql_spec = SQL_UPSERT_SPECIFIQUE.get(obj.TYPE)
+        if sql_spec:
+            conn.execute(sql_spec, [plante_id] + _valeurs_specifiques(obj))
+        revision = _marquer_modification(conn)
+
+    invalider_cache()
+    _signaler(revision, [plante_id])
     return plante_id
 
 
+TAILLE_LOT = 500   # plantes par transaction dans sauvegarder_plantes
+
+
+def _sauver_lot(conn: sqlite3.Connection, lot: list[Plante]) -> list[int]:
+    """
+    Enregistre un lot de plantes avec executemany (une requête par table et
+    par type). Retourne les ids dans l'ordre du lot.
+    La connexion doit être dans une transaction d'écriture : les ids
+    AUTOINCREMENT insérés par un même executemany sont alors consécutifs.
+    """
+    ids: list[int | None] = [obj.id for obj in lot]
+
+    par_type: dict[str, list[int]] = {}
+    for i, obj in enumerate(lot):
+        par_type.setdefault(obj.TYPE, []).append(i)
+
+    for type_, indices in par_type.items():
+        nouveaux = [i for i in indices if lot[i].id is None]
+        existants = [i for i in indices if lot[i].id is not None]
+
+        if nouveaux:
+            conn.executemany(SQL_UPSERT_PLANTE,
+                             ([None, type_] + _valeurs_communes(lot[i]) for i in nouveaux))
+            dernier = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            for k, i in enumerate(nouveaux):
+                ids[i] = dernier - len(nouveaux) + 1 + k
+        if existants:
+            conn.executemany(SQL_UPSERT_PLANTE,
+                             ([lot[i].id, type_] + _valeurs_communes(lot[i]) for i in existants))
+
+        conn.executemany(SQL_UPSERT_SPECIFIQUE[type_],
+                         ([ids[i]] + _valeurs_specifiques(lot[i]) for i in indices))
+    return ids
+
+
+def sauvegarder_plantes(plantes: Iterable[Plante],
+                        taille_lot: int = TAILLE_LOT) -> tuple[list[int | None], list[tuple[int, str]]]:
+    """
+    Insère ou met à jour un ensemble de plantes (itérable quelconque, lu au fil
+    de l'eau) par lots de `taille_lot`, chaque lot dans une seule transaction.
+    Un échec n'interrompt pas le lot : la plante fautive est signalée et les
+    autres sont enregistrées. Une plante dont l'id existe déjà sous un autre
+    type est refusée (le type d'une plante ne change jamais).
+
+    Retourne :
+      - la liste des ids, dans l'ordre d'entrée (None pour les échecs)
+      - la liste des erreurs : (index dans l'itérable, message)
+    """
+    ids: list[int | None] = []
+    erreurs: list[tuple[int, str]] = []
+
+    def _enregistrer(lot: list[tuple[int, Plante]]):
+        valides = []
+        for index, obj in lot:
+            if obj.TYPE not in TABLE_SPECIFIQUE:
+                erreurs.append((index, f"Type inconnu : {obj.TYPE!r}"))
+            else:
+                valides.append((index, obj))
+        resultat = {}
+        with connexion() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            # Le type d'une plante existante ne change jamais (SQL_UPSERT_PLANTE) :
+            # l'enregistrer sous un autre type écrirait dans la mauvaise table spécifique
+            existants = types_plantes(obj.id for _, obj in valides if obj.id is not None)
+            acceptees = []
+            for index, obj in valides:
+                type_existant = existants.get(obj.id)
+                if type_existant is not None and type_existant != obj.TYPE:
+                    erreurs.append((index, f"type {obj.TYPE!r} ≠ type existant {type_existant!r}"))
+                else:
+                    acceptees.append((index, obj))
+            valides = acceptees
+            with indexation_differee(conn) as a_indexer:
+                conn.execute("SAVEPOINT lot")
+                try:
+                    for (index, _), id_ in zip(valides, _sauver_lot(conn, [o for _, o in valides])):
+                        resultat[index] = id_
+                    conn.execute("RELEASE lot")
+                except sqlite3.Error:
+                    # Un élément fait échouer le lot : on rejoue une par une
+                    conn.execute("ROLLBACK TO lot")
+                    conn.execute("RELEASE lot")
+                    resultat.clear()
+                    for index, obj in valides:
+                        conn.execute("SAVEPOINT element")
+                        try:
+                            resultat[index] = _sauver_lot(conn, [obj])[0]
+                            conn.execute("RELEASE element")
+                        except sqlite3.Error as e:
+                            conn.execute("ROLLBACK TO element")
+                            conn.execute("RELEASE element")
+                            erreurs.append((index, f"{obj.nom or '?'} : {e}"))
+                a_indexer.extend(resultat.values())
+            if resultat:
+                revision = _marquer_modification(conn)
+        if resultat:
+            _signaler(revision, resultat.values())
+        ids.extend(resultat.get(index) for index, _ in lot)
+
+    lot: list[tuple[int, Plante]] = []
+    for index, obj in enumerate(plantes):
+        lot.append((index, obj))
+        if len(lot) >= taille_lot:
+            _enregistrer(lot)
+            lot = []
+    if lot:
+        _enregistrer(lot)
+
+    invalider_cache()
+    erreurs.sort()
+    return ids, erreurs
+
+
+def types_plantes(ids: Iterable[int]) -> dict[int, str]:
+    """Retourne {id: type} pour les ids qui existent encore en base."""
+    ids = list(ids)
+    types = {}
+    with connexion() as conn:
+        for debut in range(0, len(ids), 500):
+            morceau = ids[debut:debut + 500]
+            rows = conn.execute(
+                f"SELECT id, type FROM plantes WHERE id IN ({', '.join(['?'] * len(morceau))})",
+                morceau).fetchall()
+            types.update((r[0], r[1]) for r in rows)
+    return types
+
+
 def supprimer_plante(plante_id: int):
     """Supprime une plante et toutes ses données liées (CASCADE)."""
-    conn = get_conn()
-    conn.execute("DELETE FROM plantes WHERE id=?", (plante_id,))
-    conn.commit()
-    conn.close()
+    with connexion() as conn:
+        conn.execute("DELETE FROM plantes WHERE id=?", (plante_id,))
+        revision = _marquer_modification(conn)
+    invalider_cache()
+    _signaler(revision, ids_supprimes=[plante_id])
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -313,46 +1459,248 @@ def supprimer_plante(plante_id: int):
 
 def get_journal(plante_id: int) -> list[EntreeJournal]:
     """Retourne toutes les entrées du journal pour une plante, triées par date desc."""
-    conn = get_conn()
-    rows = conn.execute(
-        "SELECT * FROM journal WHERE plante_id=? ORDER BY date DESC", (plante_id,)
-    ).fetchall()
-    conn.close()
+    with connexion() as conn:
+        rows = conn.execute(
+            "SELECT * FROM journal WHERE plante_id=? ORDER BY date DESC", (plante_id,)
+        ).fetchall()
     return [EntreeJournal(
         id=r["id"], plante_id=r["plante_id"],
         date=r["date"], action=r["action"], notes=r["notes"]
     ) for r in rows]
 
 
-def get_journal_global() -> list[dict]:
-    """Retourne toutes les entrées du journal toutes plantes confondues."""
-    conn = get_conn()
-    rows = conn.execute("""
-        SELECT j.*, p.nom, p.type FROM journal j
-        JOIN plantes p ON j.plante_id = p.id
-        ORDER BY j.date DESC
-    """).fetchall()
-    conn.close()
+def _requete_journal(date_debut: str = None, date_fin: str = None, action: str = None,
+                     type_filtre: str = None, limite: int = None,
+                     apres: tuple = None, avant: tuple = None) -> tuple[str, list]:
+    """
+    Construit la requête du journal global, triée par (date, id) décroissants.
+    `apres` / `avant` : clé (date, id) de la dernière / première entrée déjà
+    affichée (pagination par clé). CROSS JOIN impose de parcourir le journal
+    dans l'ordre de l'index sur la date : le coût dépend de `limite`, jamais
+    de la longueur de l'historique ni d'un tri intermédiaire.
+    """
+    sql = ("SELECT j.*, p.nom, p.type FROM journal j "
+           "CROSS JOIN plantes p ON j.plante_id = p.id WHERE 1=1")
+    params = []
+    if date_debut:
+        sql += " AND j.date >= ?"
+        params.append(date_debut)
+    if date_fin:
+        sql += " AND j.date <= ?"
+        params.append(date_fin)
+    if action:
+        sql += " AND j.action LIKE ?"
+        params.append(f"%{action}%")
+    if type_filtre:
+        sql += " AND p.type = ?"
+        params.append(type_filtre)
+
+    borne = apres or avant
+    if borne:
+        sql += f" AND (j.date, j.id) {'>' if avant else '<'} (?, ?)"
+        params.extend(borne)
+
+    sens = "ASC" if avant else "DESC"
+    sql += f" ORDER BY j.date {sens}, j.id {sens}"
+    if limite:
+        sql += " LIMIT ?"
+        params.append(limite)
+    return sql, params
+
+
+def get_journal_global(date_debut: str = None, date_fin: str = None, action: str = None,
+                       type_filtre: str = None, limite: int = None,
+                       apres: tuple = None) -> list[dict]:
+    """
+    Retourne les entrées du journal toutes plantes confondues, plus récentes
+    d'abord, avec le nom et le type de la plante.
+    date_debut / date_fin : bornes incluses (AAAA-MM-JJ)
+    action                : texte contenu dans l'action
+    type_filtre           : type de plante
+    limite / apres        : nombre max d'entrées / clé (date, id) après laquelle lire
+    """
+    sql, params = _requete_journal(date_debut, date_fin, action, type_filtre, limite, apres)
+    with connexion() as conn:
+        rows = conn.execute(sql, params).fetchall()
     return [dict(r) for r in rows]
 
 
+def get_journal_global_page(date_debut: str = None, date_fin: str = None,
+                            action: str = None, type_filtre: str = None,
+                            limite: int = 50, curseur: str = None
+                            ) -> tuple[list[dict], str | None, str | None]:
+    """
+    Retourne une page du journal global par pagination à clé :
+      (entrées, curseur_precedent, curseur_suivant)
+    Mêmes filtres que get_journal_global ; curseurs au format de
+    lister_plantes_page ("a:<clé>" = entrées plus anciennes, "b:<clé>" = plus récentes).
+    """
+    limite = max(1, min(int(limite), LIMITE_PAGE_MAX))
+    sens, _, cle = (curseur or "").partition(":")
+    cle = decoder_curseur(cle)
+    apres = cle if cle and sens == "a" else None
+    avant = cle if cle and sens == "b" else None
+
+    sql, params = _requete_journal(date_debut, date_fin, action, type_filtre,
+                                   limite + 1, apres, avant)
+    with connexion() as conn:
+        lignes = [dict(r) for r in conn.execute(sql, params).fetchall()]
+    plus = len(lignes) > limite
+    lignes = lignes[:limite]
+    if avant:
+        lignes.reverse()
+    if not lignes:
+        return [], None, None
+
+    a_precedent = plus if avant else bool(apres)
+    a_suivant = True if avant else plus
+    precedent = "b:" + encoder_curseur((lignes[0]["date"], lignes[0]["id"])) if a_precedent else None
+    suivant = "a:" + encoder_curseur((lignes[-1]["date"], lignes[-1]["id"])) if a_suivant else None
+    return lignes, precedent, suivant
+
+
 def ajouter_entree_journal(entree: EntreeJournal) -> int:
     """Ajoute une entrée dans le journal. Retourne l'id créé."""
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO journal (plante_id, date, action, notes) VALUES (?,?,?,?)",
-        (entree.plante_id, entree.date, entree.action, entree.notes)
-    )
-    conn.commit()
-    new_id = c.lastrowid
-    conn.close()
-    return new_id
+    with connexion() as conn:
+        c = conn.execute(
+            "INSERT INTO journal (plante_id, date, action, notes) VALUES (?,?,?,?)",
+            (entree.plante_id, entree.date, entree.action, entree.notes)
+        )
+        revision = _marquer_modification(conn)
+    invalider_cache()
+    _signaler(revision)
+    return c.lastrowid
 
 
 def supprimer_entree_journal(entree_id: int):
     """Supprime une entrée du journal."""
-    conn = get_conn()
-    conn.execute("DELETE FROM journal WHERE id=?", (entree_id,))
-    conn.commit()
-    conn.close()
+    with connexion() as conn:
+        conn.execute("DELETE FROM journal WHERE id=?", (entree_id,))
+        revision = _marquer_modification(conn)
+    invalider_cache()
+    _signaler(revision)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MANIFESTE DES FICHES IMPORTÉES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def get_fiches_importees() -> dict[str, dict]:
+    """Retourne le manifeste complet : {nom_fichier: {chemin, taille, mtime, empreinte, plante_id}}."""
+    with connexion() as conn:
+        rows = conn.execute("SELECT * FROM fiches_importees").fetchall()
+    return {r["nom_fichier"]: dict(r) for r in rows}
+
+
+def enregistrer_fiches_importees(fiches: Iterable[tuple]):
+    """
+    Ajoute ou met à jour des entrées du manifeste, en une seule transaction.
+    Chaque élément : (nom_fichier, chemin, taille, mtime, empreinte, plante_id)
+    """
+    with connexion() as conn:
+        conn.executemany("""
+            INSERT INTO fiches_importees
+                (nom_fichier, chemin, taille, mtime, empreinte, plante_id, date_import)
+            VALUES (?, ?, ?, ?, ?, ?, datetime('now'))
+            ON CONFLICT(nom_fichier) DO UPDATE SET
+                chemin=excluded.chemin, taille=excluded.taille, mtime=excluded.mtime,
+                empreinte=excluded.empreinte, plante_id=excluded.plante_id,
+                date_import=excluded.date_import
+        """, fiches)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# REPRISE DE LA MIGRATION (migrate.py)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def get_reprise_migration(source: str) -> dict | None:
+    """Point de reprise de la migration du fichier `source`, ou None si jamais migré."""
+    with connexion() as conn:
+        row = conn.execute("SELECT * FROM reprises_migration WHERE source = ?",
+                           (source,)).fetchone()
+    return dict(row) if row else None
+
+
+def enregistrer_reprise_migration(source: str, entrees: int, dernier_id: str | None,
+                                  plantes: int, erreurs: int):
+    """
+    Avance le point de reprise (totaux depuis le début du fichier).
+    À appeler dans la transaction qui enregistre le lot correspondant : les
+    plantes et le point de reprise sont validés ensemble, ou pas du tout.
+    """
+    with connexion() as conn:
+        conn.execute("""
+            INSERT INTO reprises_migration
+                (source, entrees, dernier_id, plantes, erreurs, mis_a_jour)
+            VALUES (?, ?, ?, ?, ?, datetime('now'))
+            ON CONFLICT(source) DO UPDATE SET
+                entrees=excluded.entrees, dernier_id=excluded.dernier_id,
+                plantes=excluded.plantes, erreurs=excluded.erreurs,
+                mis_a_jour=excluded.mis_a_jour
+        """, (source, entrees, dernier_id, plantes, erreurs))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EXPORT (lecture en flux)
+# ══════════════════════════════════════════════════════════════════════════════
+# Lignes brutes (tuples) lues au fil du curseur, par paquets : mémoire
+# constante quel que soit le nombre de lignes, aucun objet Plante construit.
+# Mise en forme (CSV, JSONL...) : voir export.py.
+
+TAILLE_PAQUET_EXPORT = 1000   # lignes lues par fetchmany
+
+# Une ligne par plante : champs communs puis l'union des champs spécifiques
+# (vides pour les autres types). Chaque plante n'a qu'une ligne spécifique :
+# COALESCE sur les tables qui partagent un champ (partie, origine...) suffit.
+CHAMPS_EXPORT_SPECIFIQUES = list(dict.fromkeys(
+    ch for champs in CHAMPS_SPECIFIQUES.values() for ch in champs))
+COLONNES_EXPORT_PLANTES = ["id", "type"] + CHAMPS_COMMUNS + CHAMPS_EXPORT_SPECIFIQUES
+COLONNES_EXPORT_JOURNAL = ["id", "plante_id", "plante", "date", "action", "notes"]
+
+
+def _construire_select_export() -> str:
+    colonnes = [f"p.{ch}" for ch in ["id", "type"] + CHAMPS_COMMUNS]
+    for ch in CHAMPS_EXPORT_SPECIFIQUES:
+        sources = [f"s_{t}.{ch}" for t in TABLE_SPECIFIQUE if ch in CHAMPS_SPECIFIQUES[t]]
+        colonnes.append(sources[0] if len(sources) == 1 else f"COALESCE({', '.join(sources)})")
+    return f"SELECT {', '.join(colonnes)} FROM plantes p {JOINTURES_SPECIFIQUES} ORDER BY p.id"
+
+SQL_EXPORT_PLANTES = _construire_select_export()
+SQL_EXPORT_JOURNAL = ("SELECT j.id, j.plante_id, p.nom, j.date, j.action, j.notes "
+                      "FROM journal j LEFT JOIN plantes p ON p.id = j.plante_id ORDER BY j.id")
+
+
+def _iterer_lignes(sql: str) -> Iterator[tuple]:
+    """
+    Générateur : lignes de `sql` sous forme de tuples. Comme iterer_plantes,
+    il garde sa propre connexion, hors du pool, jusqu'à épuisement ou close().
+    """
+    with _connexion_flux() as conn:
+        curseur = _curseur_tuples(conn).execute(sql)
+        while paquet := curseur.fetchmany(TAILLE_PAQUET_EXPORT):
+            yield from paquet
+
+
+def iterer_export_plantes() -> Iterator[tuple]:
+    """Toutes les plantes, une ligne par plante (ordre de COLONNES_EXPORT_PLANTES)."""
+    return _iterer_lignes(SQL_EXPORT_PLANTES)
+
+
+def iterer_export_journal() -> Iterator[tuple]:
+    """Tout le journal, avec le nom de la plante (ordre de COLONNES_EXPORT_JOURNAL)."""
+    return _iterer_lignes(SQL_EXPORT_JOURNAL)
+
+
+def copier_base(destination: str, pages_par_etape: int = 1024):
+    """
+    Copie cohérente de la base dans le fichier `destination` (API de
+    sauvegarde SQLite, par étapes : les écritures ne sont pas bloquées
+    longtemps). La copie est un fichier autonome (journal_mode=DELETE).
+    """
+    cible = sqlite3.connect(destination)
+    try:
+        with connexion() as conn:
+            conn.backup(cible, pages=pages_par_etape)
+        cible.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        cible.close()
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+export.py — Export complet de l'herbier (CSV, JSONL, copie SQLite)
+==================================================================
+Les données sont lues au fil d'un curseur SQLite et écrites par paquets :
+mémoire constante, même pour des centaines de milliers de lignes (aucune
+liste de Plante n'est construite). Compression gzip à la volée en option.
+
+  python export.py plantes.csv                       → plantes en CSV
+  python export.py journal.jsonl.gz --contenu journal → journal en JSONL gzippé
+  python export.py sauvegarde.db                      → copie SQLite autonome
+  GET /export?format=csv&contenu=plantes&gzip=1       → même chose en téléchargement
+
+Formats :
+  csv    → UTF-8 avec BOM (ouverture directe dans Excel / LibreOffice),
+           une ligne d'en-tête ; booléens en « oui » / « non »
+  jsonl  → un objet JSON par ligne ; booléens en true / false
+  sqlite → copie cohérente de la base entière (plantes, journal, manifeste)
+Colonnes des plantes : id, type, champs communs, puis l'union des champs
+spécifiques des quatre types (vides pour les autres types).
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import zlib
+from contextlib import closing
+from datetime import date
+from typing import Iterable, Iterator
+
+import database
+
+FORMATS = ("csv", "jsonl", "sqlite")
+CONTENUS = ("plantes", "journal")   # ignoré pour sqlite (base entière)
+
+TAILLE_PAQUET = 64 * 1024   # octets accumulés avant chaque envoi / écriture
+NIVEAU_GZIP = 6
+
+TYPES_MIME = {
+    "csv":    "text/csv; charset=utf-8",
+    "jsonl":  "application/x-ndjson",
+    "sqlite": "application/vnd.sqlite3",
+}
+EXTENSIONS = {"csv": ".csv", "jsonl": ".jsonl", "sqlite": ".db"}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MISE EN FORME
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _source(contenu: str) -> tuple[list[str], Iterator[tuple]]:
+    """(noms des colonnes, générateur de lignes) pour "plantes" ou "journal"."""
+    if contenu == "plantes":
+        return database.COLONNES_EXPORT_PLANTES, database.iterer_export_plantes()
+    if contenu == "journal":
+        return database.COLONNES_EXPORT_JOURNAL, database.iterer_export_journal()
+    raise ValueError(f"Contenu inconnu : {contenu!r}. Valeurs valides : {list(CONTENUS)}")
+
+
+def _convertir_booleens(colonnes: list[str], lignes: Iterable[tuple], vrai, faux) -> Iterator:
+    """Remplace les 0/1 des colonnes booléennes (bio, vivace) par vrai / faux."""
+    positions = [i for i, nom in enumerate(colonnes) if nom in database.CHAMPS_BOOLEENS]
+    if not positions:
+        yield from lignes
+        return
+    for ligne in lignes:
+        ligne = list(ligne)
+        for i in positions:
+            if ligne[i] is not None:
+                ligne[i] = vrai if ligne[i] else faux
+        yield ligne
+
+
+def _par_paquets(morceaux: Iterable[str]) -> Iterator[bytes]:
+    """Regroupe des morceaux de texte en blocs UTF-8 d'environ TAILLE_PAQUET octets."""
+    tampon, taille = [], 0
+    for morceau in morceaux:
+        octets = morceau.encode("utf-8")
+        tampon.append(octets)
+        taille += len(octets)
+        if taille >= TAILLE_PAQUET:
+            yield b"".join(tampon)
+            tampon, taille = [], 0
+    if tampon:
+        yield b"".join(tampon)
+
+
+def _lignes_csv(colonnes: list[str], lignes: Iterable) -> Iterator[str]:
+    tampon = io.StringIO()
+    ecrivain = csv.writer(tampon, lineterminator="\r\n")
+    yield "\ufeff"   # BOM : Excel reconnaît l'UTF-8
+    ecrivain.writerow(colonnes)
+    for ligne in _convertir_booleens(colonnes, lignes, "oui", "non"):
+        ecrivain.writerow(ligne)
+        if tampon.tell() >= TAILLE_PAQUET:
+            yield tampon.getvalue()
+            tampon.seek(0)
+            tampon.truncate()
+    yield tampon.getvalue()
+
+
+def _lignes_jsonl(colonnes: list[str], lignes: Iterable) -> Iterator[str]:
+    encodeur = json.JSONEncoder(ensure_ascii=False).encode
+    for ligne in _convertir_booleens(colonnes, lignes, True, False):
+        yield encodeur(dict(zip(colonnes, ligne))) + "\n"
+
+
+def _flux_sqlite() -> Iterator[bytes]:
+    """Copie de la base dans un fichier temporaire, puis lecture par blocs."""
+    descripteur, chemin = tempfile.mkstemp(prefix="herbier_export_", suffix=".db")
+    os.close(descripteur)
+    try:
+        database.copier_base(chemin)
+        with open(chemin, "rb") as f:
+            while bloc := f.read(TAILLE_PAQUET):
+                yield bloc
+    finally:
+        os.remove(chemin)
+
+
+def _gzip(blocs: Iterable[bytes]) -> Iterator[bytes]:
+    """Compresse un flux de blocs au format gzip, au fil de l'eau."""
+    compresseur = zlib.compressobj(NIVEAU_GZIP, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for bloc in blocs:
+        sortie = compresseur.compress(bloc)
+        if sortie:
+            yield sortie
+    yield compresseur.flush()
+
+
+def flux_export(format_: str, contenu: str = "plantes", compresser: bool = False) -> Iterator[bytes]:
+    """
+    Générateur : l'export complet sous forme de blocs d'octets, prêts à être
+    écrits dans un fichier ou envoyés dans une réponse HTTP.
+    La connexion SQLite est prise au premier bloc et rendue à la fin (ou à
+    la fermeture du générateur).
+    ValueError si le format ou le contenu est inconnu (vérifié dès l'appel).
+    """
+    if format_ not in FORMATS:
+        raise ValueError(f"Format inconnu : {format_!r}. Valeurs valides : {list(FORMATS)}")
+    if format_ != "sqlite" and contenu not in CONTENUS:
+        raise ValueError(f"Contenu inconnu : {contenu!r}. Valeurs valides : {list(CONTENUS)}")
+
+    def blocs():
+        if format_ == "sqlite":
+            yield from _flux_sqlite()
+            return
+        colonnes, lignes = _source(contenu)
+        with closing(lignes):
+            mise_en_forme = _lignes_csv if format_ == "csv" else _lignes_jsonl
+            yield from _par_paquets(mise_en_forme(colonnes, lignes))
+
+    return _gzip(blocs()) if compresser else blocs()
+
+
+def nom_fichier(format_: str, contenu: str = "plantes", compresser: bool = False) -> str:
+    """Nom de fichier proposé : herbier-plantes-2026-02-14.csv.gz"""
+    sujet = "complet" if format_ == "sqlite" else contenu
+    return (f"herbier-{sujet}-{date.today().isoformat()}{EXTENSIONS[format_]}"
+            + (".gz" if compresser else ""))
+
+
+def type_mime(format_: str, compresser: bool = False) -> str:
+    return "application/gzip" if compresser else TYPES_MIME[format_]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# LIGNE DE COMMANDE
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _deviner_format(chemin: str) -> tuple[str | None, bool]:
+    """(format, gzip) d'après l'extension : .csv, .jsonl, .ndjson, .db, .sqlite (+ .gz)."""
+    base, ext = os.path.splitext(chemin.lower())
+    compresser = ext == ".gz"
+    if compresser:
+        ext = os.path.splitext(base)[1]
+    format_ = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl",
+               ".db": "sqlite", ".sqlite": "sqlite", ".sqlite3": "sqlite"}.get(ext)
+    return format_, compresser
+
+
+def exporter(chemin: str, format_: str = None, contenu: str = "plantes",
+             compresser: bool = None) -> int:
+    """
+    Écrit l'export dans `chemin` (format et compression déduits de
+    l'extension s'ils ne sont pas donnés). Retourne le nombre d'octets écrits.
+    La copie SQLite non compressée est écrite directement à sa place.
+    """
+    format_devine, gzip_devine = _deviner_format(chemin)
+    format_ = format_ or format_devine
+    compresser = gzip_devine if compresser is None else compresser
+    if format_ is None:
+        raise ValueError(f"Format impossible à déduire de {chemin!r} : préciser --format")
+
+    provisoire = chemin + ".tmp"
+    if format_ == "sqlite" and not compresser:
+        if os.path.exists(provisoire):
+            os.remove(provisoire)
+        database.copier_base(provisoire)
+        os.replace(provisoire, chemin)
+        return os.path.getsize(chemin)
+
+    taille = 0
+    with open(provisoire, "wb") as f:
+        for bloc in flux_export(format_, contenu, compresser):
+            f.write(bloc)
+            taille += len(bloc)
+    os.replace(provisoire, chemin)
+    return taille
+
+
+def _verifier_base():
+    """
+    Refuse une base absente ou dont le schéma n'est pas à jour : l'export ne
+    fait que lire, il ne crée ni ne migre jamais la base source.
+    """
+    if not os.path.isfile(database.DB_PATH):
+        raise ValueError(f"Base introuvable : {database.DB_PATH}")
+    with database.connexion() as conn:
+        version = database.version_schema(conn)
+    derniere = database.MIGRATIONS[-1][0]
+    if version != derniere:
+        raise ValueError(f"Base en version {version} du schéma (attendue : {derniere}) : "
+                         f"lancer l'application une fois pour la mettre à jour.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python export.py",
+                                     description="Export complet de l'herbier.")
+    parser.add_argument("destination", help="fichier de sortie (.csv, .jsonl, .db, + .gz)")
+    parser.add_argument("--format", choices=FORMATS, help="défaut : d'après l'extension")
+    parser.add_argument("--contenu", choices=CONTENUS, default="plantes",
+                        help="plantes ou journal (ignoré pour sqlite)")
+    parser.add_argument("--gzip", action="store_true", default=None,
+                        help="compresser (défaut : si l'extension est .gz)")
+    parser.add_argument("--base", help="base à exporter (défaut : herbier.db)")
+    options = parser.parse_args(argv)
+
+    if options.base:
+        database.DB_PATH = options.base
+    t0 = time.perf_counter()
+    try:
+        _verifier_base()
+        taille = exporter(options.destination, options.format, options.contenu, options.gzip)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    duree = time.perf_counter() - t0
+    print(f"📤 {options.destination} : {taille / 1e6:.1f} Mo en {duree:.1f} s "
+          f"({taille / 1e6 / max(duree, 1e-6):.1f} Mo/s)")
+
+
+if __name__ == "__main__":
+    main()
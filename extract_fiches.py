@@ -15,6 +15,11 @@ Structure attendue des fiches Word :
   - La casse des labels est ignorée (nom commun = Nom commun = NOM COMMUN)
   - Les champs inconnus sont ignorés silencieusement
 
+Lecture rapide : le texte des paragraphes est lu directement dans
+word/document.xml (zip + iterparse), sans charger python-docx ni les images.
+python-docx n'est utilisé qu'en repli, pour les documents que le lecteur
+rapide ne sait pas interpréter.
+
 Usage :
   from extract_fiches import extraire_fiche, importer_dossier
   plante = extraire_fiche("fiches/Ortie.docx")
@@ -22,8 +27,16 @@ Usage :
       sauvegarder_plante(plante)
 """
 
+import hashlib
+import multiprocessing
 import os
 import re
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Iterable, Iterator
 from docx import Document
 from models import creer_plante, Plante
 from database import CHAMPS_SPECIFIQUES
@@ -167,45 +180,91 @@ def _valeur_bool(texte: str) -> bool:
     return texte.strip().lower() in ("oui", "yes", "true", "1", "vrai")
 
 
-def extraire_fiche(fichier_path: str) -> Plante | None:
-    """
-    Lit un fichier .docx structuré et retourne un objet Plante.
+# ── Lecteur rapide de word/document.xml ────────────────────────────────────
 
-    Retourne None si :
-      - le fichier n'existe pas
-      - le champ 'nom commun' est absent
-      - le champ 'type' est absent ou non reconnu
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
 
-    Affiche des warnings pour les champs non reconnus.
+# Balises dont le contenu texte n'est pas traité comme python-docx le ferait
+# → repli sur python-docx dès qu'on en rencontre une
+BALISES_NON_GEREES = {W + "sdt", W + "customXml", W + "smartTag",
+                      W + "altChunk", W + "subDoc"}
+
+
+class FormatNonGere(Exception):
+    """Le document contient une construction non gérée par le lecteur rapide."""
+
+
+def _texte_run(run) -> str:
+    """Texte d'un w:r, avec les mêmes conventions que python-docx (Run.text)."""
+    morceaux = []
+    for enfant in run:
+        tag = enfant.tag
+        if tag == W + "t":
+            morceaux.append(enfant.text or "")
+        elif tag in (W + "tab", W + "ptab"):
+            morceaux.append("\t")
+        elif tag == W + "cr":
+            morceaux.append("\n")
+        elif tag == W + "br":
+            if enfant.get(W + "type", "textWrapping") == "textWrapping":
+                morceaux.append("\n")
+        elif tag == W + "noBreakHyphen":
+            morceaux.append("-")
+    return "".join(morceaux)
+
+
+def _texte_paragraphe(p) -> str:
+    """Texte d'un w:p : runs directs et runs des liens hypertexte."""
+    morceaux = []
+    for enfant in p:
+        if enfant.tag == W + "r":
+            morceaux.append(_texte_run(enfant))
+        elif enfant.tag == W + "hyperlink":
+            morceaux.extend(_texte_run(r) for r in enfant if r.tag == W + "r")
+    return "".join(morceaux)
+
+
+def _paragraphes_rapide(fichier_path: str) -> Iterator[str]:
     """
-    if not os.path.exists(fichier_path):
-        print(f"❌ Fichier introuvable : {fichier_path}")
-        return None
+    Générateur : texte des paragraphes du corps du document (équivalent de
+    [p.text for p in Document(...).paragraphs]), lu au fil de l'eau.
+    Chaque élément de premier niveau est supprimé de l'arbre une fois lu.
+    Lève FormatNonGere, zipfile.BadZipFile, KeyError ou ET.ParseError si le
+    document ne peut pas être lu par cette voie.
+    """
+    with zipfile.ZipFile(fichier_path) as zf, zf.open("word/document.xml") as flux:
+        pile = []
+        for evenement, elem in ET.iterparse(flux, events=("start", "end")):
+            if evenement == "start":
+                if elem.tag in BALISES_NON_GEREES:
+                    raise FormatNonGere(elem.tag)
+                pile.append(elem)
+                continue
+            pile.pop()
+            parent = pile[-1] if pile else None
+            if parent is not None and parent.tag == W + "body":
+                if elem.tag == W + "p":
+                    yield _texte_paragraphe(elem)
+                parent.remove(elem)
 
-    try:
-        doc = Document(fichier_path)
-    except Exception as e:
-        print(f"❌ Impossible de lire {fichier_path} : {e}")
-        return None
 
-    # ── Première passe : détecter le type ──────────────────────────────────
-    type_detecte = None
-    for para in doc.paragraphs:
-        texte = para.text.strip()
-        if not texte or ":" not in texte:
-            continue
-        label, _, valeur = texte.partition(":")
-        if _normaliser_label(label) == "type":
-            type_detecte = TYPE_SYNONYMES.get(valeur.strip().lower())
-            if type_detecte:
-                break
+def _paragraphes_python_docx(fichier_path: str) -> list[str]:
+    """Texte des paragraphes via python-docx (voie lente, toujours compatible)."""
+    return [para.text for para in Document(fichier_path).paragraphs]
 
-    if not type_detecte:
-        print(f"⚠️  Type non reconnu dans {os.path.basename(fichier_path)}")
-        return None
 
-    # ── Deuxième passe : extraire tous les champs ──────────────────────────
-    labels_map = TYPE_MAP_LABELS[type_detecte]
+# ── Analyse des paragraphes ────────────────────────────────────────────────
+
+def _analyser_paragraphes(paragraphes: Iterable[str]) -> tuple[str | None, dict[str, str]]:
+    """
+    Analyse en une seule passe le texte des paragraphes d'une fiche.
+    Les paragraphes lus avant la ligne "Type:" sont mis en attente, puis
+    rejoués dès que le type (et donc la table des labels) est connu.
+    Retourne (type détecté ou None, {attribut: valeur}).
+    """
+    type_detecte = None
+    en_attente: list[str] = []
+    labels_map: dict[str, str] = {}
     donnees: dict[str, str] = {}
     champ_courant: str | None = None
     valeur_courante: list[str] = []
@@ -214,28 +273,84 @@ def extraire_fiche(fichier_path: str) -> Plante | None:
         if champ_courant:
             donnees[champ_courant] = "\n".join(valeur_courante).strip()
 
-    for para in doc.paragraphs:
-        texte = para.text.strip()
+    def _traiter(texte: str):
+        nonlocal champ_courant, valeur_courante
         if not texte:
             if champ_courant:
                 valeur_courante.append("")
-            continue
+            return
 
         if ":" in texte:
             label_brut, _, valeur = texte.partition(":")
             label_norm = _normaliser_label(label_brut)
             attribut = labels_map.get(label_norm)
 
+            if label_norm == "type":
+                # La ligne "Type:" termine le champ courant sans en démarrer un
+                _sauver_champ()
+                champ_courant = None
+                return
             if attribut:
                 _sauver_champ()
                 champ_courant = attribut
                 valeur_courante = [valeur.strip()]
-                continue
+                return
             # Pas un label reconnu → continuation du champ courant
         if champ_courant:
             valeur_courante.append(texte)
 
+    for brut in paragraphes:
+        texte = brut.strip()
+        if type_detecte:
+            _traiter(texte)
+            continue
+
+        en_attente.append(texte)
+        if ":" in texte:
+            label, _, valeur = texte.partition(":")
+            if _normaliser_label(label) == "type":
+                type_detecte = TYPE_SYNONYMES.get(valeur.strip().lower())
+        if type_detecte:
+            labels_map = TYPE_MAP_LABELS[type_detecte]
+            for texte_attente in en_attente:
+                _traiter(texte_attente)
+            en_attente = []
+
+    if not type_detecte:
+        return None, {}
     _sauver_champ()  # sauver le dernier champ
+    return type_detecte, donnees
+
+
+def extraire_fiche(fichier_path: str) -> Plante | None:
+    """
+    Lit un fichier .docx structuré et retourne un objet Plante.
+
+    Retourne None si :
+      - le fichier n'existe pas
+      - le champ 'nom commun' est absent
+      - le champ 'type' est absent ou non reconnu
+
+    Affiche des warnings pour les champs non reconnus.
+    """
+    if not os.path.exists(fichier_path):
+        print(f"❌ Fichier introuvable : {fichier_path}")
+        return None
+
+    try:
+        type_detecte, donnees = _analyser_paragraphes(_paragraphes_rapide(fichier_path))
+    except (FormatNonGere, zipfile.BadZipFile, KeyError, ET.ParseError):
+        # Repli : python-docx sait lire ce que le lecteur rapide ignore
+        try:
+            paragraphes = _paragraphes_python_docx(fichier_path)
+        except Exception as e:
+            print(f"❌ Impossible de lire {fichier_path} : {e}")
+            return None
+        type_detecte, donnees = _analyser_paragraphes(paragraphes)
+
+    if not type_detecte:
+        print(f"⚠️  Type non reconnu dans {os.path.basename(fichier_path)}")
+        return None
 
     # ── Validation ────────────────────────────────────────────────────────
     nom = donnees.get("nom", "").strip()
@@ -261,15 +376,68 @@ def extraire_fiche(fichier_path: str) -> Plante | None:
 # IMPORT EN LOT
 # ══════════════════════════════════════════════════════════════════════════════
 
-def importer_dossier(dossier: str) -> tuple[list[tuple[Plante, str]], list[str]]:
+# En dessous de ce nombre de fiches, le démarrage des processus coûte plus
+# cher que l'extraction elle-même : on reste en séquentiel.
+SEUIL_PARALLELE = 4
+
+
+def _extraire_fiches(chemins: list[str], nb_workers: int | None,
+                     progression=None) -> list[Plante | None]:
+    """
+    Extrait une liste de fiches, dans l'ordre des chemins.
+    nb_workers  : nombre de processus (None = nombre de cœurs, 1 = séquentiel)
+    progression : fonction(analysees, echouees, total) appelée après chaque fiche
+    """
+    if nb_workers is None:
+        nb_workers = os.cpu_count() or 1
+    nb_workers = min(nb_workers, len(chemins))
+    total = len(chemins)
+    resultats: list[Plante | None] = []
+
+    def _suivre(plantes: Iterable[Plante | None]) -> list[Plante | None]:
+        echouees = 0
+        for plante in plantes:
+            resultats.append(plante)
+            echouees += plante is None
+            if progression:
+                progression(len(resultats), echouees, total)
+        return resultats
+
+    if nb_workers > 1 and len(chemins) >= SEUIL_PARALLELE:
+        try:
+            # "spawn" : des processus neufs, jamais un fork du serveur multi-threadé
+            # (un verrou tenu par un autre thread au moment du fork bloquerait l'enfant)
+            with ProcessPoolExecutor(max_workers=nb_workers,
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                # map() conserve l'ordre d'entrée → résultat déterministe
+                return _suivre(pool.map(extraire_fiche, chemins,
+                                        chunksize=max(1, len(chemins) // (nb_workers * 4))))
+        except (BrokenProcessPool, OSError) as e:
+            print(f"⚠️  Extraction parallèle impossible ({e}) — repli en séquentiel")
+            resultats.clear()
+
+    return _suivre(extraire_fiche(chemin) for chemin in chemins)
+
+
+def _lister_fiches(dossier_a_traiter: str) -> list[str]:
+    """Noms des fichiers .docx à traiter (hors fichiers verrou ~$), triés."""
+    return sorted(f for f in os.listdir(dossier_a_traiter)
+                  if f.lower().endswith(".docx") and not f.startswith("~"))
+
+
+def importer_dossier(dossier: str, nb_workers: int | None = None) -> tuple[list[tuple[Plante, str]], list[str]]:
     """
     Parcourt le sous-dossier A_traiter/ et extrait toutes les fiches .docx.
     Les fiches extraites avec succès sont déplacées dans le dossier parent (dossier).
     Les fiches en erreur restent dans A_traiter/ pour correction.
 
+    nb_workers : nombre de processus d'extraction en parallèle
+                 (None = nombre de cœurs, 1 = séquentiel)
+
     Retourne :
       - liste de tuples (objet Plante, chemin source) pour les succès
       - liste des noms de fichiers en erreur
+    (dans l'ordre alphabétique des fichiers, quel que soit nb_workers)
     """
     dossier_a_traiter = os.path.join(dossier, "A_traiter")
 
@@ -280,16 +448,14 @@ def importer_dossier(dossier: str) -> tuple[list[tuple[Plante, str]], list[str]]
     succes = []
     erreurs = []
 
-    fichiers = [f for f in os.listdir(dossier_a_traiter)
-                if f.lower().endswith(".docx") and not f.startswith("~")]
+    fichiers = _lister_fiches(dossier_a_traiter)
 
     if not fichiers:
         print(f"ℹ️  Aucun fichier .docx trouvé dans {dossier_a_traiter}")
         return [], []
 
-    for fichier in sorted(fichiers):
-        chemin = os.path.join(dossier_a_traiter, fichier)
-        plante = extraire_fiche(chemin)
+    chemins = [os.path.join(dossier_a_traiter, f) for f in fichiers]
+    for fichier, chemin, plante in zip(fichiers, chemins, _extraire_fiches(chemins, nb_workers)):
         if plante:
             succes.append((plante, chemin))
         else:
@@ -297,3 +463,115 @@ def importer_dossier(dossier: str) -> tuple[list[tuple[Plante, str]], list[str]]
 
     print(f"\n📊 Import terminé : {len(succes)} succès, {len(erreurs)} erreurs")
     return succes, erreurs
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# IMPORT INCRÉMENTAL (manifeste)
+# ══════════════════════════════════════════════════════════════════════════════
+# Le manifeste (table fiches_importees, cf. database.get_fiches_importees)
+# mémorise taille, date de modification et empreinte SHA-256 de chaque fiche
+# importée, ainsi que la plante créée. Une fiche dont taille + mtime n'ont pas
+# bougé n'est même pas relue ; une fiche modifiée met à jour sa plante.
+
+@dataclass
+class FicheSource:
+    """Fichier .docx candidat à l'import, avec les infos du manifeste."""
+    chemin:    str
+    taille:    int
+    mtime:     float
+    empreinte: str
+    plante_id: int | None = None   # plante liée lors d'un import précédent
+
+    @property
+    def nom_fichier(self) -> str:
+        return os.path.basename(self.chemin)
+
+
+def empreinte_fichier(chemin: str) -> str:
+    """SHA-256 du contenu d'un fichier, lu par blocs de 1 Mo."""
+    h = hashlib.sha256()
+    with open(chemin, "rb") as f:
+        for bloc in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+def trier_fiches(chemins: list[str], manifeste: dict[str, dict]
+                 ) -> tuple[list[FicheSource], list[str], list[tuple]]:
+    """
+    Compare les fichiers au manifeste.
+    Retourne (fiches nouvelles ou modifiées, noms des fiches inchangées,
+    entrées du manifeste à rafraîchir).
+    Une fiche est inchangée si taille + mtime sont identiques (sans lecture),
+    ou si son contenu est déjà connu (même empreinte, éventuellement sous
+    un autre nom de fichier) et lié à une plante existante. Dans ce second
+    cas, taille et mtime sont à rafraîchir dans le manifeste (éléments au
+    format de database.enregistrer_fiches_importees) : la fiche ne sera
+    plus relue au prochain passage.
+    """
+    par_empreinte = {e["empreinte"]: e for e in manifeste.values() if e["plante_id"] is not None}
+    a_importer, inchangees, a_rafraichir = [], [], []
+
+    for chemin in chemins:
+        nom = os.path.basename(chemin)
+        st = os.stat(chemin)
+        connue = manifeste.get(nom)
+        lien = connue["plante_id"] if connue else None
+
+        if lien is not None and connue["taille"] == st.st_size and connue["mtime"] == st.st_mtime:
+            inchangees.append(nom)
+            continue
+
+        empreinte = empreinte_fichier(chemin)
+        if connue is None and empreinte in par_empreinte:
+            lien = par_empreinte[empreinte]["plante_id"]
+        elif lien is None or connue["empreinte"] != empreinte:
+            a_importer.append(FicheSource(chemin, st.st_size, st.st_mtime, empreinte, lien))
+            continue
+        inchangees.append(nom)
+        a_rafraichir.append((nom, chemin, st.st_size, st.st_mtime, empreinte, lien))
+
+    return a_importer, inchangees, a_rafraichir
+
+
+def importer_dossier_incremental(dossier: str, manifeste: dict[str, dict],
+                                 nb_workers: int | None = None, progression=None
+                                 ) -> tuple[list[tuple[Plante, FicheSource]], list[str], list[str],
+                                            list[tuple]]:
+    """
+    Comme importer_dossier, mais ne relit que les fiches nouvelles ou
+    modifiées par rapport au manifeste.
+    Pour une fiche déjà importée dont le contenu a changé, plante.id est
+    prérempli avec la plante liée : sauvegarder_plante la met donc à jour
+    au lieu d'en créer une nouvelle.
+    progression : fonction(analysees, echouees, total) appelée après chaque
+                  fiche relue (voir _extraire_fiches)
+
+    Retourne :
+      - liste de tuples (objet Plante, FicheSource) à sauvegarder
+      - liste des noms de fichiers en erreur
+      - liste des noms de fichiers inchangés (ignorés)
+      - entrées du manifeste à rafraîchir (voir trier_fiches)
+    """
+    dossier_a_traiter = os.path.join(dossier, "A_traiter")
+
+    if not os.path.isdir(dossier_a_traiter):
+        print(f"❌ Dossier introuvable : {dossier_a_traiter}")
+        return [], [dossier_a_traiter], [], []
+
+    chemins = [os.path.join(dossier_a_traiter, f) for f in _lister_fiches(dossier_a_traiter)]
+    fiches, inchangees, a_rafraichir = trier_fiches(chemins, manifeste)
+
+    succes, erreurs = [], []
+    if fiches:
+        plantes = _extraire_fiches([f.chemin for f in fiches], nb_workers, progression)
+        for fiche, plante in zip(fiches, plantes):
+            if plante:
+                plante.id = fiche.plante_id
+                succes.append((plante, fiche))
+            else:
+                erreurs.append(fiche.nom_fichier)
+
+    print(f"\n📊 Import terminé : {len(succes)} à enregistrer, "
+          f"{len(inchangees)} inchangée(s), {len(erreurs)} erreur(s)")
+    return succes, erreurs, inchangees, a_rafraichir
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+import_tableur.py — Import en masse depuis un tableur (CSV) ou un fichier JSONL
+===============================================================================
+Pour les catalogues fournisseurs et les exports d'export.py : une ligne par
+plante, des colonnes nommées comme les labels des fiches Word (« Nom commun »,
+« Partie utilisée », « Chémotype »...) ou comme les attributs (nom, type_sol...).
+
+  python import_tableur.py catalogue.csv
+  python import_tableur.py catalogue.csv --type he --rapport erreurs.csv
+  python import_tableur.py export.jsonl.gz --avec-ids
+
+Lecture au fil de l'eau (mémoire constante), écriture par lots de
+TAILLE_LOT plantes, un lot par transaction (database.sauvegarder_plantes).
+Une ligne invalide n'arrête rien : elle est signalée dans le rapport avec
+son numéro de ligne.
+
+  - Colonnes : mêmes tables de labels que extract_fiches.py (LABELS_COMMUNS,
+    LABELS_BRUTE, ...), casse ignorée ; les noms d'attributs sont aussi acceptés.
+    Les colonnes inconnues sont ignorées (et listées dans le rapport).
+  - Type : colonne « Type » (synonymes de TYPE_SYNONYMES : « huile
+    essentielle », « tisane »...) ou type par défaut (--type) pour les
+    fichiers d'un seul type.
+  - Id : ignoré par défaut (chaque ligne crée une plante). Avec --avec-ids,
+    une ligne dont l'id existe met la plante à jour (réimport d'un export) ;
+    elle est refusée si son type diffère de celui de la plante existante.
+  - CSV : UTF-8 (avec ou sans BOM), séparateur « , » « ; » ou tabulation
+    détecté automatiquement. Fichiers .gz décompressés à la volée.
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+import database
+from database import CHAMPS_BOOLEENS, CHAMPS_COMMUNS, CHAMPS_SPECIFIQUES
+from extract_fiches import TYPE_MAP_LABELS, TYPE_SYNONYMES, _normaliser_label, _valeur_bool
+from models import CLASSES_MAP, Plante
+
+TAILLE_LOT = 5000        # plantes par transaction
+SEPARATEURS = ",;\t"     # candidats pour la détection du séparateur CSV
+
+# Labels reconnus par type : ceux des fiches Word + les noms d'attributs
+LABELS_PAR_TYPE = {
+    type_: {**{ch: ch for ch in CHAMPS_COMMUNS + CHAMPS_SPECIFIQUES[type_]}, **labels}
+    for type_, labels in TYPE_MAP_LABELS.items()
+}
+LABELS_TOUS_TYPES = {label for labels in LABELS_PAR_TYPE.values() for label in labels}
+
+
+@dataclass
+class RapportImport:
+    """Bilan d'un import : compteurs, erreurs par ligne, colonnes ignorées."""
+    fichier:            str
+    lues:               int = 0
+    importees:          int = 0
+    erreurs:            list[tuple[int, str]] = field(default_factory=list)  # (ligne, message)
+    colonnes_ignorees:  list[str] = field(default_factory=list)
+    duree:              float = 0.0
+
+    @property
+    def debit(self) -> float:
+        """Lignes traitées par seconde."""
+        return self.lues / self.duree if self.duree else 0.0
+
+    def ecrire_erreurs(self, chemin: str):
+        """Écrit les erreurs en CSV (ligne ; erreur), lisible dans un tableur."""
+        with open(chemin, "w", encoding="utf-8-sig", newline="") as f:
+            ecrivain = csv.writer(f, delimiter=";")
+            ecrivain.writerow(["ligne", "erreur"])
+            ecrivain.writerows(self.erreurs)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# LECTURE
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _ouvrir(chemin: str) -> io.TextIOBase:
+    """Ouvre le fichier en texte (décompression gzip si .gz, BOM UTF-8 ignoré)."""
+    if chemin.lower().endswith(".gz"):
+        return gzip.open(chemin, "rt", encoding="utf-8-sig", newline="")
+    return open(chemin, encoding="utf-8-sig", newline="")
+
+
+def _format(chemin: str) -> str:
+    nom = chemin.lower().removesuffix(".gz")
+    return "jsonl" if nom.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def _lignes_csv(f: io.TextIOBase) -> Iterator[tuple[int, dict[str, object]]]:
+    """(numéro de ligne, {colonne: valeur}) pour chaque ligne de données."""
+    premiere = f.readline()
+    f.seek(0)
+    separateur = max(SEPARATEURS, key=premiere.count)   # le plus fréquent dans l'en-tête
+    lecteur = csv.reader(f, delimiter=separateur)
+    entetes = next(lecteur, None)
+    if not entetes:
+        return
+    for ligne in lecteur:
+        if any(ligne):
+            yield lecteur.line_num, dict(zip(entetes, ligne))
+
+
+def _lignes_jsonl(f: io.TextIOBase) -> Iterator[tuple[int, dict[str, object] | str]]:
+    """(numéro de ligne, objet) ; un message d'erreur à la place d'un objet illisible."""
+    for numero, texte in enumerate(f, 1):
+        if not texte.strip():
+            continue
+        try:
+            objet = json.loads(texte)
+        except ValueError as e:
+            yield numero, f"JSON invalide : {e}"
+            continue
+        yield numero, objet if isinstance(objet, dict) else "objet JSON attendu"
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONVERSION LIGNE → PLANTE
+# ══════════════════════════════════════════════════════════════════════════════
+
+class _Correspondance:
+    """
+    Colonnes du fichier → attributs, calculées une fois par en-tête (et non
+    à chaque ligne).
+    """
+
+    def __init__(self, type_defaut: str | None, avec_ids: bool):
+        self.type_defaut = type_defaut
+        self.avec_ids = avec_ids
+        self._par_entete: dict[tuple, tuple] = {}
+        self.ignorees: dict[str, None] = {}   # ensemble ordonné
+
+    def _analyser(self, entetes: tuple) -> tuple:
+        """
+        (colonne du type, colonne de l'id, {type: [(colonne, attribut)]})
+        pour cet en-tête.
+        """
+        resultat = self._par_entete.get(entetes)
+        if resultat is None:
+            normalisees = {col: _normaliser_label(str(col)) for col in entetes}
+            speciales = {norm: col for col, norm in normalisees.items() if norm in ("type", "id")}
+            par_type = {
+                type_: [(col, labels[norm]) for col, norm in normalisees.items() if norm in labels]
+                for type_, labels in LABELS_PAR_TYPE.items()
+            }
+            for col, norm in normalisees.items():
+                if norm not in LABELS_TOUS_TYPES and norm not in speciales:
+                    self.ignorees.setdefault(str(col))
+            resultat = (speciales.get("type"), speciales.get("id"), par_type)
+            self._par_entete[entetes] = resultat
+        return resultat
+
+    def plante(self, valeurs: dict[str, object]) -> Plante:
+        """Construit la plante d'une ligne ; ValueError si la ligne est invalide."""
+        col_type, col_id, par_type = self._analyser(tuple(valeurs))
+
+        type_brut = _texte(valeurs.get(col_type)) or self.type_defaut or ""
+        type_ = TYPE_SYNONYMES.get(type_brut.lower())
+        if type_ is None:
+            raise ValueError(f"type {type_brut!r} non reconnu" if type_brut else "type manquant")
+
+        attributs = {}
+        for col, attribut in par_type[type_]:
+            valeur = valeurs.get(col)
+            if attribut in CHAMPS_BOOLEENS:
+                attributs[attribut] = valeur if isinstance(valeur, bool) else _valeur_bool(_texte(valeur))
+            else:
+                attributs[attribut] = _texte(valeur)
+        if not attributs.get("nom"):
+            raise ValueError("nom manquant")
+
+        if self.avec_ids and col_id is not None:
+            id_brut = _texte(valeurs.get(col_id))
+            if id_brut:
+                try:
+                    attributs["id"] = int(id_brut)
+                except ValueError:
+                    raise ValueError(f"id {id_brut!r} invalide") from None
+        return CLASSES_MAP[type_](**attributs)
+
+
+def _texte(valeur) -> str:
+    """Valeur de cellule → texte (None → "", nombres JSON → chaîne)."""
+    if valeur is None:
+        return ""
+    return valeur.strip() if isinstance(valeur, str) else str(valeur)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# IMPORT
+# ══════════════════════════════════════════════════════════════════════════════
+
+def importer_fichier(chemin: str, type_defaut: str = None, avec_ids: bool = False,
+                     taille_lot: int = TAILLE_LOT, progression=None) -> RapportImport:
+    """
+    Importe un fichier CSV ou JSONL (éventuellement .gz) dans la base.
+    type_defaut : type des lignes sans colonne « Type » (brute, he...)
+    avec_ids    : utiliser la colonne id (mise à jour des plantes existantes)
+    progression : fonction(lignes_lues) appelée après chaque lot, optionnelle
+    Retourne le RapportImport (lignes lues, importées, erreurs par ligne).
+    """
+    if type_defaut is not None:
+        type_defaut = TYPE_SYNONYMES.get(type_defaut.lower())
+        if type_defaut is None:
+            raise ValueError(f"Type par défaut inconnu. Valeurs valides : {list(CLASSES_MAP)}")
+
+    rapport = RapportImport(chemin)
+    correspondance = _Correspondance(type_defaut, avec_ids)
+    numeros: list[int] = []   # index dans le flux de plantes → numéro de ligne du fichier
+    debut = time.perf_counter()
+
+    def plantes(lignes: Iterable[tuple[int, object]]) -> Iterator[Plante]:
+        for numero, valeurs in lignes:
+            rapport.lues += 1
+            if progression and rapport.lues % taille_lot == 0:
+                progression(rapport.lues)
+            if isinstance(valeurs, str):
+                rapport.erreurs.append((numero, valeurs))
+                continue
+            try:
+                obj = correspondance.plante(valeurs)
+            except (ValueError, TypeError) as e:
+                rapport.erreurs.append((numero, str(e)))
+                continue
+            numeros.append(numero)
+            yield obj
+
+    with _ouvrir(chemin) as f:
+        lignes = _lignes_jsonl(f) if _format(chemin) == "jsonl" else _lignes_csv(f)
+        ids, erreurs = database.sauvegarder_plantes(plantes(lignes), taille_lot)
+
+    rapport.importees = sum(id_ is not None for id_ in ids)
+    rapport.erreurs += [(numeros[index], message) for index, message in erreurs]
+    rapport.erreurs.sort()
+    rapport.colonnes_ignorees = list(correspondance.ignorees)
+    rapport.duree = time.perf_counter() - debut
+    return rapport
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python import_tableur.py",
+                                     description="Import en masse depuis un CSV ou un JSONL.")
+    parser.add_argument("fichier", help=".csv, .jsonl ou .ndjson (éventuellement .gz)")
+    parser.add_argument("--type", dest="type_defaut",
+                        help="type des lignes sans colonne Type (brute, complement, he, jardin)")
+    parser.add_argument("--avec-ids", action="store_true",
+                        help="utiliser la colonne id : met à jour les plantes existantes")
+    parser.add_argument("--rapport", help="écrit les lignes en erreur dans ce fichier CSV")
+    parser.add_argument("--lot", type=int, default=TAILLE_LOT, help="plantes par transaction")
+    parser.add_argument("--base", help="base cible (défaut : herbier.db)")
+    options = parser.parse_args(argv)
+
+    if not os.path.exists(options.fichier):
+        sys.exit(f"❌ Fichier introuvable : {options.fichier}")
+    if options.base:
+        database.DB_PATH = options.base
+    database.init_db()
+    try:
+        rapport = importer_fichier(options.fichier, options.type_defaut, options.avec_ids,
+                                   options.lot, progression=lambda n: print(f"   … {n} lignes", end="\r"))
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+
+    print(f"📥 {rapport.importees} plante(s) importée(s) sur {rapport.lues} ligne(s) "
+          f"en {rapport.duree:.1f} s ({rapport.debit:,.0f} lignes/s)")
+    if rapport.colonnes_ignorees:
+        print(f"ℹ️  Colonnes ignorées : {', '.join(rapport.colonnes_ignorees)}")
+    if rapport.erreurs:
+        print(f"⚠️  {len(rapport.erreurs)} ligne(s) en erreur")
+        for numero, message in rapport.erreurs[:10]:
+            print(f"   ligne {numero} : {message}")
+        if len(rapport.erreurs) > 10:
+            print(f"   … et {len(rapport.erreurs) - 10} autre(s)")
+        if options.rapport:
+            rapport.ecrire_erreurs(options.rapport)
+            print(f"📝 Rapport d'erreurs : {options.rapport}")
+
+
+if __name__ == "__main__":
+    main()
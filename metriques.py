@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+metriques.py — Mesures par requête HTTP et export Prometheus
+=============================================================
+Pour chaque requête Flask :
+  - durée totale (histogramme par route)
+  - nombre de requêtes SQL et temps passé dans SQLite (exécution + lecture
+    des lignes), via les connexions chronométrées de database.py
+  - temps de rendu des templates Jinja
+Le reste (hydratation des objets, logique de la vue) = total − SQL − rendu.
+
+  init_metriques(app)   → branche les mesures sur l'application
+  GET /metrics          → format texte Prometheus
+
+Configuration (app.config ou variables d'environnement) :
+  HERBIER_METRIQUES      → 0 pour désactiver complètement (défaut : 1)
+  HERBIER_SERVER_TIMING  → 1 pour ajouter l'en-tête Server-Timing
+                           (onglet Réseau / Timing du navigateur)
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, before_render_template, g, request, template_rendered
+
+import database
+
+# Bornes (secondes) des histogrammes de durée
+BORNES_DUREE = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+
+_local = threading.local()   # mesures de la requête en cours dans ce thread
+
+
+class Histogramme:
+    """Histogramme cumulatif au sens Prometheus (compteurs par borne + somme)."""
+
+    def __init__(self, bornes=BORNES_DUREE):
+        self.bornes = bornes
+        self.compteurs = [0] * (len(bornes) + 1)   # dernier = +Inf
+        self.somme = 0.0
+        self.total = 0
+
+    def observer(self, valeur: float):
+        self.compteurs[bisect_left(self.bornes, valeur)] += 1
+        self.somme += valeur
+        self.total += 1
+
+    def lignes(self, nom: str, etiquettes: str) -> list[str]:
+        lignes, cumul = [], 0
+        for borne, n in zip((*self.bornes, "+Inf"), self.compteurs):
+            cumul += n
+            lignes.append(f'{nom}_bucket{{{etiquettes},le="{borne}"}} {cumul}')
+        lignes.append(f"{nom}_sum{{{etiquettes}}} {self.somme:.6f}")
+        lignes.append(f"{nom}_count{{{etiquettes}}} {self.total}")
+        return lignes
+
+
+class _Route:
+    """Agrégats d'une route (endpoint Flask)."""
+
+    def __init__(self):
+        self.duree = Histogramme()
+        self.codes: dict[tuple[str, int], int] = {}   # (méthode, code HTTP) → nombre
+        self.sql_requetes = 0
+        self.sql_secondes = 0.0
+        self.rendu_secondes = 0.0
+
+
+_routes: dict[str, _Route] = {}
+_verrou = threading.Lock()
+
+
+# ── Collecte ──────────────────────────────────────────────────────────────────
+
+def _mesure_sql(duree: float, nouvelle: bool):
+    """Appelée par database.py pour chaque exécution / lecture SQL."""
+    if getattr(_local, "actif", False):
+        _local.sql_secondes += duree
+        _local.sql_requetes += nouvelle
+
+
+def _debut_requete():
+    _local.actif = True
+    _local.debut = time.perf_counter()
+    _local.sql_requetes = 0
+    _local.sql_secondes = 0.0
+    _local.rendu_secondes = 0.0
+
+
+def _oublier_requete(exc=None):
+    """Fin de contexte de requête, même après une exception : plus rien n'est compté."""
+    _local.actif = False
+    _local.debut_rendu = None
+
+
+def _avant_rendu(app, template, context, **extra):
+    _local.debut_rendu = time.perf_counter()
+
+
+def _apres_rendu(app, template, context, **extra):
+    debut = getattr(_local, "debut_rendu", None)
+    if debut is not None and getattr(_local, "actif", False):
+        _local.rendu_secondes += time.perf_counter() - debut
+        _local.debut_rendu = None
+
+
+def _fin_requete(reponse):
+    if not getattr(_local, "actif", False):
+        return reponse
+    _local.actif = False
+    total = time.perf_counter() - _local.debut
+    route = request.endpoint or "inconnue"
+    with _verrou:
+        agregat = _routes.setdefault(route, _Route())
+        agregat.duree.observer(total)
+        cle = (request.method, reponse.status_code)
+        agregat.codes[cle] = agregat.codes.get(cle, 0) + 1
+        agregat.sql_requetes += _local.sql_requetes
+        agregat.sql_secondes += _local.sql_secondes
+        agregat.rendu_secondes += _local.rendu_secondes
+
+    if g.get("server_timing"):
+        sql, rendu = _local.sql_secondes * 1000, _local.rendu_secondes * 1000
+        reponse.headers["Server-Timing"] = ", ".join([
+            f'sql;dur={sql:.2f};desc="SQLite ({_local.sql_requetes} req.)"',
+            f'rendu;dur={rendu:.2f};desc="Templates Jinja"',
+            f'app;dur={max(0.0, total * 1000 - sql - rendu):.2f};desc="Python (hydratation, vue)"',
+            f'total;dur={total * 1000:.2f}',
+        ])
+    return reponse
+
+
+# ── Export ────────────────────────────────────────────────────────────────────
+
+def _echapper(valeur: str) -> str:
+    return str(valeur).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def texte_prometheus() -> str:
+    """Toutes les métriques au format d'exposition texte Prometheus."""
+    lignes = [
+        "# HELP herbier_requete_duree_secondes Durée des requêtes HTTP par route.",
+        "# TYPE herbier_requete_duree_secondes histogram",
+    ]
+    with _verrou:
+        routes = sorted(_routes.items())
+        for route, a in routes:
+            lignes += a.duree.lignes("herbier_requete_duree_secondes", f'route="{_echapper(route)}"')
+
+        blocs = [
+            ("herbier_requetes_total", "counter", "Requêtes HTTP par route, méthode et code.",
+             [(f'route="{_echapper(r)}",methode="{m}",code="{c}"', n)
+              for r, a in routes for (m, c), n in sorted(a.codes.items())]),
+            ("herbier_sql_requetes_total", "counter", "Requêtes SQL exécutées, par route HTTP.",
+             [(f'route="{_echapper(r)}"', a.sql_requetes) for r, a in routes]),
+            ("herbier_sql_secondes_total", "counter", "Temps passé dans SQLite, par route HTTP.",
+             [(f'route="{_echapper(r)}"', f"{a.sql_secondes:.6f}") for r, a in routes]),
+            ("herbier_rendu_secondes_total", "counter", "Temps de rendu des templates, par route HTTP.",
+             [(f'route="{_echapper(r)}"', f"{a.rendu_secondes:.6f}") for r, a in routes]),
+        ]
+    cache = database.stats_cache()
+    for nom, stats in cache.items():
+        if not isinstance(stats, dict):
+            blocs.append((f"herbier_cache_{nom}_total", "counter", f"Cache d'objets : {nom}.",
+                          [("", stats)]))
+            continue
+        blocs.append((f"herbier_cache_{nom}", "gauge", f"Cache d'objets « {nom} ».",
+                      [(f'mesure="{_echapper(k)}"', v) for k, v in stats.items()
+                       if isinstance(v, (int, float))]))
+
+    for nom, type_, aide, valeurs in blocs:
+        lignes += [f"# HELP {nom} {aide}", f"# TYPE {nom} {type_}"]
+        lignes += [f"{nom}{{{etiquettes}}} {valeur}" if etiquettes else f"{nom} {valeur}"
+                   for etiquettes, valeur in valeurs]
+    return "\n".join(lignes) + "\n"
+
+
+def reinitialiser():
+    """Remet tous les agrégats à zéro."""
+    with _verrou:
+        _routes.clear()
+
+
+def init_metriques(app):
+    """Branche le chronométrage sur l'application et ajoute la route /metrics."""
+    actives = app.config.setdefault(
+        "HERBIER_METRIQUES", os.environ.get("HERBIER_METRIQUES", "1") != "0")
+    server_timing = app.config.setdefault(
+        "HERBIER_SERVER_TIMING", os.environ.get("HERBIER_SERVER_TIMING", "0") == "1")
+    if not actives:
+        return
+
+    # Les connexions ouvertes à partir d'ici sont chronométrées
+    database.MESURE_SQL = _mesure_sql
+    database.fermer_pool()
+
+    @app.before_request
+    def _metriques_debut():
+        g.server_timing = server_timing
+        _debut_requete()
+
+    app.after_request(_fin_requete)
+    app.teardown_request(_oublier_requete)
+    before_render_template.connect(_avant_rendu, app)
+    template_rendered.connect(_apres_rendu, app)
+
+    @app.route("/metrics")
+    def metrics():
+        """Métriques au format texte Prometheus."""
+        return Response(texte_prometheus(), mimetype="text/plain; version=0.0.4; charset=utf-8")
@@ -2,35 +2,52 @@
 """
 migrate.py — Migration herbier_data.json → herbier.db
 ======================================================
-À lancer UNE SEULE FOIS depuis le dossier Herbier_app/ :
+À lancer depuis le dossier Herbier_app/ :
 
-  python migrate.py
+  python migrate.py                         → herbier_data.json
+  python migrate.py ancien.json --silencieux
 
 Ce script :
-  1. Lit herbier_data.json (ancien format)
+  1. Lit herbier_data.json (ancien format) au fil de l'eau, entrée par entrée
+     (le tableau JSON n'est jamais chargé en entier)
   2. Convertit chaque entrée en objet Python (nouveau modèle)
-  3. Insère dans herbier.db via database.py
-  4. Affiche un rapport de migration
+  3. Insère dans herbier.db via database.py, par lots de TAILLE_LOT entrées :
+     une transaction par lot, qui enregistre aussi le point de reprise
+  4. Affiche un rapport de migration (avec le débit)
+
+Reprise : le point de reprise (table reprises_migration : entrées traitées,
+"id" ancien de la dernière) est propre à chaque nom de fichier. Relancer le
+script après une interruption reprend au premier lot non enregistré ; le
+relancer après une migration complète n'ajoute rien (aucun doublon). Les
+entrées ajoutées en fin de fichier depuis sont migrées.
 
 Correspondances de champs :
   ancien "maladies"  → nouveau "proprietes"
   ancien "lien"      → nouveau "liens"  (chemin local conservé)
   ancien "_type"     → déduit du champ "partie" si possible, sinon "brute" par défaut
-  ancien "id"        → ignoré (nouvel id auto-incrémenté SQLite)
+  ancien "id"        → non repris (nouvel id auto-incrémenté SQLite) ;
+                       sert à vérifier le point de reprise
 """
 
+import argparse
 import json
 import os
 import sys
+import time
+from typing import Iterator, TextIO
 
 # ── S'assure qu'on peut importer les modules du projet ────────────────────────
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from models import creer_plante
-from database import init_db, sauvegarder_plante
+from database import (connexion, enregistrer_reprise_migration, get_reprise_migration,
+                      init_db, sauvegarder_plantes)
 
 JSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "herbier_data.json")
 
+TAILLE_LOT = 1000            # entrées par transaction (et par point de reprise)
+TAILLE_LECTURE = 64 * 1024   # caractères lus à la fois dans le fichier JSON
+
 
 def deviner_type(entree: dict) -> str:
     """
@@ -108,69 +125,220 @@ def migrer_entree(entree: dict) -> tuple:
     return obj, avertissements
 
 
-def migrer():
-    """Lance la migration complète."""
-    if not os.path.exists(JSON_PATH):
-        print(f"❌ Fichier introuvable : {JSON_PATH}")
-        print("   Place herbier_data.json dans le même dossier que migrate.py")
-        return
+# ══════════════════════════════════════════════════════════════════════════════
+# LECTURE INCRÉMENTALE DU TABLEAU JSON
+# ══════════════════════════════════════════════════════════════════════════════
 
-    print("🌿 Migration herbier_data.json → herbier.db")
-    print("=" * 50)
-
-    # Charge le JSON
-    with open(JSON_PATH, "r", encoding="utf-8") as f:
-        try:
-            donnees = json.load(f)
-        except json.JSONDecodeError as e:
-            print(f"❌ Erreur de lecture JSON : {e}")
+def lire_entrees(f: TextIO, taille_lecture: int = TAILLE_LECTURE) -> Iterator[object]:
+    """
+    Générateur : les éléments du tableau JSON de `f`, un par un. Seul le
+    texte de l'entrée en cours (et la fin du bloc lu) est gardé en mémoire.
+    ValueError si le fichier n'est pas un tableau JSON valide (les entrées
+    précédant l'erreur ont déjà été produites).
+    """
+    decodeur = json.JSONDecoder()
+    tampon, pos, fin = "", 0, False
+
+    def lire_plus():
+        nonlocal tampon, pos, fin
+        suite = f.read(taille_lecture)
+        fin = not suite
+        tampon, pos = tampon[pos:] + suite, 0
+
+    def prochain_caractere() -> str:
+        """Premier caractère non blanc à partir de pos ("" en fin de fichier)."""
+        nonlocal pos
+        while True:
+            while pos < len(tampon) and tampon[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(tampon) or fin:
+                return tampon[pos:pos + 1]
+            lire_plus()
+
+    if prochain_caractere() != "[":
+        raise ValueError("le JSON doit être une liste")
+    pos += 1
+    premier = True
+    while True:
+        c = prochain_caractere()
+        if c == "]":
             return
-
-    if not isinstance(donnees, list):
-        print("❌ Format inattendu : le JSON doit être une liste.")
+        if not premier:
+            if c != ",":
+                raise ValueError(f"« , » ou « ] » attendu, trouvé {c!r}" if c
+                                 else "fin de fichier avant la fin de la liste")
+            pos += 1
+            prochain_caractere()
+        # Une entrée coupée par la fin du bloc : lire la suite et recommencer
+        while True:
+            try:
+                entree, fin_entree = decodeur.raw_decode(tampon, pos)
+                if fin_entree < len(tampon) or fin:
+                    break
+            except json.JSONDecodeError as e:
+                if fin:
+                    raise ValueError(f"JSON invalide : {e.msg}") from None
+            lire_plus()
+        pos = fin_entree
+        premier = False
+        yield entree
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MIGRATION
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _par_lots(entrees: Iterator[object], taille: int) -> Iterator[list[tuple[int, object]]]:
+    """Regroupe les entrées en lots de (index dans le tableau, entrée)."""
+    lot = []
+    for i, entree in enumerate(entrees):
+        lot.append((i, entree))
+        if len(lot) >= taille:
+            yield lot
+            lot = []
+    if lot:
+        yield lot
+
+
+def _id_ancien(entree) -> str | None:
+    id_ = entree.get("id") if isinstance(entree, dict) else None
+    return None if id_ is None else str(id_)
+
+
+def migrer(chemin: str = None, taille_lot: int = TAILLE_LOT, details: bool = True):
+    """
+    Lance (ou reprend) la migration de `chemin` (défaut : JSON_PATH).
+    details : afficher une ligne par entrée migrée (sinon une par lot)
+    """
+    chemin = chemin or JSON_PATH
+    if not os.path.exists(chemin):
+        print(f"❌ Fichier introuvable : {chemin}")
+        print("   Place herbier_data.json dans le même dossier que migrate.py")
         return
 
-    print(f"📄 {len(donnees)} entrée(s) trouvée(s) dans le JSON\n")
+    print(f"🌿 Migration {os.path.basename(chemin)} → herbier.db")
+    print("=" * 50)
 
     # Initialise la base
     init_db()
 
-    succes = []
-    erreurs = []
-
-    for i, entree in enumerate(donnees, 1):
-        nom = entree.get("nom", f"[entrée {i}]")
-        try:
-            obj, avertissements = migrer_entree(entree)
+    source = os.path.basename(chemin)
+    reprise = get_reprise_migration(source) or {}
+    deja = reprise.get("entrees", 0)
+    nb_plantes, nb_erreurs = reprise.get("plantes", 0), reprise.get("erreurs", 0)
+    if deja:
+        print(f"↪  Reprise : {deja} entrée(s) déjà traitée(s) le {reprise['mis_a_jour']} "
+              f"({nb_plantes} plante(s) créée(s))\n")
 
-            if not obj.nom:
-                erreurs.append((nom, "Nom vide — entrée ignorée"))
-                continue
+    traitees = vues = 0
+    erreurs = []   # (numéro d'entrée, nom, message) de cette exécution
+    debut = time.perf_counter()
 
-            new_id = sauvegarder_plante(obj)
-            type_label = {"brute": "🌿 Plante brute", "complement": "💊 Complément",
-                          "he": "💧 HE", "jardin": "🌱 Jardin"}.get(obj.TYPE, obj.TYPE)
-            print(f"  ✅ [{i}] {obj.nom} → {type_label} (id={new_id})")
-            for avert in avertissements:
-                print(f"     ⚠  {avert}")
-            succes.append(obj.nom)
+    with open(chemin, "r", encoding="utf-8-sig") as f:
+        try:
+            for lot in _par_lots(lire_entrees(f), taille_lot):
+                vues = lot[-1][0] + 1
+                # Entrées déjà migrées : lues (le JSON est séquentiel) mais pas converties
+                for i, entree in lot:
+                    if i == deja - 1:
+                        _verifier_reprise(entree, reprise)
+                lot = [(i, entree) for i, entree in lot if i >= deja]
+                if not lot:
+                    continue
+
+                erreurs_avant = len(erreurs)
+                a_sauver = []   # (numéro d'entrée, objet, avertissements)
+                for i, entree in lot:
+                    nom = entree.get("nom", f"[entrée {i + 1}]") if isinstance(entree, dict) \
+                        else f"[entrée {i + 1}]"
+                    try:
+                        obj, avertissements = migrer_entree(entree)
+                        if not obj.nom:
+                            erreurs.append((i + 1, nom, "Nom vide — entrée ignorée"))
+                            continue
+                        a_sauver.append((i + 1, obj, avertissements))
+                    except Exception as e:
+                        erreurs.append((i + 1, nom, str(e)))
+                        print(f"  ❌ [{i + 1}] {nom} → Erreur : {e}")
+
+                # Le lot et son point de reprise : une seule transaction
+                with connexion() as conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    ids, echecs = sauvegarder_plantes((obj for _, obj, _ in a_sauver),
+                                                      taille_lot=max(len(a_sauver), 1))
+                    messages_echec = dict(echecs)
+                    for k, ((i, obj, avertissements), new_id) in enumerate(zip(a_sauver, ids)):
+                        if new_id is None:
+                            erreurs.append((i, obj.nom, messages_echec.get(k, "échec d'enregistrement")))
+                            print(f"  ❌ [{i}] {obj.nom} → Erreur : {messages_echec.get(k)}")
+                            continue
+                        nb_plantes += 1
+                        if details:
+                            type_label = {"brute": "🌿 Plante brute", "complement": "💊 Complément",
+                                          "he": "💧 HE", "jardin": "🌱 Jardin"}.get(obj.TYPE, obj.TYPE)
+                            print(f"  ✅ [{i}] {obj.nom} → {type_label} (id={new_id})")
+                            for avert in avertissements:
+                                print(f"     ⚠  {avert}")
+                    nb_erreurs += len(erreurs) - erreurs_avant
+                    enregistrer_reprise_migration(source, lot[-1][0] + 1, _id_ancien(lot[-1][1]),
+                                                  nb_plantes, nb_erreurs)
+                traitees += len(lot)
+                if not details:
+                    print(f"  … {lot[-1][0] + 1} entrée(s) traitée(s)", flush=True)
+        except ValueError as e:
+            print(f"❌ Migration interrompue après {deja + traitees} entrée(s) : {e}")
+            print("   Les lots précédents sont enregistrés : corrige le fichier puis relance.")
+            return
 
-        except Exception as e:
-            erreurs.append((nom, str(e)))
-            print(f"  ❌ [{i}] {nom} → Erreur : {e}")
+    duree = time.perf_counter() - debut
 
     # Rapport final
     print("\n" + "=" * 50)
-    print(f"✅ Migration terminée : {len(succes)} succès, {len(erreurs)} erreur(s)")
+    if vues < deja:
+        print(f"⚠️  Le fichier ne compte que {vues} entrée(s), {deja} ont déjà été traitées : "
+              f"rien n'a été migré.")
+        return
+    if not traitees:
+        print(f"✅ Rien à migrer : les {deja} entrée(s) du fichier ont déjà été traitées.")
+        return
+    print(f"✅ Migration terminée : {traitees} entrée(s) traitée(s) en {duree:.1f} s "
+          f"({traitees / max(duree, 1e-6):,.0f} entrées/s)")
+    print(f"   Total du fichier : {nb_plantes} plante(s) créée(s), {nb_erreurs} erreur(s)")
     if erreurs:
         print("\nEntrées en erreur :")
-        for nom, msg in erreurs:
-            print(f"  ✗ {nom} : {msg}")
+        for i, nom, msg in erreurs:
+            print(f"  ✗ [{i}] {nom} : {msg}")
 
     print("\n💡 Tu peux maintenant compléter les fiches dans l'app :")
     print("   python app.py  →  http://localhost:5000")
-    print("\n⚠️  Le fichier herbier_data.json n'a pas été modifié (conservation de l'original).")
+    print("\n⚠️  Le fichier JSON n'a pas été modifié (conservation de l'original).")
+
+
+def _verifier_reprise(entree, reprise: dict):
+    """
+    La dernière entrée déjà traitée doit avoir le même "id" ancien (s'il est
+    connu) qu'au moment de l'enregistrement du point de reprise : sinon le
+    fichier a été modifié avant ce point et reprendre créerait des doublons
+    ou des trous.
+    """
+    attendu = reprise.get("dernier_id")
+    if attendu is not None and _id_ancien(entree) != attendu:
+        raise ValueError(f"le fichier a changé depuis la dernière migration (entrée "
+                         f"{reprise['entrees']} : id {_id_ancien(entree)!r} au lieu de {attendu!r})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python migrate.py",
+                                     description="Migration de l'ancien herbier_data.json.")
+    parser.add_argument("fichier", nargs="?", default=None,
+                        help="fichier JSON de l'ancienne version (défaut : herbier_data.json)")
+    parser.add_argument("--lot", type=int, default=TAILLE_LOT,
+                        help=f"entrées par transaction (défaut : {TAILLE_LOT})")
+    parser.add_argument("--silencieux", action="store_true",
+                        help="une ligne par lot au lieu d'une par entrée")
+    options = parser.parse_args(argv)
+    migrer(options.fichier, options.lot, details=not options.silencieux)
 
 
 if __name__ == "__main__":
-    migrer()
+    main()
@@ -10,22 +10,44 @@ Hiérarchie des classes :
     └── PlanteJardin
 
 Chaque classe correspond à une table SQLite et à un type de fiche Word.
+
+Toutes les classes sont des dataclasses à __slots__ : pas de __dict__ par
+instance (moins de mémoire quand toute la collection est chargée, accès aux
+attributs plus rapides), et to_dict() lit une liste de champs calculée une
+fois par classe.
+Conséquence : on ne peut pas ajouter d'attribut qui ne soit pas un champ
+déclaré (voir Plante._extrait pour un attribut « technique »).
 """
 
-from dataclasses import dataclass, field
-from typing import Optional
+from dataclasses import dataclass, field, fields
+from operator import attrgetter
+from typing import ClassVar, Optional
+
+
+def _serialisable(cls):
+    """
+    Décorateur (au-dessus de @dataclass) : précalcule les champs publics de la
+    classe et un attrgetter qui les lit tous en un appel, pour to_dict().
+    À appliquer à chaque classe, les sous-classes comprises.
+    """
+    cls._CHAMPS_PUBLICS = tuple(f.name for f in fields(cls) if not f.name.startswith("_"))
+    cls._lire_champs = attrgetter(*cls._CHAMPS_PUBLICS)
+    return cls
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CLASSE DE BASE
 # ══════════════════════════════════════════════════════════════════════════════
 
-@dataclass
+@_serialisable
+@dataclass(slots=True)
 class Plante:
     """
     Classe de base — attributs communs à tous les types.
     Ne pas instancier directement.
     """
+    _CHAMPS_PUBLICS: ClassVar[tuple[str, ...]]   # renseigné par @_serialisable
+
     TYPE: str = field(default="base", init=False)
 
     id:           Optional[int] = None
@@ -44,16 +66,20 @@ class Plante:
     liens:        str  = ""          # Ressources en ligne (label:url, ...)
     notes:        str  = ""          # Notes personnelles
 
+    # Extrait surligné posé par la recherche plein texte (hors API / to_dict)
+    _extrait:     Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
     def to_dict(self) -> dict:
         """Sérialise l'objet en dictionnaire (pour l'API JSON)."""
-        return {k: v for k, v in self.__dict__.items() if not k.startswith("_")}
+        return dict(zip(self._CHAMPS_PUBLICS, self._lire_champs(self)))
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # SOUS-CLASSES
 # ══════════════════════════════════════════════════════════════════════════════
 
-@dataclass
+@_serialisable
+@dataclass(slots=True)
 class PlanteBrute(Plante):
     """
     Plante utilisée sous forme brute : tisane, décoction, macérat, teinture...
@@ -70,7 +96,8 @@ class PlanteBrute(Plante):
     conditionnement:  str = ""   # Vrac, sachets, bocal...
 
 
-@dataclass
+@_serialisable
+@dataclass(slots=True)
 class Complement(Plante):
     """
     Complément alimentaire sous forme de produit fini.
@@ -90,7 +117,8 @@ class Complement(Plante):
     conditionnement: str = ""   # Boîte 90 gélules, flacon...
 
 
-@dataclass
+@_serialisable
+@dataclass(slots=True)
 class HuileEssentielle(Plante):
     """
     Huile essentielle pure (non mélangée).
@@ -109,7 +137,8 @@ class HuileEssentielle(Plante):
     dlc:                str = ""   # Date limite de consommation
 
 
-@dataclass
+@_serialisable
+@dataclass(slots=True)
 class PlanteJardin(Plante):
     """
     Plante cultivée au jardin ou en pot.
@@ -133,7 +162,8 @@ class PlanteJardin(Plante):
 # JOURNAL DE CURE
 # ══════════════════════════════════════════════════════════════════════════════
 
-@dataclass
+@_serialisable
+@dataclass(slots=True)
 class EntreeJournal:
     """
     Entrée du journal de cure pour une plante / complément / HE.
@@ -145,6 +175,12 @@ class EntreeJournal:
     action:    str  = ""   # début cure, fin cure, observation, achat...
     notes:     str  = ""   # Notes libres
 
+    _CHAMPS_PUBLICS: ClassVar[tuple[str, ...]]   # renseigné par @_serialisable
+
+    def to_dict(self) -> dict:
+        """Sérialise l'entrée en dictionnaire (pour l'API JSON)."""
+        return dict(zip(self._CHAMPS_PUBLICS, self._lire_champs(self)))
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CONSTANTES D'INTERFACE
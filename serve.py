@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+serve.py — Lancement de Mon Herbier sur un serveur WSGI de production
+======================================================================
+Serveur Waitress (100 % Python, Windows / macOS / Linux), multi-threadé,
+sans mode debug. Application et schéma de base chargés une seule fois.
+
+  python serve.py                       → http://0.0.0.0:5000, 8 threads
+  python serve.py --threads 16 --port 8000 --no-browser
+  python app.py                         → équivalent (appelle serve.main avec son app)
+
+Variables d'environnement (valeurs par défaut des options) :
+  HERBIER_HOST, HERBIER_PORT, HERBIER_THREADS, HERBIER_CONNECTION_LIMIT
+
+Arrêt : Ctrl+C, SIGTERM ou bouton « Quitter » — le serveur cesse d'accepter
+des connexions, termine les requêtes et imports en cours, puis ferme les
+connexions SQLite.
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+import webbrowser
+
+# ── S'assure qu'on peut importer les modules du projet ────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from waitress import create_server
+from waitress import wasyncore
+
+import database
+from database import init_db, fermer_pool
+from suggestions import construire_suggestions
+from taches import arreter_taches
+
+THREADS = 8              # requêtes traitées simultanément
+CONNECTION_LIMIT = 100   # connexions ouvertes simultanément (au-delà : mise en attente)
+CHANNEL_TIMEOUT = 120    # s d'inactivité avant fermeture d'une connexion (flux SSE : keep-alive 15 s)
+
+
+def lire_options(argv=None) -> argparse.Namespace:
+    env = os.environ.get
+    parser = argparse.ArgumentParser(description="Mon Herbier — serveur de production (Waitress)")
+    parser.add_argument("--host", default=env("HERBIER_HOST", "0.0.0.0"),
+                        help="adresse d'écoute (0.0.0.0 = tout le réseau local)")
+    parser.add_argument("--port", type=int, default=int(env("HERBIER_PORT", 5000)))
+    parser.add_argument("--threads", type=int, default=int(env("HERBIER_THREADS", THREADS)),
+                        help="nombre de threads de traitement des requêtes")
+    parser.add_argument("--connection-limit", type=int,
+                        default=int(env("HERBIER_CONNECTION_LIMIT", CONNECTION_LIMIT)))
+    parser.add_argument("--no-browser", action="store_true",
+                        help="ne pas ouvrir le navigateur au démarrage")
+    parser.add_argument("--dev", action="store_true",
+                        help="serveur de développement Flask (debug, mono-poste)")
+    return parser.parse_args(argv)
+
+
+def creer_serveur(options: argparse.Namespace, app):
+    """Crée le serveur Waitress et branche l'arrêt propre sur l'application."""
+    # Le pool SQLite suit le nombre de threads : jamais d'attente de connexion
+    database.POOL_TAILLE = max(database.POOL_TAILLE, options.threads)
+    fermer_pool()
+    init_db()
+    construire_suggestions()   # index de l'autocomplétion, prêt dès la 1re frappe
+
+    serveur = create_server(app, host=options.host, port=options.port,
+                            threads=options.threads,
+                            connection_limit=options.connection_limit,
+                            channel_timeout=CHANNEL_TIMEOUT,
+                            ident="Mon Herbier")
+    carte = getattr(serveur, "map", None) or serveur._map
+
+    demande = threading.Event()
+
+    def arreter():
+        if demande.is_set():      # déjà demandé (double clic, second signal)
+            return
+        demande.set()
+        # Exécuté dans la boucle réseau (trigger) : ferme l'écoute et les
+        # connexions, la boucle se termine d'elle-même
+        serveur.trigger.pull_trigger(lambda: wasyncore.close_all(carte))
+
+    app.config["HERBIER_ARRET"] = arreter
+    signal.signal(signal.SIGTERM, lambda *_: arreter())
+    return serveur
+
+
+def main(argv=None, app=None):
+    """
+    Lance le serveur. `app` : application Flask déjà chargée (python app.py) ;
+    par défaut importée ici, pour ne jamais charger app.py deux fois.
+    """
+    if app is None:
+        from app import app
+    options = lire_options(argv)
+    url = f"http://localhost:{options.port}"
+
+    if options.dev:
+        init_db()
+        construire_suggestions()
+        print(f"🌿 Mon Herbier (développement) — {url}")
+        app.run(debug=True, use_reloader=False, host=options.host, port=options.port)
+        return
+
+    serveur = creer_serveur(options, app)
+    print(f"🌿 Mon Herbier — {url}  ({options.threads} threads)")
+    # host="0.0.0.0" → accessible depuis le réseau local WiFi
+    # Depuis ton téléphone : http://<IP_DE_TON_PC>:5000
+    # Pour trouver ton IP : ipconfig (Windows) → "Adresse IPv4"
+    print("   Ctrl+C pour quitter")
+    if not options.no_browser:
+        threading.Timer(1.2, lambda: webbrowser.open(url)).start()
+    try:
+        serveur.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.task_dispatcher.shutdown()   # attend la fin des requêtes en cours
+        arreter_taches()                     # imports en cours menés à terme
+        fermer_pool()
+        print("\n🌿 Au revoir !")
+
+
+if __name__ == "__main__":
+    main()
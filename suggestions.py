@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+suggestions.py — Autocomplétion de la barre de recherche
+=========================================================
+Index de préfixes en mémoire sur le nom, le nom latin et la famille, sans
+casse ni accents : « meli » propose « Mélisse », « Melissa officinalis »...
+Chaque champ est indexé depuis son début et depuis chacun de ses mots
+(« vraie » trouve « Lavande vraie »).
+
+  suggerer("lav")          → [{"champ": "nom", "texte": "Lavande vraie", "id": 12, ...}, ...]
+  GET /api/suggest?q=lav   → même chose en JSON
+
+Structure : par champ, une liste triée de (clé, valeur). Les clés qui
+commencent par un préfixe forment une tranche contiguë, trouvée par bisect :
+O(log n) + le nombre de suggestions renvoyées, quelle que soit la taille
+de l'herbier.
+
+Fraîcheur :
+  - construit au démarrage (construire_suggestions, appelée par serve.py) ;
+  - mis à jour plante par plante après chaque écriture de database.py
+    (sauvegarder_plante, sauvegarder_plantes, supprimer_plante) via
+    database.SUIVI_PLANTES ;
+    les écritures sont signalées après leur commit, éventuellement dans le
+    désordre (écrivains concurrents) : elles sont appliquées dans l'ordre
+    des révisions ;
+  - reconstruit en entier, dans un thread à part (la recherche continue sur
+    l'index actuel), s'il a manqué une révision, ou si le compteur de
+    révision de la base a avancé sans lui (écriture d'un autre processus :
+    import_tableur.py, migrate.py — compteur relu au plus une fois toutes
+    les VERIFICATION_EXTERNE secondes, pas à chaque frappe).
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Iterable, Iterator
+
+import database
+
+LIMITE_DEFAUT = 8
+LIMITE_MAX = 20
+VERIFICATION_EXTERNE = 2.0   # s entre deux lectures du compteur de révision de la base
+EN_ATTENTE_MAX = 1000        # révisions reçues en avance gardées (au-delà : reconstruction)
+
+CHAMPS = ("nom", "latin", "famille")
+# Ordre de présentation : début du nom, puis mot du nom, puis latin, famille
+ORDRE = [(champ, depuis_un_mot) for champ in CHAMPS for depuis_un_mot in (False, True)]
+
+_MOT = re.compile(r"\w+")
+
+SQL_TOUTES_PLANTES = "SELECT id, type, nom, latin, famille FROM plantes"   # construction complète
+
+
+def plier(texte: str) -> str:
+    """Texte → forme de comparaison : « Lavande  VRAIE » → « lavande vraie » (sans accents)."""
+    decompose = unicodedata.normalize("NFKD", texte.casefold())
+    if not decompose.isascii():
+        decompose = "".join(c for c in decompose if not unicodedata.combining(c))
+    return " ".join(_MOT.findall(decompose))
+
+
+def _cles(texte: str) -> tuple[str, list[str]]:
+    """(clé du champ entier, clés depuis chacun des mots suivants)."""
+    plie = plier(texte or "")
+    mots = [plie[i + 1:] for i, c in enumerate(plie) if c == " "]
+    return plie, mots
+
+
+class IndexPrefixes:
+    """Liste triée de (clé, valeur) ; recherche de toutes les clés d'un préfixe."""
+
+    def __init__(self, entrees: Iterable[tuple[str, object]] = ()):
+        self._entrees = sorted(entrees)
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def ajouter(self, cle: str, valeur):
+        insort(self._entrees, (cle, valeur))
+
+    def retirer(self, cle: str, valeur):
+        i = bisect_left(self._entrees, (cle, valeur))
+        if i < len(self._entrees) and self._entrees[i] == (cle, valeur):
+            del self._entrees[i]
+
+    def chercher(self, prefixe: str) -> Iterator:
+        """Valeurs des clés qui commencent par `prefixe`, dans l'ordre des clés."""
+        i = bisect_left(self._entrees, (prefixe,))
+        while i < len(self._entrees) and self._entrees[i][0].startswith(prefixe):
+            yield self._entrees[i][1]
+            i += 1
+
+
+class IndexSuggestions:
+    """
+    Les plantes (id → type, nom, latin, famille) et un IndexPrefixes par
+    (champ, depuis un mot). Les familles sont indexées une fois chacune
+    (clé pliée → orthographe affichée, ids des plantes).
+    """
+
+    def __init__(self):
+        self.revision = None   # révision de la base reflétée par l'index (None : jamais construit)
+        self._signalee = 0     # plus haute révision connue (signalée ou lue en base)
+        self._chemin = None    # base indexée (database.DB_PATH au moment de la construction)
+        self._verifiee = 0.0   # time.monotonic() de la dernière lecture du compteur en base
+        # Révisions signalées en avance (la précédente n'est pas encore arrivée)
+        self._en_attente: dict[int, tuple[list[int], list[int], list]] = {}
+        self._plantes: dict[int, tuple[str, str, str, str]] = {}
+        self._familles: dict[str, tuple[str, set[int]]] = {}
+        self._index: dict[tuple[str, bool], IndexPrefixes] = {cle: IndexPrefixes() for cle in ORDRE}
+        self._verrou = threading.Lock()
+        self._construction = threading.Lock()   # une seule reconstruction à la fois
+
+    # ── Construction et mise à jour ──────────────────────────────────────────
+
+    def construire(self):
+        """Relit toutes les plantes et reconstruit l'index (lecture cohérente avec la révision)."""
+        with database.connexion() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            revision = conn.execute("SELECT numero FROM revision WHERE id = 1").fetchone()
+            lignes = conn.execute(SQL_TOUTES_PLANTES).fetchall()
+        with self._verrou:
+            self._plantes, self._familles = {}, {}
+            entrees = {cle: [] for cle in ORDRE}
+            for ligne in lignes:
+                for cle, index, valeur in self._enregistrer(*ligne):
+                    entrees[index].append((cle, valeur))
+            self._index = {cle: IndexPrefixes(e) for cle, e in entrees.items()}
+            self.revision = revision[0] if revision else 0
+            if self._chemin != database.DB_PATH:
+                self._chemin, self._signalee = database.DB_PATH, 0
+            self._signalee = max(self._signalee, self.revision)
+            self._verifiee = time.monotonic()
+            self._appliquer_en_attente()
+
+    def _enregistrer(self, id_, type_, nom, latin, famille) -> Iterator[tuple]:
+        """Mémorise une plante ; produit les (clé pliée, index, valeur) à ajouter."""
+        self._plantes[id_] = (type_, nom or "", latin or "", famille or "")
+        for champ, texte in (("nom", nom), ("latin", latin)):
+            debut, mots = _cles(texte)
+            if debut:
+                yield debut, (champ, False), id_
+                for mot in mots:
+                    yield mot, (champ, True), id_
+        debut, mots = _cles(famille)
+        if debut:
+            affichee, ids = self._familles.setdefault(debut, (famille.strip(), set()))
+            if not ids:   # nouvelle famille : indexée une seule fois
+                yield debut, ("famille", False), debut
+                for mot in mots:
+                    yield mot, ("famille", True), debut
+            ids.add(id_)
+
+    def _ajouter(self, id_, type_, nom, latin, famille):
+        for cle, index, valeur in self._enregistrer(id_, type_, nom, latin, famille):
+            self._index[index].ajouter(cle, valeur)
+
+    def _retirer(self, id_):
+        ancienne = self._plantes.pop(id_, None)
+        if ancienne is None:
+            return
+        _, nom, latin, famille = ancienne
+        for champ, texte in (("nom", nom), ("latin", latin)):
+            debut, mots = _cles(texte)
+            if debut:
+                self._index[(champ, False)].retirer(debut, id_)
+                for mot in mots:
+                    self._index[(champ, True)].retirer(mot, id_)
+        debut, mots = _cles(famille)
+        if debut in self._familles:
+            ids = self._familles[debut][1]
+            ids.discard(id_)
+            if not ids:
+                del self._familles[debut]
+                self._index[("famille", False)].retirer(debut, debut)
+                for mot in mots:
+                    self._index[("famille", True)].retirer(mot, debut)
+
+    def suivre(self, revision: int, ids_ecrits: list[int], ids_supprimes: list[int]):
+        """
+        Appelée par database.py après chaque écriture validée
+        (database.SUIVI_PLANTES). Appliquée dès que c'est la révision qui suit
+        celle de l'index ; une révision reçue en avance attend les
+        précédentes (si l'une d'elles n'arrive jamais : reconstruction).
+        """
+        lignes = []
+        if ids_ecrits and self.revision is not None:
+            with database.connexion() as conn:
+                for debut in range(0, len(ids_ecrits), 500):
+                    morceau = ids_ecrits[debut:debut + 500]
+                    lignes += conn.execute(
+                        f"SELECT id, type, nom, latin, famille FROM plantes "
+                        f"WHERE id IN ({', '.join(['?'] * len(morceau))})", morceau).fetchall()
+        with self._verrou:
+            self._signalee = max(self._signalee, revision)
+            if self.revision is None or revision <= self.revision:
+                return
+            self._en_attente[revision] = (ids_ecrits, ids_supprimes, lignes)
+            self._appliquer_en_attente()
+
+    def _appliquer_en_attente(self):
+        """Applique les révisions reçues qui suivent celle de l'index (sous _verrou)."""
+        while (ecriture := self._en_attente.pop(self.revision + 1, None)) is not None:
+            ids_ecrits, ids_supprimes, lignes = ecriture
+            for id_ in ids_supprimes + ids_ecrits:
+                self._retirer(id_)
+            for ligne in lignes:
+                self._ajouter(*ligne)
+            self.revision += 1
+        for revision in [r for r in self._en_attente if r <= self.revision]:
+            del self._en_attente[revision]
+        if len(self._en_attente) > EN_ATTENTE_MAX:
+            self._en_attente.clear()   # une révision manque : la reconstruction y pourvoira
+
+    # ── Recherche ────────────────────────────────────────────────────────────
+
+    def suggerer(self, texte: str, limite: int = LIMITE_DEFAUT) -> list[dict]:
+        """
+        Au plus `limite` suggestions pour le début de saisie `texte` : plantes
+        (par nom puis par nom latin, chacune une seule fois) puis familles.
+        """
+        prefixe = plier(texte or "")
+        if not prefixe:
+            return []
+        if self.revision is None or self._chemin != database.DB_PATH:
+            # Aucun index utilisable pour cette base : construction immédiate
+            with self._construction:
+                if self.revision is None or self._chemin != database.DB_PATH:
+                    self.construire()
+        elif self._perime():
+            self._reconstruire_en_fond()
+
+        suggestions, vues = [], set()
+        with self._verrou:
+            for champ, depuis_un_mot in ORDRE:
+                for valeur in self._index[(champ, depuis_un_mot)].chercher(prefixe):
+                    if len(suggestions) >= limite:
+                        return suggestions
+                    if valeur in vues:
+                        continue
+                    vues.add(valeur)
+                    suggestions.append(self._suggestion(champ, valeur))
+        return suggestions
+
+    def _perime(self) -> bool:
+        """
+        Vrai si l'index ne reflète pas la dernière révision connue. Les
+        écritures de ce processus sont signalées (suivre) ; celles des autres
+        processus ne sont vues qu'en relisant le compteur de la base, au plus
+        une fois toutes les VERIFICATION_EXTERNE secondes.
+        """
+        maintenant = time.monotonic()
+        if maintenant - self._verifiee >= VERIFICATION_EXTERNE:
+            self._verifiee = maintenant
+            revision = database.get_revision()[0]
+            with self._verrou:
+                self._signalee = max(self._signalee, revision)
+        return self.revision != self._signalee
+
+    def _reconstruire_en_fond(self) -> threading.Thread | None:
+        """Lance construire() dans un thread, sauf si une construction est déjà en cours."""
+        if not self._construction.acquire(blocking=False):
+            return None
+
+        def reconstruire():
+            try:
+                self.construire()
+            except Exception as e:
+                print(f"⚠️  Index des suggestions non reconstruit : {e}")
+            finally:
+                self._construction.release()
+
+        thread = threading.Thread(target=reconstruire, name="suggestions", daemon=True)
+        thread.start()
+        return thread
+
+    def _suggestion(self, champ: str, valeur) -> dict:
+        if champ == "famille":
+            affichee, ids = self._familles[valeur]
+            return {"champ": "famille", "texte": affichee, "nb": len(ids)}
+        type_, nom, latin, _ = self._plantes[valeur]
+        return {"champ": champ, "texte": nom if champ == "nom" else latin,
+                "detail": latin if champ == "nom" else nom, "id": valeur, "type": type_}
+
+    def stats(self) -> dict:
+        with self._verrou:
+            return {"plantes": len(self._plantes), "familles": len(self._familles),
+                    "cles": sum(len(index) for index in self._index.values()),
+                    "revision": self.revision}
+
+
+_index = IndexSuggestions()
+
+
+def suggerer(texte: str, limite: int = LIMITE_DEFAUT) -> list[dict]:
+    """Suggestions pour le début de saisie `texte` (voir IndexSuggestions.suggerer)."""
+    return _index.suggerer(texte, max(1, min(limite, LIMITE_MAX)))
+
+
+def construire_suggestions():
+    """(Re)construit l'index en entier — au démarrage, après init_db()."""
+    _index.construire()
+
+
+def stats_suggestions() -> dict:
+    return _index.stats()
+
+
+def init_suggestions():
+    """Branche la mise à jour incrémentale de l'index sur les écritures de database.py."""
+    database.SUIVI_PLANTES = _index.suivre
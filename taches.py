@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+taches.py — Imports de fiches en arrière-plan
+==============================================
+Un import (extraction des .docx, enregistrement, archivage) peut durer
+longtemps : il est exécuté comme une tâche sur un pool de threads, et la
+requête HTTP reçoit tout de suite un identifiant de tâche.
+
+  tache = lancer_import(dossier, nb_workers)   → TacheImport (démarrée)
+  get_tache(tache.id).etat()                   → progression (dict)
+  tache.attendre_changement(version, delai)    → pour un flux SSE
+
+Un seul import à la fois par dossier : relancer un import sur un dossier
+déjà en cours (double clic) renvoie la tâche existante.
+"""
+
+import itertools
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from database import (
+    connexion, get_fiches_importees, enregistrer_fiches_importees,
+    types_plantes, sauvegarder_plantes, TAILLE_LOT
+)
+from extract_fiches import importer_dossier_incremental
+
+NB_TACHES_SIMULTANEES = 2   # imports exécutés en parallèle (dossiers différents)
+TACHES_CONSERVEES = 20      # tâches terminées gardées en mémoire pour consultation
+
+EN_ATTENTE, EN_COURS, TERMINEE, ECHOUEE = "en_attente", "en_cours", "terminee", "echouee"
+
+
+class TacheImport:
+    """État et progression d'un import (modifié par le thread de la tâche)."""
+
+    def __init__(self, dossier: str, nb_workers: int | None):
+        self.id = uuid.uuid4().hex[:12]
+        self.dossier = dossier
+        self.nb_workers = nb_workers
+        self.statut = EN_ATTENTE
+        self.total = 0             # fiches à relire (nouvelles ou modifiées)
+        self.analysees = 0
+        self.enregistrees = 0
+        self.echouees = 0
+        self.inchangees = 0
+        self.erreurs: list[str] = []
+        self.message = ""
+        self.debut = time.time()
+        self.fin: float | None = None
+        self._version = 0          # incrémentée à chaque changement
+        self._condition = threading.Condition()
+
+    def maj(self, **champs):
+        """Met à jour la progression et réveille les clients en attente."""
+        with self._condition:
+            for nom, valeur in champs.items():
+                setattr(self, nom, valeur)
+            self._version += 1
+            self._condition.notify_all()
+
+    @property
+    def terminee(self) -> bool:
+        return self.statut in (TERMINEE, ECHOUEE)
+
+    def etat(self) -> dict:
+        """Instantané de la progression (sérialisable en JSON)."""
+        with self._condition:
+            return {
+                "id":           self.id,
+                "statut":       self.statut,
+                "total":        self.total,
+                "analysees":    self.analysees,
+                "enregistrees": self.enregistrees,
+                "echouees":     self.echouees,
+                "inchangees":   self.inchangees,
+                "erreurs":      list(self.erreurs),
+                "message":      self.message,
+                "duree":        round((self.fin or time.time()) - self.debut, 2),
+                "version":      self._version,
+            }
+
+    def attendre_changement(self, version: int, delai: float) -> dict:
+        """Attend (au plus `delai` s) une version plus récente que `version`."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._version > version or self.terminee, delai)
+        return self.etat()
+
+
+_executeur: ThreadPoolExecutor | None = None
+_taches: "OrderedDict[str, TacheImport]" = OrderedDict()
+_dossiers_occupes: dict[str, str] = {}   # dossier (chemin réel) → id de la tâche en cours
+_verrou = threading.Lock()
+
+
+def _get_executeur() -> ThreadPoolExecutor:
+    global _executeur
+    if _executeur is None:
+        _executeur = ThreadPoolExecutor(max_workers=NB_TACHES_SIMULTANEES,
+                                        thread_name_prefix="import")
+    return _executeur
+
+
+def lancer_import(dossier: str, nb_workers: int | None = None) -> TacheImport:
+    """
+    Démarre l'import de dossier/A_traiter/ en arrière-plan et retourne la tâche.
+    Si un import de ce dossier est déjà en cours, retourne celui-ci.
+    """
+    cle = os.path.realpath(dossier)
+    with _verrou:
+        en_cours = _dossiers_occupes.get(cle)
+        if en_cours is not None:
+            return _taches[en_cours]
+        tache = TacheImport(dossier, nb_workers)
+        _dossiers_occupes[cle] = tache.id
+        _taches[tache.id] = tache
+        # Oubli des plus anciennes tâches terminées
+        terminees = [t.id for t in _taches.values() if t.terminee]
+        for ancienne in terminees[:max(0, len(_taches) - TACHES_CONSERVEES)]:
+            del _taches[ancienne]
+    _get_executeur().submit(_executer, tache, cle)
+    return tache
+
+
+def get_tache(tache_id: str) -> TacheImport | None:
+    """Retourne la tâche d'import `tache_id` (None si inconnue ou oubliée)."""
+    with _verrou:
+        return _taches.get(tache_id)
+
+
+def arreter_taches(attendre: bool = True):
+    """Arrête le pool de tâches (arrêt du serveur) ; les imports en cours se terminent."""
+    global _executeur
+    with _verrou:
+        executeur, _executeur = _executeur, None
+    if executeur is not None:
+        executeur.shutdown(wait=attendre, cancel_futures=True)
+
+
+def _executer(tache: TacheImport, cle: str):
+    """Corps d'une tâche : extraction, enregistrement par lots, archivage."""
+    try:
+        tache.maj(statut=EN_COURS, message="Analyse des fiches…")
+        _importer(tache)
+        tache.maj(statut=TERMINEE, fin=time.time(), message="Import terminé.")
+    except Exception as e:
+        tache.maj(statut=ECHOUEE, fin=time.time(), message=f"Import interrompu : {e}")
+    finally:
+        with _verrou:
+            _dossiers_occupes.pop(cle, None)
+
+
+def _importer(tache: TacheImport):
+    """
+    Importe les fiches nouvelles ou modifiées de tache.dossier/A_traiter/.
+    Les fiches importées avec succès sont déplacées dans le dossier et
+    enregistrées dans le manifeste (taille, date, empreinte, plante liée).
+    Les fiches en erreur restent dans A_traiter/ pour correction.
+    """
+    def progression(analysees: int, echouees: int, total: int):
+        tache.maj(analysees=analysees, echouees=echouees, total=total)
+
+    plantes_extraites, erreurs, inchangees, a_rafraichir = importer_dossier_incremental(
+        tache.dossier, get_fiches_importees(),
+        nb_workers=tache.nb_workers, progression=progression)
+    # Fiches reconnues à leur empreinte : taille et date mémorisées pour
+    # ne plus les relire au prochain import
+    enregistrer_fiches_importees(a_rafraichir)
+    tache.maj(inchangees=len(inchangees), erreurs=list(erreurs),
+              message="Enregistrement des plantes…")
+
+    # Plantes liées supprimées entre-temps, ou dont la fiche a changé de type
+    # (le type d'une plante existante est immuable) → enregistrées comme nouvelles
+    types = types_plantes(p.id for p, _ in plantes_extraites if p.id is not None)
+    for plante, _ in plantes_extraites:
+        if plante.id is not None and types.get(plante.id) != plante.TYPE:
+            plante.id = None
+
+    # Enregistrement par lots : progression visible après chaque transaction.
+    # Les plantes d'un lot et leurs entrées du manifeste sont écrites dans la
+    # même transaction, avant tout déplacement de fichier : une fiche
+    # enregistrée est toujours connue du manifeste (pas de doublon au
+    # prochain import, même si le déplacement échoue).
+    iterateur = iter(plantes_extraites)
+    while lot := list(itertools.islice(iterateur, TAILLE_LOT)):
+        with connexion() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            ids, echecs = sauvegarder_plantes((p for p, _ in lot), taille_lot=TAILLE_LOT)
+            enregistrees = [(fiche, os.path.join(tache.dossier, fiche.nom_fichier), plante_id)
+                            for (_, fiche), plante_id in zip(lot, ids) if plante_id is not None]
+            enregistrer_fiches_importees(
+                (fiche.nom_fichier, dest, fiche.taille, fiche.mtime, fiche.empreinte, plante_id)
+                for fiche, dest, plante_id in enregistrees)
+        erreurs += [f"{lot[i][0].nom} ({msg})" for i, msg in echecs]
+
+        # Déplacement vers le dossier des fiches après succès ; en cas d'échec,
+        # la fiche reste dans A_traiter/ et le manifeste pointe vers elle
+        non_deplacees = []
+        for fiche, dest, plante_id in enregistrees:
+            try:
+                shutil.move(fiche.chemin, dest)
+            except OSError as e:
+                erreurs.append(f"{fiche.nom_fichier} : enregistrée mais non déplacée ({e})")
+                non_deplacees.append((fiche.nom_fichier, fiche.chemin, fiche.taille,
+                                      fiche.mtime, fiche.empreinte, plante_id))
+        if non_deplacees:
+            enregistrer_fiches_importees(non_deplacees)
+        tache.maj(enregistrees=tache.enregistrees + len(enregistrees),
+                  echouees=len(erreurs), erreurs=list(erreurs))
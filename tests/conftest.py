@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Fixtures communes : chaque test travaille sur une base SQLite neuve dans un
+dossier temporaire (jamais sur herbier.db).
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database                                        # noqa: E402
+from models import PlanteBrute, Complement             # noqa: E402
+
+
+@pytest.fixture
+def base(tmp_path, monkeypatch, capsys):
+    """Base vide à jour du schéma ; retourne son chemin."""
+    chemin = str(tmp_path / "herbier.db")
+    monkeypatch.setattr(database, "DB_PATH", chemin)
+    monkeypatch.setattr(database, "SUIVI_PLANTES", None)
+    database.fermer_pool()
+    database.invalider_cache()
+    database.init_db()
+    capsys.readouterr()
+    yield chemin
+    database.fermer_pool()
+    database.invalider_cache()
+
+
+def brute(nom: str = "Ortie", **champs) -> PlanteBrute:
+    return PlanteBrute(nom=nom, latin=champs.pop("latin", "Urtica dioica"), **champs)
+
+
+def complement(nom: str = "Magnésium", **champs) -> Complement:
+    return Complement(nom=nom, **champs)
+
+
+def ecrire_fiche(chemin: str, lignes: list[str]):
+    """Écrit une fiche .docx (un paragraphe par ligne « Label: Valeur »)."""
+    from docx import Document
+    doc = Document()
+    for ligne in lignes:
+        doc.add_paragraph(ligne)
+    doc.save(chemin)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""Routes Flask (app.py), via le client de test."""
+
+import base64
+import json
+import re
+
+import pytest
+
+import database
+from conftest import brute, complement
+
+
+@pytest.fixture
+def client(base):
+    import app
+    app.app.config.update(TESTING=True)
+    return app.app.test_client()
+
+
+def _lien(reponse, rel: str) -> str | None:
+    """URL de l'en-tête Link pour rel="next" / "prev"."""
+    trouve = re.search(rf'<([^>]+)>; rel="{rel}"', reponse.headers.get("Link", ""))
+    return trouve and trouve.group(1)
+
+
+def test_api_plantes_liens_de_pagination(client):
+    database.sauvegarder_plantes([brute(nom) for nom in ("Ortie", "Sauge", "Thym", "Bourrache")])
+
+    noms, url = [], "/api/plantes?limit=3&fields=nom"
+    while url:
+        reponse = client.get(url)
+        assert reponse.status_code == 200
+        noms += [p["nom"] for p in reponse.json]
+        url = _lien(reponse, "next")
+    assert noms == ["Bourrache", "Ortie", "Sauge", "Thym"]
+
+    premiere = client.get("/api/plantes?limit=3")
+    assert _lien(premiere, "next") and not _lien(premiere, "prev")
+    derniere = client.get(_lien(premiere, "next"))
+    assert [p["nom"] for p in client.get(_lien(derniere, "prev")).json] == noms[:3]
+
+
+def test_api_plantes_en_flux(client):
+    database.sauvegarder_plantes([brute(nom) for nom in ("Ortie", "Sauge", "Thym")])
+    attendu = client.get("/api/plantes").json
+
+    ndjson = client.get("/api/plantes?stream=1")
+    assert ndjson.mimetype == "application/x-ndjson"
+    assert [json.loads(ligne) for ligne in ndjson.text.splitlines()] == attendu
+
+    accept = client.get("/api/plantes", headers={"Accept": "application/x-ndjson"})
+    assert accept.text == ndjson.text
+
+    tableau = client.get("/api/plantes?stream=json&fields=nom&type=brute")
+    assert tableau.mimetype == "application/json"
+    assert json.loads(tableau.text) == [{"nom": "Ortie"}, {"nom": "Sauge"}, {"nom": "Thym"}]
+
+    assert client.get("/api/plantes?stream=json&q=zzz").text == "[]"
+    assert client.get("/api/plantes?stream=1&fields=inconnu").status_code == 400
+
+
+def test_get_conditionnel(client):
+    database.sauvegarder_plante(brute("Ortie"))
+    for url in ("/", "/api/plantes", "/journal"):
+        reponse = client.get(url)
+        etag = reponse.headers["ETag"]
+        assert reponse.status_code == 200 and reponse.headers["Cache-Control"] == "no-cache"
+
+        revalidation = client.get(url, headers={"If-None-Match": etag})
+        assert revalidation.status_code == 304 and revalidation.data == b""
+        assert revalidation.headers["ETag"] == etag
+        depuis = client.get(url, headers={"If-Modified-Since": reponse.headers["Last-Modified"]})
+        assert depuis.status_code == 304
+
+    # Paramètres différents → autre ETag
+    assert client.get("/api/plantes?q=ortie").headers["ETag"] != etag
+
+    # Toute écriture change l'ETag
+    database.sauvegarder_plante(brute("Sauge"))
+    reponse = client.get("/journal", headers={"If-None-Match": etag})
+    assert reponse.status_code == 200 and reponse.headers["ETag"] != etag
+
+
+def test_import_en_arriere_plan(client, tmp_path, monkeypatch):
+    import app
+    from conftest import ecrire_fiche
+    a_traiter = tmp_path / "fiches" / "A_traiter"
+    a_traiter.mkdir(parents=True)
+    ecrire_fiche(str(a_traiter / "ortie.docx"), ["Type: plante brute", "Nom commun: Ortie"])
+    monkeypatch.setattr(app, "DOSSIER_FICHES", str(tmp_path / "fiches"))
+    monkeypatch.setitem(app.app.config, "HERBIER_IMPORT_WORKERS", 1)
+
+    reponse = client.post("/importer", headers={"Accept": "application/json"})
+    assert reponse.status_code == 202
+    assert reponse.headers["Location"] == reponse.json["suivi"]
+
+    # Flux SSE : un événement par changement, jusqu'à la fin de l'import
+    flux = client.get(reponse.json["flux"])
+    assert flux.mimetype == "text/event-stream"
+    etats = [json.loads(ligne[len("data: "):]) for ligne in flux.text.splitlines()
+             if ligne.startswith("data: ")]
+    assert etats[-1]["statut"] == "terminee" and etats[-1]["enregistrees"] == 1
+    assert [e["version"] for e in etats] == sorted(set(e["version"] for e in etats))
+
+    assert client.get(reponse.json["suivi"]).json["statut"] == "terminee"
+    assert [p.nom for p in database.lister_plantes()] == ["Ortie"]
+    assert client.get("/importer/inconnue").status_code == 404
+
+
+
+def test_api_plantes_champs_choisis(client):
+    database.sauvegarder_plante(brute("Ortie", partie="feuilles"))
+    database.sauvegarder_plante(complement("Zinc"))
+
+    assert client.get("/api/plantes?fields=nom,type").json == [
+        {"nom": "Ortie", "TYPE": "brute"}, {"nom": "Zinc", "TYPE": "complement"}]
+    # Champ spécifique : plantes complètes, null pour les autres types
+    assert client.get("/api/plantes?fields=nom,partie,dosage").json == [
+        {"nom": "Ortie", "partie": "feuilles", "dosage": None},
+        {"nom": "Zinc", "partie": "", "dosage": ""}]
+    inconnu = client.get("/api/plantes?fields=nom,poids")
+    assert inconnu.status_code == 400 and "poids" in inconnu.json["erreur"]
+
+
+def test_api_suggest(client):
+    ids, _ = database.sauvegarder_plantes([
+        brute("Sauge officinale", latin="Salvia officinalis", famille="Lamiacées"),
+        brute("Salsepareille", latin="Smilax aspera", famille="Smilacacées"),
+        brute("Ortie", latin="Urtica dioica", famille="Urticacées")])
+
+    suggestions = client.get("/api/suggest?q=sa").json
+    assert [(s["champ"], s["texte"]) for s in suggestions] == [
+        ("nom", "Salsepareille"), ("nom", "Sauge officinale")]   # chaque plante une fois
+    assert suggestions[0]["detail"] == "Smilax aspera" and suggestions[0]["type"] == "brute"
+    assert [s["texte"] for s in client.get("/api/suggest?q=OFFIC").json] == ["Sauge officinale"]
+
+    # Nom latin, puis familles en dernier
+    assert client.get("/api/suggest?q=urtic").json == [
+        {"champ": "latin", "texte": "Urtica dioica", "detail": "Ortie",
+         "id": ids[2], "type": "brute"},
+        {"champ": "famille", "texte": "Urticacées", "nb": 1}]
+    assert len(client.get("/api/suggest?q=s&limit=1").json) == 1
+    assert client.get("/api/suggest?q=").json == []
+
+
+@pytest.mark.parametrize("cle", [[[1], 2], ["2024-05-01", {"id": 1}], [None, 1]])
+def test_curseur_forge_premiere_page(client, cle):
+    from models import EntreeJournal
+    id_ = database.sauvegarder_plante(brute("Ortie"))
+    database.ajouter_entree_journal(EntreeJournal(plante_id=id_, date="2024-05-01",
+                                                  action="achat de printemps"))
+    forge = base64.urlsafe_b64encode(json.dumps(cle).encode()).decode()
+    for sens in ("a", "b"):
+        journal = client.get(f"/journal?cursor={sens}:{forge}")
+        assert journal.status_code == 200
+        assert "achat de printemps" in journal.text
+        assert client.get(f"/?cursor={sens}:{forge}").status_code == 200
+        assert [p["nom"] for p in client.get(f"/api/plantes?cursor={sens}:{forge}").json] == ["Ortie"]
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""Données synthétiques des mesures de performance (bench/generateur.py)."""
+
+import sqlite3
+
+import extract_fiches
+from bench import generateur
+
+
+def test_generateur_deterministe():
+    premiere = list(generateur.generer_plantes(40, graine=7))
+    assert premiere == list(generateur.generer_plantes(40, graine=7))
+    assert premiere != list(generateur.generer_plantes(40, graine=8))
+    assert {p.TYPE for p in premiere} == {"brute", "complement", "he", "jardin"}
+
+
+def test_fiches_generees_relues_a_l_identique(tmp_path, capsys):
+    chemins = generateur.generer_fiches(str(tmp_path), 8, graine=3)
+    for chemin, attendue in zip(chemins, generateur.generer_plantes(8, graine=3)):
+        assert extract_fiches.extraire_fiche(chemin) == attendue
+
+
+def test_herbier_genere(tmp_path, capsys):
+    chemin = str(tmp_path / "herbier.db")
+    generateur.generer_herbier(chemin, 50, 300, graine=1)
+    conn = sqlite3.connect(chemin)
+    assert conn.execute("SELECT count(*) FROM plantes").fetchone()[0] == 50
+    assert conn.execute("SELECT count(*) FROM journal").fetchone()[0] == 300
+    assert conn.execute("SELECT count(*) FROM sqlite_stat1").fetchone()[0] > 0   # ANALYZE
+    conn.close()
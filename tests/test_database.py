@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+"""Couche SQLite : pool de connexions, lectures en flux, cache d'objets."""
+
+import base64
+import json
+import sqlite3
+import threading
+
+import pytest
+
+import database
+from conftest import brute, complement
+
+
+def test_flux_ouverts_ne_bloquent_pas_le_pool(base, monkeypatch):
+    database.sauvegarder_plantes([brute("Ortie"), brute("Sauge"), brute("Thym")])
+    monkeypatch.setattr(database, "POOL_TAILLE", 1)
+    monkeypatch.setattr(database, "POOL_ATTENTE", 0.1)
+    database.fermer_pool()
+
+    # Clients lents : flux commencés mais pas terminés
+    flux = [database.iterer_plantes(), database.iterer_export_plantes(),
+            database.iterer_export_journal()]
+    premieres = [next(f, None) for f in flux]
+    assert premieres[0].nom == "Ortie" and premieres[1][2] == "Ortie"
+
+    assert database.compter_plantes() == 3   # le pool (1 connexion) reste disponible
+    assert [p.nom for p in flux[0]] == ["Sauge", "Thym"]
+    for f in flux:
+        f.close()
+
+
+def _renommer_hors_processus(chemin: str, plante_id: int, nom: str):
+    """Écriture par une connexion indépendante (comme migrate.py dans un autre processus)."""
+    conn = sqlite3.connect(chemin)
+    with conn:
+        conn.execute("UPDATE plantes SET nom = ? WHERE id = ?", (nom, plante_id))
+    conn.close()
+
+
+def test_cache_invalide_par_une_ecriture_externe(base):
+    id_ = database.sauvegarder_plante(brute("Ortie"))
+    assert database.get_plante(id_).nom == "Ortie"
+    assert database.get_plante(id_).nom == "Ortie"
+    assert database.stats_cache()["plantes"]["succes"] >= 1
+
+    _renommer_hors_processus(base, id_, "Grande ortie")
+    assert database.get_plante(id_).nom == "Grande ortie"
+
+    # Un autre thread (autre témoin) voit aussi la nouvelle valeur
+    noms = []
+    lecteur = threading.Thread(target=lambda: noms.append(database.get_plante(id_).nom))
+    lecteur.start()
+    lecteur.join()
+    assert noms == ["Grande ortie"]
+
+    _renommer_hors_processus(base, id_, "Ortie dioïque")
+    assert [p.nom for p in database.lister_plantes()] == ["Ortie dioïque"]
+
+
+def _compter_requetes(monkeypatch) -> list[int]:
+    """
+    Branche MESURE_SQL : le compteur retourné s'incrémente à chaque requête
+    exécutée (hors PRAGMAS d'ouverture de la connexion).
+    """
+    compte = [0]
+
+    def compter(duree: float, nouvelle: bool):
+        compte[0] += nouvelle
+
+    monkeypatch.setattr(database, "MESURE_SQL", compter)
+    database.fermer_pool()   # seules les nouvelles connexions sont chronométrées
+    with database.connexion():
+        pass
+    compte[0] = 0
+    return compte
+
+
+def test_lister_plantes_une_seule_requete(base, monkeypatch):
+    from models import HuileEssentielle, PlanteJardin
+    database.sauvegarder_plantes([
+        brute("Ortie", partie="feuilles"),
+        complement("Magnésium", dosage="300 mg"),
+        HuileEssentielle(nom="Lavande", chemotype="linalol"),
+        PlanteJardin(nom="Basilic", vivace=True),
+    ])
+    compte = _compter_requetes(monkeypatch)
+
+    plantes = database.lister_plantes()
+
+    assert compte[0] == 1
+    assert [(p.nom, p.TYPE) for p in plantes] == [
+        ("Basilic", "jardin"), ("Lavande", "he"), ("Magnésium", "complement"), ("Ortie", "brute")]
+    # Champs spécifiques hydratés sans requête supplémentaire
+    assert [plantes[0].vivace, plantes[1].chemotype, plantes[2].dosage, plantes[3].partie] == [
+        True, "linalol", "300 mg", "feuilles"]
+    assert plantes == [database.get_plante(p.id) for p in plantes]
+
+
+def test_pool_reutilise_les_connexions(base):
+    with database.connexion() as conn:
+        with database.connexion() as imbriquee:
+            assert imbriquee is conn   # réentrant : même connexion, même transaction
+    with database.connexion() as suivante:
+        assert suivante is conn       # rendue au pool, pas fermée
+    assert database.get_pool()._nb_ouvertes == 1
+
+
+def test_pool_rollback_sur_exception(base):
+    try:
+        with database.connexion() as conn:
+            database.sauvegarder_plante(brute("Ortie"))   # imbriqué : pas encore validé
+            raise ValueError("échec")
+    except ValueError:
+        pass
+    assert database.compter_plantes() == 0
+    assert not conn.in_transaction
+
+
+def test_pool_epuise(base, monkeypatch):
+    monkeypatch.setattr(database, "POOL_TAILLE", 1)
+    monkeypatch.setattr(database, "POOL_ATTENTE", 0.1)
+    database.fermer_pool()
+    erreurs = []
+
+    def autre_thread():
+        try:
+            with database.connexion():
+                pass
+        except RuntimeError as e:
+            erreurs.append(str(e))
+
+    with database.connexion():
+        thread = threading.Thread(target=autre_thread)
+        thread.start()
+        thread.join()
+    assert erreurs == ["Aucune connexion SQLite libre après 0.1s"]
+
+    thread = threading.Thread(target=autre_thread)   # connexion rendue : plus d'attente
+    thread.start()
+    thread.join()
+    assert len(erreurs) == 1
+
+
+def _trouvees(recherche: str) -> list[str]:
+    return [p.nom for p in database.lister_plantes(recherche=recherche)]
+
+
+def test_recherche_plein_texte(base):
+    database.sauvegarder_plante(brute("Mélisse", proprietes="Calmante, digestion"))
+    database.sauvegarder_plante(brute("Camomille", proprietes="Digestive, apaise la mélisse"))
+
+    assert _trouvees("melisse") == ["Mélisse", "Camomille"]   # accents ignorés, nom d'abord
+    assert _trouvees("DIGEST") == ["Mélisse", "Camomille"]    # préfixe, casse ignorée
+    assert _trouvees("calmante digestion") == ["Mélisse"]     # tous les mots requis
+    assert _trouvees("!!") == []
+    extrait = database.lister_plantes(recherche="calm")[0]._extrait
+    assert f"{database.SNIPPET_DEBUT}Calmante{database.SNIPPET_FIN}" in extrait
+    assert database.compter_plantes(recherche="melisse") == 2
+
+
+def test_triggers_tiennent_l_index_a_jour(base):
+    ortie = brute("Ortie", posologie="2 tasses")
+    ortie.id = database.sauvegarder_plante(ortie)
+    assert _trouvees("tasses") == ["Ortie"]   # champ de la table spécifique
+
+    ortie.posologie, ortie.proprietes = "1 gélule", "Reminéralisante"
+    database.sauvegarder_plante(ortie)
+    assert _trouvees("tasses") == []
+    assert _trouvees("gelule") == _trouvees("remineralisante") == ["Ortie"]
+
+    database.supprimer_plante(ortie.id)
+    assert _trouvees("ortie") == []
+
+
+def test_index_tenu_a_jour_par_les_ecritures_en_lot(base):
+    ids, _ = database.sauvegarder_plantes([brute("Ortie"), complement("Zinc", forme="gélules")])
+    assert _trouvees("gelules") == ["Zinc"]
+    zinc = database.get_plante(ids[1])
+    zinc.forme = "comprimés"
+    database.sauvegarder_plantes([zinc])
+    assert _trouvees("gelules") == []
+    assert _trouvees("comprimes") == ["Zinc"]
+    with database.connexion() as conn:   # drapeau de l'indexation différée retiré
+        assert conn.execute("SELECT count(*) FROM indexation_differee").fetchone()[0] == 0
+
+
+def test_pagination_par_cle(base):
+    noms = ["Ortie", "achillée", "Ortie", "Bourrache", "Ortie", "Sauge", "Thym"]
+    database.sauvegarder_plantes([brute(nom) for nom in noms])
+    attendus = [(p.nom, p.id) for p in database.lister_plantes()]
+    assert [nom for nom, _ in attendus][:2] == ["achillée", "Bourrache"]   # sans casse
+
+    # En avançant : chaque plante une fois, même à noms égaux
+    pages, curseur = [], None
+    while True:
+        plantes, precedent, suivant = database.lister_plantes_page(limite=3, curseur=curseur)
+        assert (precedent is None) == (curseur is None)
+        pages.append([(p.nom, p.id) for p in plantes])
+        if not suivant:
+            break
+        curseur = suivant
+    assert [len(p) for p in pages] == [3, 3, 1]
+    assert sum(pages, []) == attendus
+
+    # En reculant depuis la dernière page : mêmes pages
+    plantes, precedent, _ = database.lister_plantes_page(limite=3, curseur=precedent)
+    assert [(p.nom, p.id) for p in plantes] == pages[1]
+    plantes, precedent, suivant = database.lister_plantes_page(limite=3, curseur=precedent)
+    assert [(p.nom, p.id) for p in plantes] == pages[0]
+    assert precedent is None and suivant
+
+    # Numéro de page (OFFSET) et curseur invalide (première page)
+    plantes, _, _ = database.lister_plantes_page(limite=3, page=3)
+    assert [(p.nom, p.id) for p in plantes] == pages[2]
+    plantes, _, _ = database.lister_plantes_page(limite=3, curseur="a:n'importe quoi")
+    assert [(p.nom, p.id) for p in plantes] == pages[0]
+
+
+@pytest.mark.parametrize("cle", [[[1], 2], [{"a": 1}, 2], ["Ortie", None], [True, 1],
+                                 ["Ortie", [3]], "Ortie", [1, 2, 3]])
+def test_curseur_forge_ignore(base, cle):
+    database.sauvegarder_plantes([brute("Ortie"), brute("Sauge")])
+    forge = base64.urlsafe_b64encode(json.dumps(cle).encode()).decode()
+    assert database.decoder_curseur(forge) is None
+    # Retour à la première page, sans erreur (ni dans le cache, ni dans SQLite)
+    for sens in ("a", "b"):
+        plantes, _, _ = database.lister_plantes_page(limite=1, curseur=f"{sens}:{forge}")
+        assert [p.nom for p in plantes] == ["Ortie"]
+    assert database.decoder_curseur(database.encoder_curseur(("Ortie", 1))) == ("Ortie", 1)
+    assert database.decoder_curseur(database.encoder_curseur((-1.5, 2))) == (-1.5, 2)
+
+
+def test_sauvegarde_en_lot_isole_les_echecs(base):
+    from types import SimpleNamespace
+    plantes = [brute("Ortie"), complement("Zinc"), brute(None), brute("Sauge"),
+               SimpleNamespace(TYPE="inconnu", nom="Objet"), complement("Fer")]
+    revision = database.get_revision()[0]
+
+    ids, erreurs = database.sauvegarder_plantes(iter(plantes), taille_lot=2)
+
+    assert [i for i, _ in erreurs] == [2, 4]
+    assert "NOT NULL" in erreurs[0][1] and "Type inconnu" in erreurs[1][1]
+    assert ids[2] is None and ids[4] is None
+    assert [database.get_plante(id_).nom for id_ in ids if id_] == ["Ortie", "Zinc", "Sauge", "Fer"]
+    assert database.get_revision()[0] == revision + 3   # une révision par lot
+    assert database.compter_plantes() == 4
+
+    # Mise à jour en lot : mêmes ids, aucune plante ajoutée
+    modifiees = [database.get_plante(id_) for id_ in ids if id_]
+    for p in modifiees:
+        p.notes = "vérifiée"
+    assert database.sauvegarder_plantes(modifiees)[0] == [p.id for p in modifiees]
+    assert {p.notes for p in database.lister_plantes()} == {"vérifiée"}
+    assert database.compter_plantes() == 4
+
+
+def test_sauvegarde_par_upsert(base, monkeypatch):
+    compte = _compter_requetes(monkeypatch)
+    ortie = brute("Ortie", partie="feuilles")
+    ortie.id = database.sauvegarder_plante(ortie)
+    assert compte[0] == 3   # plantes, plantes_brutes, révision : aucune lecture préalable
+
+    ortie.partie = "racines"
+    compte[0] = 0
+    assert database.sauvegarder_plante(ortie) == ortie.id
+    assert compte[0] == 3
+    assert database.get_plante(ortie.id).partie == "racines"
+
+    # Un id disparu de la base est réinséré tel quel
+    database.supprimer_plante(ortie.id)
+    assert database.sauvegarder_plante(ortie) == ortie.id
+    assert database.get_plante(ortie.id) == ortie
+
+    # Le type d'une plante existante n'est jamais modifié
+    autre = complement("Ortie", id=ortie.id)
+    database.sauvegarder_plante(autre)
+    assert database.get_plante(ortie.id).TYPE == "brute"
+
+
+def test_cache_copie_et_invalidation(base, monkeypatch):
+    id_ = database.sauvegarder_plante(brute("Ortie"))
+    lue = database.get_plante(id_)
+    lue.nom = "modifiée sans sauvegarde"
+    database.lister_plantes()[0].nom = "idem"
+
+    compte = _compter_requetes(monkeypatch)
+    assert database.get_plante(id_).nom == "Ortie"   # le cache n'est pas pollué
+    assert [p.nom for p in database.lister_plantes()] == ["Ortie"]
+    assert compte[0] == 0                            # servi par le cache
+    assert database.get_plante(id_ + 1) is None      # absente : jamais mise en cache
+
+    database.sauvegarder_plante(brute("Sauge"))      # toute écriture invalide
+    assert [p.nom for p in database.lister_plantes()] == ["Ortie", "Sauge"]
+    stats = database.stats_cache()
+    assert stats["plantes"]["succes"] >= 1 and stats["listes"]["succes"] >= 1
+
+
+def _index_de(conn: sqlite3.Connection) -> set[str]:
+    return {r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='index' AND name NOT LIKE 'sqlite_%'")}
+
+
+def test_migrations(base, tmp_path, capsys):
+    derniere = database.MIGRATIONS[-1][0]
+    with database.connexion() as conn:
+        assert database.version_schema(conn) == derniere
+        index_neufs = _index_de(conn)
+        assert database.appliquer_migrations(conn) == []   # rien à refaire
+
+    # Base de l'ancien schéma (avant versionnage) : données gardées, index créés
+    ancienne = sqlite3.connect(str(tmp_path / "ancienne.db"))
+    database._creer_tables(ancienne)
+    ancienne.execute("INSERT INTO plantes (type, nom) VALUES ('brute', 'Ortie')")
+    ancienne.commit()
+    assert database.appliquer_migrations(ancienne) == list(range(1, derniere + 1))
+    assert database.version_schema(ancienne) == derniere
+    assert _index_de(ancienne) == index_neufs
+    assert ancienne.execute("SELECT nom FROM plantes").fetchall() == [("Ortie",)]
+    ancienne.close()
+
+    # Base plus récente que le code : refusée
+    recente = sqlite3.connect(str(tmp_path / "recente.db"))
+    recente.execute(f"PRAGMA user_version = {derniere + 1}")
+    try:
+        database.appliquer_migrations(recente)
+    except RuntimeError as e:
+        assert "plus récente que le code" in str(e)
+    else:
+        raise AssertionError("base plus récente acceptée")
+    recente.close()
+
+
+def test_migration_en_echec_annulee(base, tmp_path, monkeypatch, capsys):
+    def echouer(conn):
+        conn.execute("CREATE TABLE essai (x)")
+        raise sqlite3.OperationalError("migration en échec")
+
+    derniere = database.MIGRATIONS[-1][0]
+    monkeypatch.setattr(database, "MIGRATIONS", database.MIGRATIONS + [(derniere + 1, "essai", echouer)])
+    conn = sqlite3.connect(base)
+    try:
+        database.appliquer_migrations(conn)
+    except sqlite3.OperationalError:
+        pass
+    assert database.version_schema(conn) == derniere
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'essai'").fetchone() is None
+    conn.close()
+
+
+def test_journal_global_pagine_et_filtre(base):
+    from models import EntreeJournal
+    ortie = database.sauvegarder_plante(brute("Ortie"))
+    zinc = database.sauvegarder_plante(complement("Zinc"))
+    for plante_id, jour, action in [(ortie, "2024-01-05", "achat"), (zinc, "2024-01-05", "début cure"),
+                                    (ortie, "2024-02-10", "observation"), (zinc, "2024-03-01", "fin cure"),
+                                    (ortie, "2024-03-01", "achat")]:
+        database.ajouter_entree_journal(EntreeJournal(plante_id=plante_id, date=jour, action=action))
+    toutes = database.get_journal_global()
+    assert [e["date"] for e in toutes] == ["2024-03-01", "2024-03-01", "2024-02-10",
+                                           "2024-01-05", "2024-01-05"]
+    assert toutes[0]["nom"] == "Ortie" and toutes[0]["type"] == "brute"
+
+    # Pages de 2 : chaque entrée une fois (dates égales départagées par l'id), puis retour
+    pages, curseur = [], None
+    while True:
+        entrees, precedent, suivant = database.get_journal_global_page(limite=2, curseur=curseur)
+        pages.append([e["id"] for e in entrees])
+        if not suivant:
+            break
+        curseur = suivant
+    assert sum(pages, []) == [e["id"] for e in toutes]
+    entrees, _, _ = database.get_journal_global_page(limite=2, curseur=precedent)
+    assert [e["id"] for e in entrees] == pages[1]
+
+    # Filtres (bornes incluses)
+    filtre = database.get_journal_global(date_debut="2024-01-06", date_fin="2024-03-01")
+    assert [e["action"] for e in filtre] == ["achat", "fin cure", "observation"]
+    assert [e["action"] for e in database.get_journal_global(action="cure")] == ["fin cure", "début cure"]
+    assert {e["nom"] for e in database.get_journal_global(type_filtre="complement")} == {"Zinc"}
+
+
+def test_hydrateurs_restituent_chaque_champ(base):
+    from bench.generateur import generer_plantes
+    plantes = list(generer_plantes(8, graine=5))   # les quatre types, tous champs remplis
+    ids, _ = database.sauvegarder_plantes(plantes)
+    for p, id_ in zip(plantes, ids):
+        p.id = id_
+    database.invalider_cache()
+    assert [database.get_plante(id_) for id_ in ids] == plantes
+    par_id = lambda p: p.id   # noqa: E731
+    assert sorted(database.lister_plantes(), key=par_id) == sorted(plantes, key=par_id)
+
+    # Ligne spécifique absente : valeurs par défaut du type
+    with database.connexion() as conn:
+        conn.execute("DELETE FROM plantes_jardin WHERE plante_id = ?", (ids[3],))
+    database.invalider_cache()
+    jardin = database.get_plante(ids[3])
+    assert jardin.TYPE == "jardin" and jardin.nom == plantes[3].nom
+    assert (jardin.vivace, jardin.emplacement) == (False, "")
+
+    with database.connexion() as conn:
+        conn.execute("UPDATE plantes SET type = 'inconnu' WHERE id = ?", (ids[0],))
+    database.invalider_cache()
+    with pytest.raises(ValueError, match="Type inconnu"):
+        database.get_plante(ids[0])
+
+
+def test_liste_projetee(base, monkeypatch):
+    long_texte = "Reminéralisante. " * 30
+    id_ = database.sauvegarder_plante(brute("Ortie", proprietes=long_texte, bio=True, partie="feuilles"))
+    database.sauvegarder_plante(complement("Zinc"))
+    compte = _compter_requetes(monkeypatch)
+
+    resumes = database.lister_plantes(colonnes=database.COLONNES_LISTE)
+    assert compte[0] == 1
+    ortie = resumes[0]
+    assert isinstance(ortie, database.PlanteResume)
+    assert (ortie.id, ortie.TYPE, ortie.nom, ortie.bio) == (id_, "brute", "Ortie", True)
+    assert ortie.apercu == long_texte[:database.LONGUEUR_APERCU]
+    assert ortie.to_dict() == {"TYPE": "brute", "id": id_, "nom": "Ortie", "latin": "Urtica dioica",
+                               "bio": True, "apercu": ortie.apercu, "quantite": "", "distributeur": ""}
+    assert compte[0] == 1
+
+    # Champ hors projection : plante complète chargée une seule fois
+    assert ortie.partie == "feuilles" and ortie.proprietes == long_texte
+    assert compte[0] == 2
+    assert [p.nom for p in database.lister_plantes(recherche="remineralisante",
+                                                    colonnes=["latin"])] == ["Ortie"]
+    with pytest.raises(ValueError, match="non projetable"):
+        database.lister_plantes(colonnes=["partie"])
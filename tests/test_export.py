@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Export en flux (export.py) : formats, paquets, ligne de commande."""
+
+import csv
+import gzip
+import json
+import os
+import sqlite3
+
+import pytest
+
+import database
+import export
+from conftest import brute
+
+
+def test_export_ne_migre_pas_une_base_ancienne(base, tmp_path):
+    conn = sqlite3.connect(base)
+    conn.execute("PRAGMA user_version = 4")
+    conn.close()
+    database.fermer_pool()
+
+    with pytest.raises(SystemExit, match="version 4"):
+        export.main([str(tmp_path / "plantes.csv"), "--base", base])
+    conn = sqlite3.connect(base)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 4
+    conn.close()
+    assert not os.path.exists(tmp_path / "plantes.csv")
+
+
+def test_export_ne_cree_pas_de_base(base, tmp_path):
+    absente = str(tmp_path / "absente.db")
+    with pytest.raises(SystemExit, match="introuvable"):
+        export.main([str(tmp_path / "plantes.csv"), "--base", absente])
+    assert not os.path.exists(absente)
+
+
+def test_paquets_comptes_en_octets(monkeypatch):
+    monkeypatch.setattr(export, "TAILLE_PAQUET", 10)
+    paquets = list(export._par_paquets(["éééé", "éééé", "abc"]))   # 8 + 8 + 3 octets
+    assert paquets == ["éééééééé".encode(), b"abc"]
+
+
+def _remplir():
+    from models import EntreeJournal, PlanteJardin
+    ids, _ = database.sauvegarder_plantes([
+        brute("Ortie", bio=True, proprietes='Dépurative, "reminéralisante"\nsur deux lignes'),
+        PlanteJardin(nom="Basilic", vivace=False, emplacement="balcon")])
+    database.ajouter_entree_journal(EntreeJournal(plante_id=ids[0], date="2024-05-01", action="achat"))
+    return ids
+
+
+def test_export_csv_et_jsonl(base, tmp_path):
+    ids = _remplir()
+    taille = export.exporter(str(tmp_path / "plantes.csv.gz"))
+    with gzip.open(tmp_path / "plantes.csv.gz", "rt", encoding="utf-8-sig", newline="") as f:
+        lignes = list(csv.DictReader(f))
+    assert os.path.getsize(tmp_path / "plantes.csv.gz") == taille
+    assert list(lignes[0]) == database.COLONNES_EXPORT_PLANTES
+    ortie = next(l for l in lignes if l["nom"] == "Ortie")
+    assert (ortie["id"], ortie["type"], ortie["bio"]) == (str(ids[0]), "brute", "oui")
+    assert ortie["proprietes"] == 'Dépurative, "reminéralisante"\nsur deux lignes'
+    assert next(l for l in lignes if l["nom"] == "Basilic")["vivace"] == "non"
+
+    export.exporter(str(tmp_path / "journal.jsonl"), contenu="journal")
+    with open(tmp_path / "journal.jsonl", encoding="utf-8") as f:
+        journal = [json.loads(ligne) for ligne in f]
+    assert journal == [{"id": 1, "plante_id": ids[0], "plante": "Ortie", "date": "2024-05-01",
+                        "action": "achat", "notes": ""}]
+    with pytest.raises(ValueError, match="Format inconnu"):
+        export.flux_export("xls")
+
+
+def test_export_sqlite_coherent(base, tmp_path):
+    _remplir()
+    export.exporter(str(tmp_path / "copie.db"))
+    copie = sqlite3.connect(tmp_path / "copie.db")
+    assert copie.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    assert copie.execute("SELECT nom FROM plantes ORDER BY nom").fetchall() == [("Basilic",), ("Ortie",)]
+    assert copie.execute("PRAGMA user_version").fetchone()[0] == database.MIGRATIONS[-1][0]
+    copie.close()
+
+
+def test_route_export(base):
+    import app
+    _remplir()
+    client = app.app.test_client()
+    reponse = client.get("/export?format=jsonl&gzip=1")
+    assert reponse.mimetype == "application/gzip"
+    assert 'filename="herbier-plantes-' in reponse.headers["Content-Disposition"]
+    plantes = [json.loads(l) for l in gzip.decompress(reponse.data).decode().splitlines()]
+    assert [p["nom"] for p in plantes] == ["Ortie", "Basilic"]   # ordre des ids
+    assert plantes[0]["bio"] is True
+    assert client.get("/export?format=xls").status_code == 400
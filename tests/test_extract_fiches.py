@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Extraction des fiches .docx (extract_fiches.py)."""
+
+import os
+
+import extract_fiches
+from conftest import ecrire_fiche
+
+
+def _dossier_fiches(tmp_path, nb: int) -> str:
+    """Dossier fiches/A_traiter avec `nb` fiches valides et une fiche sans type."""
+    a_traiter = tmp_path / "fiches" / "A_traiter"
+    a_traiter.mkdir(parents=True)
+    for i in range(nb):
+        ecrire_fiche(str(a_traiter / f"plante_{i:02d}.docx"),
+                     ["Type: plante brute", f"Nom commun: Plante {i}", f"Posologie: {i} tasses"])
+    ecrire_fiche(str(a_traiter / "plante_03b.docx"), ["Nom commun: Sans type"])
+    return str(tmp_path / "fiches")
+
+
+def test_extraction_parallele_identique_a_la_sequentielle(tmp_path, capsys):
+    dossier = _dossier_fiches(tmp_path, 6)
+    sequentiel = extract_fiches.importer_dossier(dossier, nb_workers=1)
+    parallele = extract_fiches.importer_dossier(dossier, nb_workers=2)
+
+    assert parallele == sequentiel
+    succes, erreurs = parallele
+    assert [p.nom for p, _ in succes] == [f"Plante {i}" for i in range(6)]
+    assert [os.path.basename(chemin) for _, chemin in succes][3] == "plante_03.docx"
+    assert erreurs == ["plante_03b.docx"]
+
+
+def test_progression_de_l_extraction(tmp_path, capsys):
+    dossier = _dossier_fiches(tmp_path, 2)
+    chemins = [os.path.join(dossier, "A_traiter", f)
+               for f in extract_fiches._lister_fiches(os.path.join(dossier, "A_traiter"))]
+    etapes = []
+    extract_fiches._extraire_fiches(chemins, 1, lambda *e: etapes.append(e))
+    assert etapes == [(1, 0, 3), (2, 0, 3), (3, 1, 3)]
+
+
+def test_lecteur_rapide_identique_a_python_docx(tmp_path, capsys):
+    from docx import Document
+    chemin = str(tmp_path / "melisse.docx")
+    doc = Document()
+    doc.add_paragraph("Nom commun: Mélisse")
+    doc.add_paragraph("Nom scientifique: Melissa officinalis")
+    doc.add_paragraph("Type: plante brute")
+    run = doc.add_paragraph("Propriétés: ").add_run("Calmante")
+    run.add_tab()
+    run.add_text("digestive")
+    run.add_break()
+    run.add_text("antivirale")
+    doc.add_paragraph("")
+    doc.add_paragraph("Utilisée en tisane.")
+    table = doc.add_table(rows=1, cols=1)
+    table.cell(0, 0).text = "Bio: oui"   # hors du corps : ignoré, comme par python-docx
+    doc.add_paragraph("Bio: non")
+    doc.save(chemin)
+
+    rapide = list(extract_fiches._paragraphes_rapide(chemin))
+    assert rapide == extract_fiches._paragraphes_python_docx(chemin)
+
+    plante = extract_fiches.extraire_fiche(chemin)
+    # Labels lus avant "Type:" rejoués ensuite ; "Type:" termine le champ précédent
+    assert (plante.nom, plante.latin) == ("Mélisse", "Melissa officinalis")
+    assert plante.proprietes == "Calmante\tdigestive\nantivirale\n\nUtilisée en tisane."
+    assert plante.bio is False
+
+
+def test_repli_sur_python_docx(tmp_path, capsys):
+    from docx import Document
+    from docx.oxml import parse_xml
+    chemin = str(tmp_path / "ortie.docx")
+    doc = Document()
+    doc.add_paragraph("Type: plante brute")
+    doc.add_paragraph("Nom commun: Ortie")
+    # Contrôle de contenu (w:sdt) : non géré par le lecteur rapide
+    doc.element.body.append(parse_xml(
+        '<w:sdt xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        '<w:sdtContent><w:p><w:r><w:t>Notes: cachée</w:t></w:r></w:p></w:sdtContent></w:sdt>'))
+    doc.save(chemin)
+
+    try:
+        list(extract_fiches._paragraphes_rapide(chemin))
+    except extract_fiches.FormatNonGere:
+        pass
+    else:
+        raise AssertionError("w:sdt aurait dû être refusé")
+    assert extract_fiches.extraire_fiche(chemin).nom == "Ortie"
+    assert extract_fiches.extraire_fiche(str(tmp_path / "absente.docx")) is None
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""Import incrémental des fiches .docx (manifeste fiches_importees, taches.py)."""
+
+import os
+import shutil
+import threading
+
+import database
+import extract_fiches
+import taches
+from conftest import ecrire_fiche
+
+
+def _importer(dossier: str) -> taches.TacheImport:
+    tache = taches.TacheImport(dossier, nb_workers=1)
+    taches._importer(tache)
+    return tache
+
+
+def _deposer(dossier: str, nom: str, type_fiche: str, proprietes: str = "Diurétique."):
+    a_traiter = os.path.join(dossier, "A_traiter")
+    os.makedirs(a_traiter, exist_ok=True)
+    ecrire_fiche(os.path.join(a_traiter, nom),
+                 ["Nom commun: Ortie", "Nom scientifique: Urtica dioica",
+                  f"Type: {type_fiche}", f"Propriétés: {proprietes}"])
+
+
+def test_changement_de_type_cree_une_nouvelle_plante(base, tmp_path):
+    dossier = str(tmp_path / "fiches")
+    _deposer(dossier, "ortie.docx", "plante brute")
+    _importer(dossier)
+    ancien_id = database.get_fiches_importees()["ortie.docx"]["plante_id"]
+    assert database.get_plante(ancien_id).TYPE == "brute"
+
+    # Même fichier redéposé, devenu une fiche de complément
+    _deposer(dossier, "ortie.docx", "complément", "Reminéralisant.")
+    tache = _importer(dossier)
+    assert tache.erreurs == []
+
+    nouvel_id = database.get_fiches_importees()["ortie.docx"]["plante_id"]
+    assert nouvel_id != ancien_id
+    nouvelle = database.get_plante(nouvel_id)
+    assert nouvelle.TYPE == "complement"
+    assert nouvelle.proprietes == "Reminéralisant."
+    # L'ancienne plante garde son type et sa seule ligne spécifique
+    assert database.get_plante(ancien_id).TYPE == "brute"
+    with database.connexion() as conn:
+        assert conn.execute("SELECT count(*) FROM complements WHERE plante_id = ?",
+                            (ancien_id,)).fetchone()[0] == 0
+
+
+def test_deplacement_impossible_sans_doublon(base, tmp_path, monkeypatch):
+    dossier = str(tmp_path / "fiches")
+    _deposer(dossier, "ortie.docx", "plante brute")
+
+    def refuser(source, dest):
+        raise PermissionError("fichier ouvert dans Word")
+    with monkeypatch.context() as m:
+        m.setattr(taches.shutil, "move", refuser)
+        tache = _importer(dossier)
+    assert tache.enregistrees == 1 and len(tache.erreurs) == 1
+
+    # La fiche est restée dans A_traiter/, le manifeste pointe vers elle
+    entree = database.get_fiches_importees()["ortie.docx"]
+    assert entree["chemin"] == os.path.join(dossier, "A_traiter", "ortie.docx")
+
+    tache = _importer(dossier)
+    assert tache.inchangees == 1 and tache.enregistrees == 0
+    assert database.compter_plantes() == 1
+
+
+def test_fiche_reconnue_a_son_empreinte_plus_relue(base, tmp_path, monkeypatch):
+    dossier = str(tmp_path / "fiches")
+    _deposer(dossier, "ortie.docx", "plante brute")
+    _importer(dossier)
+
+    # Même contenu redéposé (nouvelle date) : reconnu à l'empreinte...
+    copie = os.path.join(dossier, "A_traiter", "ortie.docx")
+    shutil.copy(os.path.join(dossier, "ortie.docx"), copie)
+    os.utime(copie, (1_000_000, 1_000_000))
+    assert _importer(dossier).inchangees == 1
+    assert database.get_fiches_importees()["ortie.docx"]["mtime"] == 1_000_000
+
+    # ...puis plus jamais relu : taille et date suffisent
+    def relecture(chemin):
+        raise AssertionError(f"{chemin} relu")
+    monkeypatch.setattr(extract_fiches, "empreinte_fichier", relecture)
+    assert _importer(dossier).inchangees == 1
+    assert database.compter_plantes() == 1
+
+
+def test_fiche_modifiee_met_a_jour_sa_plante(base, tmp_path):
+    dossier = str(tmp_path / "fiches")
+    _deposer(dossier, "ortie.docx", "plante brute")
+    tache = _importer(dossier)
+    assert tache.enregistrees == 1 and tache.erreurs == []
+    assert os.listdir(os.path.join(dossier, "A_traiter")) == []   # fiche déplacée
+    entree = database.get_fiches_importees()["ortie.docx"]
+    assert entree["chemin"] == os.path.join(dossier, "ortie.docx")
+
+    _deposer(dossier, "ortie.docx", "plante brute", "Reminéralisante.")
+    tache = _importer(dossier)
+    assert tache.enregistrees == 1 and tache.inchangees == 0
+    assert database.compter_plantes() == 1
+    nouvelle = database.get_fiches_importees()["ortie.docx"]
+    assert nouvelle["plante_id"] == entree["plante_id"]
+    assert nouvelle["empreinte"] != entree["empreinte"]
+    assert database.get_plante(entree["plante_id"]).proprietes == "Reminéralisante."
+
+
+def test_un_seul_import_par_dossier(base, tmp_path, monkeypatch):
+    liberer = threading.Event()
+
+    def importer_bloque(tache):
+        tache.maj(total=3, analysees=1)
+        liberer.wait(5)
+        if tache.dossier.endswith("cassé"):
+            raise OSError("disque plein")
+
+    monkeypatch.setattr(taches, "_importer", importer_bloque)
+    dossier = str(tmp_path / "fiches")
+    tache = taches.lancer_import(dossier)
+    assert taches.lancer_import(dossier + "/.") is tache   # double clic : même tâche
+    etat = tache.attendre_changement(0, 5)
+    assert etat["analysees"] == 1 and etat["statut"] == taches.EN_COURS
+
+    casse = taches.lancer_import(str(tmp_path / "cassé"))
+    assert casse is not tache
+    liberer.set()
+    assert tache.attendre_changement(etat["version"], 5)["statut"] == taches.TERMINEE
+    while not casse.terminee:
+        casse.attendre_changement(casse.etat()["version"], 5)
+    assert casse.statut == taches.ECHOUEE and "disque plein" in casse.message
+
+    assert taches.get_tache(tache.id) is tache
+    assert taches.lancer_import(dossier) is not tache   # terminé : nouvel import possible
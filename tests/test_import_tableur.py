@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Import en masse CSV / JSONL (import_tableur.py), dont le réimport d'un export."""
+
+import gzip
+
+import pytest
+
+import database
+import export
+import import_tableur
+from bench.generateur import generer_plantes
+from conftest import brute
+
+
+@pytest.mark.parametrize("fichier", ["plantes.csv", "plantes.jsonl.gz"])
+def test_export_puis_import_a_l_identique(base, tmp_path, monkeypatch, capsys, fichier):
+    plantes = list(generer_plantes(12, graine=9))   # les quatre types, tous champs remplis
+    database.sauvegarder_plantes(plantes)
+    originales = database.lister_plantes()
+    chemin = str(tmp_path / fichier)
+    export.exporter(chemin)
+
+    # Base neuve : mêmes plantes, mêmes ids
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "copie.db"))
+    database.invalider_cache()
+    database.init_db()
+    rapport = import_tableur.importer_fichier(chemin, avec_ids=True, taille_lot=5)
+    assert (rapport.lues, rapport.importees, rapport.erreurs) == (12, 12, [])
+    assert rapport.colonnes_ignorees == []
+    assert database.lister_plantes() == originales
+
+    # Réimport : mises à jour, aucune plante en double
+    assert import_tableur.importer_fichier(chemin, avec_ids=True).importees == 12
+    assert database.compter_plantes() == 12
+
+
+def test_import_csv_avec_labels_et_erreurs(base, tmp_path):
+    chemin = tmp_path / "catalogue.csv.gz"
+    with gzip.open(chemin, "wt", encoding="utf-8-sig", newline="") as f:
+        f.write("Nom commun;Chémotype;Type;Prix HT;Bio\r\n"
+                "Lavande vraie;linalol;huile essentielle;12;oui\r\n"
+                ";;he;;\r\n"
+                "Thym;thymol;;8;non\r\n"
+                "Ortie;;tisane;3;\r\n"
+                "Rose;;inconnu;;\r\n")
+
+    rapport = import_tableur.importer_fichier(str(chemin), type_defaut="he")
+    assert (rapport.lues, rapport.importees) == (5, 3)
+    assert rapport.erreurs == [(3, "nom manquant"), (6, "type 'inconnu' non reconnu")]
+    assert rapport.colonnes_ignorees == ["Prix HT"]
+    plantes = {p.nom: p for p in database.lister_plantes()}
+    assert (plantes["Lavande vraie"].TYPE, plantes["Lavande vraie"].chemotype) == ("he", "linalol")
+    assert plantes["Lavande vraie"].bio is True
+    assert plantes["Thym"].TYPE == "he"          # type par défaut
+    assert plantes["Ortie"].TYPE == "brute"      # synonyme « tisane »
+
+    with pytest.raises(ValueError, match="Type par défaut inconnu"):
+        import_tableur.importer_fichier(str(chemin), type_defaut="arbre")
+
+
+def test_import_jsonl_lignes_illisibles(base, tmp_path):
+    chemin = tmp_path / "plantes.jsonl"
+    chemin.write_text('{"nom": "Ortie", "type": "brute"}\n'
+                      '{"nom": "Sauge", \n'
+                      '\n'
+                      '["pas", "un", "objet"]\n'
+                      '{"nom": "Zinc", "type": "complement", "id": "douze"}\n', encoding="utf-8")
+    rapport = import_tableur.importer_fichier(str(chemin), avec_ids=True)
+    assert rapport.importees == 1
+    assert [n for n, _ in rapport.erreurs] == [2, 4, 5]
+    assert rapport.erreurs[1][1] == "objet JSON attendu"
+    assert rapport.erreurs[2][1] == "id 'douze' invalide"
+
+
+def test_import_avec_ids_refuse_un_changement_de_type(base, tmp_path):
+    id_ = database.sauvegarder_plante(brute("Ortie", partie="feuilles"))
+    chemin = tmp_path / "plantes.csv"
+    chemin.write_text(f"id,nom,type,chemotype\r\n"
+                      f"{id_},Lavande,he,linalol\r\n"
+                      f"{id_ + 1},Thym,he,thymol\r\n", encoding="utf-8")
+
+    rapport = import_tableur.importer_fichier(str(chemin), avec_ids=True)
+    assert rapport.importees == 1
+    assert rapport.erreurs == [(2, "type 'he' ≠ type existant 'brute'")]
+    ortie = database.get_plante(id_)
+    assert (ortie.TYPE, ortie.nom, ortie.partie) == ("brute", "Ortie", "feuilles")
+    with database.connexion() as conn:
+        lignes_he = conn.execute("SELECT plante_id FROM huiles_essentielles").fetchall()
+    assert [r[0] for r in lignes_he] == [id_ + 1]   # aucune ligne orpheline
+    assert database.get_plante(id_ + 1).chemotype == "thymol"   # id libre : inséré tel quel
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Chronométrage par requête (metriques.py) et connexions mesurées de database.py."""
+
+import pytest
+from flask import Flask
+
+import database
+import metriques
+from models import PlanteBrute
+
+
+@pytest.fixture
+def appli(base, monkeypatch):
+    monkeypatch.setattr(database, "MESURE_SQL", None)
+    app = Flask(__name__)
+    app.config.update(TESTING=True, HERBIER_SERVER_TIMING=True)
+    metriques.init_metriques(app)
+
+    @app.route("/liste")
+    def liste():
+        return str(len(database.lister_plantes()))
+
+    @app.route("/erreur")
+    def erreur():
+        database.compter_plantes()
+        raise ValueError("vue en échec")
+
+    yield app
+    database.fermer_pool()   # les connexions suivantes ne sont plus mesurées
+
+
+def test_server_timing_compte_les_requetes_sql(appli):
+    database.sauvegarder_plante(PlanteBrute(nom="Ortie"))
+    database.invalider_cache()
+    reponse = appli.test_client().get("/liste")
+    assert reponse.data == b"1"
+    assert "SQLite (1 req.)" in reponse.headers["Server-Timing"]
+
+
+def test_exception_ne_laisse_pas_la_mesure_active(appli):
+    with pytest.raises(ValueError):
+        appli.test_client().get("/erreur")
+    assert metriques._local.actif is False
+    # Hors requête, les requêtes SQL ne sont plus comptées
+    compte = metriques._local.sql_requetes
+    database.compter_plantes()
+    assert metriques._local.sql_requetes == compte
+
+
+def test_metrics_au_format_prometheus(appli):
+    metriques.reinitialiser()
+    client = appli.test_client()
+    database.sauvegarder_plante(PlanteBrute(nom="Ortie"))
+    for _ in range(2):
+        database.invalider_cache()
+        client.get("/liste")
+    client.get("/inconnue")
+
+    reponse = client.get("/metrics")
+    assert reponse.mimetype == "text/plain"
+    valeurs = dict(ligne.rsplit(" ", 1) for ligne in reponse.text.splitlines()
+                   if not ligne.startswith("#"))
+    assert valeurs['herbier_requetes_total{route="liste",methode="GET",code="200"}'] == "2"
+    assert valeurs['herbier_requetes_total{route="inconnue",methode="GET",code="404"}'] == "1"
+    assert valeurs['herbier_requete_duree_secondes_count{route="liste"}'] == "2"
+    assert valeurs['herbier_requete_duree_secondes_bucket{route="liste",le="+Inf"}'] == "2"
+    assert valeurs['herbier_sql_requetes_total{route="liste"}'] == "2"
+    assert float(valeurs['herbier_sql_secondes_total{route="liste"}']) > 0
+    assert "# TYPE herbier_requete_duree_secondes histogram" in reponse.text
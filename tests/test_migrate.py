@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Migration reprenable de l'ancien herbier_data.json (migrate.py)."""
+
+import io
+import json
+
+import pytest
+
+import database
+import migrate
+from bench.generateur import generer_json_ancien
+
+
+def test_lecture_du_json_en_flux(tmp_path):
+    chemin = str(tmp_path / "ancien.json")
+    generer_json_ancien(chemin, 30, graine=2)
+    with open(chemin, encoding="utf-8") as f:
+        attendu = json.load(f)
+    with open(chemin, encoding="utf-8") as f:
+        assert list(migrate.lire_entrees(f, taille_lecture=7)) == attendu   # entrées coupées
+
+    assert list(migrate.lire_entrees(io.StringIO(" [ ] "))) == []
+    for invalide in ('{"a": 1}', '[{"a": 1} {"b": 2}]', '[{"a": 1},', '[{"a": '):
+        with pytest.raises(ValueError):
+            list(migrate.lire_entrees(io.StringIO(invalide), taille_lecture=3))
+
+
+def _noms() -> list[str]:
+    """Noms des plantes en base, triés (les ids suivent les types, pas l'ordre du fichier)."""
+    with database.connexion() as conn:
+        return sorted(r[0] for r in conn.execute("SELECT nom FROM plantes"))
+
+
+def test_migration_reprise_apres_interruption(base, tmp_path, monkeypatch, capsys):
+    chemin = str(tmp_path / "ancien.json")
+    generer_json_ancien(chemin, 25, graine=4)
+    with open(chemin, encoding="utf-8") as f:
+        entrees = json.load(f)
+    attendus = sorted(e["nom"] for e in entrees)
+    assert len(set(attendus)) == 25
+
+    # Arrêt brutal pendant le 3e lot : les deux premiers restent enregistrés
+    vraie_sauvegarde, appels = migrate.sauvegarder_plantes, []
+
+    def sauvegarde_interrompue(plantes, taille_lot):
+        appels.append(1)
+        if len(appels) == 3:
+            list(plantes)
+            raise KeyboardInterrupt
+        return vraie_sauvegarde(plantes, taille_lot)
+
+    with monkeypatch.context() as m:
+        m.setattr(migrate, "sauvegarder_plantes", sauvegarde_interrompue)
+        with pytest.raises(KeyboardInterrupt):
+            migrate.migrer(chemin, taille_lot=10)
+    assert _noms() == sorted(e["nom"] for e in entrees[:20])
+    assert database.get_reprise_migration("ancien.json")["entrees"] == 20
+
+    migrate.migrer(chemin, taille_lot=10)
+    assert "Reprise : 20 entrée(s)" in capsys.readouterr().out
+    assert _noms() == attendus   # ni doublon ni trou
+
+    migrate.migrer(chemin, taille_lot=10)
+    assert "Rien à migrer" in capsys.readouterr().out
+    assert database.compter_plantes() == 25
+
+    # Entrées ajoutées en fin de fichier : seules celles-ci sont migrées
+    entrees.append({**entrees[0], "id": "nouvelle", "nom": "Nouvelle"})
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump(entrees, f)
+    migrate.migrer(chemin, taille_lot=10)
+    assert _noms() == sorted(attendus + ["Nouvelle"])
+
+    # Fichier modifié avant le point de reprise : refusé
+    entrees[-1]["id"] = "autre"
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump(entrees, f)
+    migrate.migrer(chemin, taille_lot=10)
+    assert "le fichier a changé" in capsys.readouterr().out
+    assert database.compter_plantes() == 26
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""Classes du modèle (models.py) : dataclasses à __slots__, to_dict précalculé."""
+
+import copy
+import dataclasses
+
+import pytest
+
+from models import CLASSES_MAP, EntreeJournal, PlanteJardin, creer_plante
+
+
+@pytest.mark.parametrize("type_", CLASSES_MAP)
+def test_to_dict_identique_a_asdict(type_):
+    plante = creer_plante(type_)
+    plante.nom, plante.id, plante._extrait = "Ortie", 3, "extrait"
+    attendu = {k: v for k, v in dataclasses.asdict(plante).items() if not k.startswith("_")}
+    assert plante.to_dict() == attendu
+    assert list(plante.to_dict())[:3] == ["TYPE", "id", "nom"]
+    assert plante.to_dict()["TYPE"] == type_
+
+
+def test_slots_sans_dict():
+    plante = PlanteJardin(nom="Basilic", vivace=True)
+    assert not hasattr(plante, "__dict__")
+    with pytest.raises(AttributeError):
+        plante.inconnu = 1
+    copie = copy.copy(plante)
+    assert copie == plante and copie is not plante
+    assert EntreeJournal(plante_id=1, action="achat").to_dict() == {
+        "id": None, "plante_id": 1, "date": "", "action": "achat", "notes": ""}
+    with pytest.raises(ValueError):
+        creer_plante("inconnu")
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Serveur de production (serve.py) : Waitress multi-threadé, arrêt propre."""
+
+import signal
+import threading
+import urllib.request
+
+import database
+import serve
+from conftest import brute
+
+
+def test_options_lues_dans_l_environnement(monkeypatch):
+    monkeypatch.setenv("HERBIER_THREADS", "12")
+    monkeypatch.setenv("HERBIER_PORT", "8000")
+    options = serve.lire_options(["--no-browser"])
+    assert (options.threads, options.port, options.no_browser) == (12, 8000, True)
+    assert serve.lire_options(["--threads", "3"]).threads == 3
+
+
+def test_serveur_multi_threade_et_arret_propre(base, monkeypatch, capsys):
+    import app
+    monkeypatch.setattr(database, "POOL_TAILLE", 2)
+    monkeypatch.setitem(app.app.config, "HERBIER_ARRET", None)
+    ancien_sigterm = signal.getsignal(signal.SIGTERM)
+    database.sauvegarder_plante(brute("Ortie"))
+
+    options = serve.lire_options(["--host", "127.0.0.1", "--port", "0", "--threads", "4"])
+    serveur = serve.creer_serveur(options, app.app)
+    try:
+        assert database.POOL_TAILLE == 4   # une connexion par thread de traitement
+        execution = threading.Thread(target=serveur.run)
+        execution.start()
+
+        url = f"http://127.0.0.1:{serveur.effective_port}/api/plantes?fields=nom"
+        reponses = []
+
+        def client():
+            with urllib.request.urlopen(url, timeout=5) as reponse:
+                reponses.append((reponse.status, reponse.read()))
+
+        clients = [threading.Thread(target=client) for _ in range(8)]
+        for c in clients:
+            c.start()
+        for c in clients:
+            c.join()
+        assert reponses == [(200, b'[{"nom":"Ortie"}]\n')] * 8
+
+        app.app.config["HERBIER_ARRET"]()   # bouton « Quitter »
+        execution.join(5)
+        assert not execution.is_alive()
+    finally:
+        serveur.task_dispatcher.shutdown()
+        signal.signal(signal.SIGTERM, ancien_sigterm)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Autocomplétion (suggestions.py) : index de préfixes et suivi des écritures."""
+
+import sqlite3
+
+import pytest
+
+import database
+import suggestions
+from conftest import brute
+
+
+@pytest.fixture
+def index(base, monkeypatch):
+    index = suggestions.IndexSuggestions()
+    monkeypatch.setattr(database, "SUIVI_PLANTES", index.suivre)
+    database.sauvegarder_plantes([brute("Lavande vraie", latin="Lavandula angustifolia",
+                                        famille="Lamiacées"),
+                                  brute("Mélisse", latin="Melissa officinalis",
+                                        famille="Lamiacées")])
+    index.construire()
+    return index
+
+
+def _textes(index, saisie):
+    return [s["texte"] for s in index.suggerer(saisie)]
+
+
+def test_prefixes_sans_casse_ni_accents(index):
+    assert _textes(index, "meli") == ["Mélisse"]
+    assert _textes(index, "VRAIE") == ["Lavande vraie"]
+    assert _textes(index, "lami") == ["Lamiacées"]
+    assert index.suggerer("lami")[0]["nb"] == 2
+
+
+def test_ecritures_suivies_sans_relire_la_base(index, monkeypatch):
+    def relecture():
+        raise AssertionError("compteur de révision relu à la frappe")
+    monkeypatch.setattr(database, "get_revision", relecture)
+
+    id_ = database.sauvegarder_plante(brute("Menthe poivrée"))
+    assert _textes(index, "ment") == ["Menthe poivrée"]
+    database.supprimer_plante(id_)
+    assert _textes(index, "ment") == []
+
+
+def test_ecriture_d_un_autre_processus(index, monkeypatch):
+    conn = sqlite3.connect(database.DB_PATH)
+    with conn:
+        conn.execute("INSERT INTO plantes (type, nom) VALUES ('brute', 'Romarin')")
+        conn.execute("UPDATE revision SET numero = numero + 1")
+    conn.close()
+
+    monkeypatch.setattr(suggestions, "VERIFICATION_EXTERNE", 3600)
+    assert _textes(index, "roma") == []          # compteur pas encore relu
+    monkeypatch.setattr(suggestions, "VERIFICATION_EXTERNE", 0)
+    _textes(index, "roma")                       # reconstruction lancée en arrière-plan
+    with index._construction:                    # attend sa fin
+        pass
+    assert _textes(index, "roma") == ["Romarin"]
+
+
+def test_revisions_signalees_dans_le_desordre(index, monkeypatch):
+    signaux = []
+    monkeypatch.setattr(database, "SUIVI_PLANTES", lambda *signal: signaux.append(signal))
+    database.sauvegarder_plante(brute("Menthe poivrée"))
+    database.sauvegarder_plante(brute("Mauve"))
+    revision = index.revision
+
+    index.suivre(*signaux[1])
+    assert index.revision == revision            # en attente de la précédente
+    index.suivre(*signaux[0])
+    assert index.revision == revision + 2
+    assert _textes(index, "m") == ["Mauve", "Mélisse", "Menthe poivrée"]
+
+
+def test_ecriture_annulee_jamais_signalee(index):
+    with pytest.raises(RuntimeError):
+        with database.connexion():
+            database.sauvegarder_plante(brute("Menthe poivrée"))
+            raise RuntimeError("transaction annulée")
+    assert _textes(index, "ment") == []
+    assert index.revision == index._signalee
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+verifier_plans.py — Contrôle des plans d'exécution SQLite
+==========================================================
+À lancer après toute modification d'une requête ou du schéma :
+
+  python verifier_plans.py
+
+Ce script :
+  1. Crée une base temporaire (toutes les migrations) avec une plante de chaque type
+  2. Appelle chaque fonction de lecture de database.py (filtres, recherche, curseurs…)
+     en enregistrant toutes les requêtes SQL exécutées
+  3. Passe chaque SELECT dans EXPLAIN QUERY PLAN
+  4. Échoue (code de sortie 1) si une table est parcourue entièrement sans index
+     ou si un tri nécessite un B-tree temporaire
+
+Les lectures volontairement complètes sont listées dans LECTURES_COMPLETES
+(tables) et REQUETES_COMPLETES (requêtes : export, index des suggestions).
+"""
+
+import os
+import re
+import sys
+import tempfile
+
+# ── S'assure qu'on peut importer les modules du projet ────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import suggestions
+from models import creer_plante, EntreeJournal
+
+# Tables lues en entier par conception (chargement complet assumé)
+LECTURES_COMPLETES = {
+    "fiches_importees",   # get_fiches_importees : manifeste chargé en mémoire à l'import
+    "revision",           # une seule ligne
+    "plantes_fts_config", # configuration interne de FTS5, relue par chaque nouvelle connexion
+}
+# Requêtes qui lisent toute une table par conception (export, index en mémoire)
+REQUETES_COMPLETES = {" ".join(sql.split()) for sql in (
+    database.SQL_EXPORT_PLANTES,       # export complet, dans l'ordre des id
+    database.SQL_EXPORT_JOURNAL,
+    suggestions.SQL_TOUTES_PLANTES,    # construction de l'index des suggestions
+)}
+
+SCAN_COMPLET = re.compile(r"\bSCAN (?:\w+\.)?(\w+)(?!\w)(?! USING| VIRTUAL TABLE)")
+TRI_TEMPORAIRE = "USE TEMP B-TREE"
+# Un tri temporaire est admis derrière une recherche FTS5 : il ne porte que sur
+# les résultats trouvés (classement bm25), jamais sur toute la table.
+RECHERCHE_FTS = "VIRTUAL TABLE"
+
+
+def _peupler():
+    """Une plante par type, une entrée de journal chacune."""
+    plantes = []
+    for type_ in database.TABLE_SPECIFIQUE:
+        p = creer_plante(type_)
+        p.nom, p.latin, p.famille = f"Plante {type_}", "Herba exempli", "Lamiaceae"
+        plantes.append(p)
+    ids, _ = database.sauvegarder_plantes(plantes)
+    for id_ in ids:
+        database.ajouter_entree_journal(EntreeJournal(plante_id=id_, date="2026-01-01",
+                                                      action="Début de cure"))
+    return ids
+
+
+def _exercer(ids: list[int]):
+    """Appelle toutes les lectures de database.py (cache vidé à chaque fois)."""
+    appels = [
+        lambda: database.get_plante(ids[0]),
+        lambda: database.get_journal(ids[0]),
+        lambda: database.get_journal_global(),
+        lambda: database.get_journal_global_page(limite=1, curseur=database.get_journal_global_page(limite=1)[2]),
+        lambda: database.get_journal_global_page("2025-01-01", "2026-12-31", "cure", "he", limite=1),
+        lambda: database.types_plantes(ids),
+        lambda: database.get_fiches_importees(),
+        lambda: database.get_reprise_migration("herbier_data.json"),
+        lambda: database.get_revision(),
+        lambda: list(database.iterer_export_plantes()),
+        lambda: list(database.iterer_export_journal()),
+    ]
+
+    def suivi_suggestions():
+        index = suggestions.IndexSuggestions()
+        index.construire()
+        index.suivre(index.revision + 1, ids, [])
+    appels.append(suivi_suggestions)
+    for type_ in (None, *database.TABLE_SPECIFIQUE):
+        for recherche in (None, "plante") if database.FTS_DISPONIBLE else (None,):
+            appels.append(lambda t=type_, r=recherche: database.compter_plantes(t, r))
+            appels.append(lambda t=type_, r=recherche: list(database.iterer_plantes(t, r)))
+            appels.append(lambda t=type_, r=recherche: list(
+                database.iterer_plantes(t, r, colonnes=("latin", "famille"))))
+
+            def pages(t=type_, r=recherche):
+                plantes, _, suivant = database.lister_plantes_page(t, r, limite=1)
+                if suivant:
+                    _, precedent, _ = database.lister_plantes_page(t, r, limite=1, curseur=suivant)
+                    if precedent:
+                        database.lister_plantes_page(t, r, limite=1, curseur=precedent)
+                database.lister_plantes_page(t, r, limite=1, page=2)
+                _, _, suivant = database.lister_plantes_page(t, r, limite=1,
+                                                             colonnes=database.COLONNES_LISTE)
+                if suivant:
+                    database.lister_plantes_page(t, r, limite=1, curseur=suivant,
+                                                 colonnes=database.COLONNES_LISTE)
+            appels.append(pages)
+    for appel in appels:
+        database.invalider_cache()
+        appel()
+
+
+def verifier() -> list[tuple[str, list[str]]]:
+    """Retourne la liste des (requête, plan) fautifs."""
+    requetes: list[str] = []
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin_origine = database.DB_PATH
+        database.DB_PATH = os.path.join(dossier, "plans.db")
+        database.TRACE_SQL = requetes.append   # appliqué aux connexions du nouveau pool
+        try:
+            database.init_db()
+            ids = _peupler()
+            requetes.clear()
+            _exercer(ids)
+            with database.connexion() as conn:
+                fautives = []
+                vues = set()
+                for sql in requetes:
+                    sql = sql.strip()
+                    if sql in vues or not re.match(r"(SELECT|WITH)\b", sql, re.I):
+                        continue
+                    vues.add(sql)
+                    if " ".join(sql.split()) in REQUETES_COMPLETES:
+                        continue
+                    plan = [r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+                    fts = any(RECHERCHE_FTS in ligne for ligne in plan)
+                    problemes = [ligne for ligne in plan
+                                 if (TRI_TEMPORAIRE in ligne and not fts)
+                                 or any(m.group(1) not in LECTURES_COMPLETES
+                                        for m in SCAN_COMPLET.finditer(ligne))]
+                    if problemes:
+                        fautives.append((sql, plan))
+        finally:
+            database.TRACE_SQL = None
+            database.fermer_pool()
+            database.invalider_cache()
+            database.DB_PATH = chemin_origine
+    print(f"🔎 {len(vues)} requête(s) distincte(s) analysée(s)")
+    return fautives
+
+
+if __name__ == "__main__":
+    fautives = verifier()
+    for sql, plan in fautives:
+        sql = " ".join(sql.split())
+        print("\n❌ " + (sql if len(sql) < 300 else sql[:150] + " … " + sql[-150:]))
+        for ligne in plan:
+            print(f"     {ligne}")
+    if fautives:
+        print(f"\n{len(fautives)} requête(s) avec parcours complet.")
+        sys.exit(1)
+    print("✅ Aucun parcours complet de table.")